@@ -2,12 +2,20 @@ from flask import Flask
 from flasgger import Swagger
 from app.config import Config
 from app.extensions import mongo
+from app.common.compresion import Compresion
+from app.common.admision import ControlAdmision
+from app.common.contexto import ContextoSolicitud
+from app.common.calentamiento import Calentamiento
+from app.common.perfilado import Perfilador
 import os
 
 
-def create_app():
+def create_app(backend=None):
+    # backend: 'mongo' o 'memoria'; si se indica, los servicios pasan a usar repositorios nuevos de ese backend
     app = Flask(__name__)
     app.config.from_object(Config)
+    if backend:
+        app.config['REPOSITORIO_BACKEND'] = backend
     
     swagger_config = {
         "headers": [],
@@ -43,10 +51,67 @@ def create_app():
     
     Swagger(app, config=swagger_config, template=swagger_template)
     mongo.init_app(app)
+    ContextoSolicitud(app)
+    Compresion(app)
+    ControlAdmision(app)
+    Perfilador(app)
+    calentamiento = Calentamiento(app)
     register_blueprints(app)
+    if backend:
+        configurar_repositorios(backend)
+    if app.config['REPOSITORIO_BACKEND'] == 'mongo':
+        preparar_colecciones()
+    preparar_calentamiento(app, calentamiento)
+    calentamiento.iniciar()
     return app
 
 
 def register_blueprints(app):
     from app.api.employees_routes import employees_bp
+    from app.api.metricas_routes import metricas_bp
+    from app.api.jobs_routes import jobs_bp
+    from app.api.salud_routes import salud_bp
+    from app.api.perfil_routes import perfil_bp
     app.register_blueprint(employees_bp)
+    app.register_blueprint(employees_bp, url_prefix='/api/empresas/<empresa>/empleados', name='employees_empresa')
+    app.register_blueprint(metricas_bp)
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(salud_bp)
+    app.register_blueprint(perfil_bp)
+
+
+
+def configurar_repositorios(backend):
+    from app.repository.backends import crear_repositorio_empleados, crear_repositorio_jobs
+    from app.api.employees_routes import service
+    from app.api.jobs_routes import service as jobs_service
+    service.usar_repositorio(crear_repositorio_empleados(backend))
+    jobs_service.repo = crear_repositorio_jobs(backend)
+
+
+def preparar_colecciones():
+    from app.repository.employees_repository import asegurar_indices, aplicar_validador
+    from app.repository import historial_salarios_repository
+    try:
+        asegurar_indices()
+        historial_salarios_repository.asegurar_indices()
+        aplicar_validador()
+    except Exception as e:
+        print(f"No se pudieron preparar las colecciones: {e}")
+
+
+def preparar_calentamiento(app, calentamiento):
+    from app.db import abrir_conexiones
+    from app.api.employees_routes import service
+    if app.config['REPOSITORIO_BACKEND'] == 'mongo':
+        calentamiento.agregar('conexiones', lambda: abrir_conexiones(app.config['MONGO_MIN_POOL_SIZE']))
+        calentamiento.agregar('indices', lambda: service.repo.calentar_indices(app.config['CALENTAMIENTO_DOCUMENTOS_INDICE']))
+    calentamiento.agregar('especificacion', lambda: construir_especificacion(app))
+    calentamiento.agregar('caches', service.calentar_caches)
+
+
+def construir_especificacion(app):
+    # flasgger arma la especificacion en la primera visita a /apispec.json y la guarda (salvo en debug)
+    with app.test_request_context():
+        return len(app.swag.get_apispecs('apispec')['paths'])
+
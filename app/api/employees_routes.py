@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response
 from datetime import datetime
+import json
 from flasgger import swag_from
 from app.services.employees_service import EmployeesService
-from app.common.errors import EmpleadoNoEncontrado, EmailYaExiste, DatosInvalidos, ErrorBaseDatos
+from app.common.contexto import moneda_empresa
+from app.common.errors import EmpleadoNoEncontrado, EmailYaExiste, DatosInvalidos, ErrorBaseDatos, ErrorConexion, PlazoAgotado
 
 employees_bp = Blueprint('employees', __name__, url_prefix='/api/empleados')
 service = EmployeesService()
@@ -28,11 +30,30 @@ def crear_empleado():
             'error': str(e)
         }), 409
         
-    except (DatosInvalidos, ErrorBaseDatos) as e:
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e),
+            'errores': e.errores
+        }), 400
+        
+    except ErrorBaseDatos as e:
         return jsonify({
             'error': str(e)
         }), 400
     
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
     except Exception as e:
         return jsonify({
             'error': 'Error interno del servidor'
@@ -57,19 +78,247 @@ def listar_empleados():
         resultado = service.listar_empleados(
             pagina=pagina,
             por_pagina=por_pagina,
+            orden=request.args.get('sort', request.args.get('orden')),
+            cursor=request.args.get('cursor'),
+            facetas=request.args.get('facetas', '').lower() in ('true', '1', 'yes'),
             nombre=nombre,
             apellido=apellido,
             email=email,
-            puesto=puesto
+            puesto=puesto,
+            salario_min=request.args.get('salario_min'),
+            salario_max=request.args.get('salario_max'),
+            fecha_desde=request.args.get('fecha_desde'),
+            fecha_hasta=request.args.get('fecha_hasta')
+        )
+        
+        return jsonify(resultado), 200
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/exportar', methods=['GET'])
+@swag_from('../../docs/swagger/exportar_empleados.yml')
+def exportar_empleados():
+    try:
+        empleados = service.exportar_empleados(
+            nombre=request.args.get('nombre'),
+            apellido=request.args.get('apellido'),
+            email=request.args.get('email'),
+            puesto=request.args.get('puesto'),
+            salario_min=request.args.get('salario_min'),
+            salario_max=request.args.get('salario_max'),
+            fecha_desde=request.args.get('fecha_desde'),
+            fecha_hasta=request.args.get('fecha_hasta')
+        )
+        lineas = (json.dumps(empleado, ensure_ascii=False) + '\n' for empleado in empleados)
+        return Response(lineas, mimetype='application/x-ndjson')
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/lote', methods=['GET'])
+@swag_from('../../docs/swagger/obtener_empleados_lote.yml')
+def obtener_empleados_lote():
+    try:
+        ids = [empleado_id.strip() for empleado_id in request.args.get('ids', '').split(',') if empleado_id.strip()]
+        resultado = service.obtener_empleados_lote(ids)
+        return jsonify(resultado), 200
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/buscar', methods=['GET'])
+@swag_from('../../docs/swagger/buscar_empleados.yml')
+def buscar_empleados():
+    try:
+        resultado = service.buscar_empleados(request.args.get('q'), limite=request.args.get('limite', 10))
+        return jsonify(resultado), 200
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/autocompletar', methods=['GET'])
+@swag_from('../../docs/swagger/autocompletar_empleados.yml')
+def autocompletar_empleados():
+    try:
+        resultado = service.autocompletar(request.args.get('q'), limite=request.args.get('limite', 10))
+        return jsonify(resultado), 200
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/cambios-salario', methods=['GET'])
+@swag_from('../../docs/swagger/cambios_salario.yml')
+def listar_cambios_salario():
+    try:
+        resultado = service.listar_cambios_salario(
+            desde=request.args.get('desde'),
+            hasta=request.args.get('hasta'),
+            solo_aumentos=request.args.get('solo_aumentos', '').lower() in ('true', '1', 'yes'),
+            pagina=request.args.get('pagina', 1),
+            por_pagina=request.args.get('por_pagina', 100)
         )
+        return jsonify(resultado), 200
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
         
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/<string:empleado_id>/historial-salarios', methods=['GET'])
+@swag_from('../../docs/swagger/historial_salarios.yml')
+def obtener_historial_salarios(empleado_id):
+    try:
+        resultado = service.obtener_historial_salarios(empleado_id, fecha=request.args.get('fecha'))
         return jsonify(resultado), 200
         
+    except EmpleadoNoEncontrado as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
+        
     except DatosInvalidos as e:
         return jsonify({
             'error': str(e)
         }), 400
         
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
     except Exception as e:
         return jsonify({
             'error': 'Error interno del servidor'
@@ -88,6 +337,19 @@ def obtener_empleado(empleado_id):
             'error': str(e)
         }), 404
         
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
     except Exception as e:
         return jsonify({
             'error': 'Error interno del servidor'
@@ -119,11 +381,111 @@ def actualizar_empleado(empleado_id):
             'error': str(e)
         }), 409
         
-    except (DatosInvalidos, ErrorBaseDatos) as e:
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e),
+            'errores': e.errores
+        }), 400
+        
+    except ErrorBaseDatos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+    
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/bulk', methods=['PATCH'])
+@swag_from('../../docs/swagger/actualizar_empleados_masivo.yml')
+def actualizar_empleados_masivo():
+    try:
+        datos = request.json
+        if not datos:
+            return jsonify({'error': 'No se proporcionaron datos'}), 400
+        
+        resultado = service.actualizar_empleados_masivo(datos)
+        return jsonify(resultado), 200
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except ErrorBaseDatos as e:
         return jsonify({
             'error': str(e)
         }), 400
     
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@employees_bp.route('/ajuste-salarial/simular', methods=['POST'])
+@swag_from('../../docs/swagger/simular_ajuste_salarial.yml')
+def simular_ajuste_salarial():
+    try:
+        datos = request.json
+        if not datos:
+            return jsonify({'error': 'No se proporcionaron datos'}), 400
+        
+        resultado = service.simular_ajuste_salarial(datos)
+        return jsonify(resultado), 200
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e),
+            'errores': e.errores
+        }), 400
+        
+    except ErrorBaseDatos as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+    
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
     except Exception as e:
         return jsonify({
             'error': 'Error interno del servidor'
@@ -146,6 +508,19 @@ def eliminar_empleado(empleado_id):
             'error': str(e)
         }), 404
         
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
     except Exception as e:
         return jsonify({
             'error': 'Error interno del servidor'
@@ -159,6 +534,19 @@ def obtener_estadisticas():
         estadisticas = service.obtener_estadisticas()
         return jsonify(estadisticas), 200
         
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
     except Exception as e:
         return jsonify({
             'error': 'Error interno del servidor'
@@ -174,10 +562,24 @@ def promedio_salarios_empresa():
         return jsonify({
             'promedio_salarios': promedio,
             'descripcion': 'Promedio salarial de toda la empresa',
-            'moneda': 'ARS',
-            'fecha_calculo': datetime.now().strftime('%d/%m/%Y %H:%M')
+            'moneda': moneda_empresa(),
+            'fecha_calculo': datetime.now().strftime('%d/%m/%Y %H:%M'),
+            'antiguedad_datos_segundos': service.antiguedad_datos()
         }), 200
         
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
     except Exception as e:
         return jsonify({
             'error': 'Error interno del servidor'
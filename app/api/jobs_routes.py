@@ -0,0 +1,182 @@
+from flask import Blueprint, request, jsonify
+from flasgger import swag_from
+from app.api.employees_routes import service as employees_service
+from app.services.jobs_service import JobsService
+from app.common.errors import JobNoEncontrado, DatosInvalidos, LimiteExcedido, ErrorBaseDatos, ErrorConexion, PlazoAgotado
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+service = JobsService(employees_service)
+
+
+@jobs_bp.route('', methods=['POST'])
+@swag_from('../../docs/swagger/crear_job.yml')
+def crear_job():
+    try:
+        datos = request.json
+        if not datos:
+            return jsonify({'error': 'No se proporcionaron datos'}), 400
+        
+        job = service.crear_job(datos.get('tipo'), datos.get('datos'))
+        
+        respuesta = jsonify({
+            'mensaje': 'Job creado exitosamente',
+            'job_id': str(job._id),
+            'job': job.to_dict()
+        })
+        respuesta.headers['Location'] = f'/api/jobs/{job._id}'
+        return respuesta, 202
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except LimiteExcedido as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 429
+        
+    except ErrorBaseDatos as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+    
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@jobs_bp.route('/<string:job_id>', methods=['GET'])
+@swag_from('../../docs/swagger/obtener_job.yml')
+def obtener_job(job_id):
+    try:
+        job = service.obtener_job(job_id)
+        return jsonify(job.to_dict()), 200
+        
+    except JobNoEncontrado as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@jobs_bp.route('/<string:job_id>/cancelar', methods=['POST'])
+@swag_from('../../docs/swagger/cancelar_job.yml')
+def cancelar_job(job_id):
+    try:
+        job = service.cancelar_job(job_id)
+        return jsonify({
+            'mensaje': 'Cancelacion solicitada',
+            'job': job.to_dict()
+        }), 202
+        
+    except JobNoEncontrado as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
+        
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@jobs_bp.route('/<string:job_id>/reanudar', methods=['POST'])
+@swag_from('../../docs/swagger/reanudar_job.yml')
+def reanudar_job(job_id):
+    try:
+        job = service.reanudar_job(job_id)
+        respuesta = jsonify({
+            'mensaje': 'Job reanudado',
+            'job': job.to_dict()
+        })
+        respuesta.headers['Location'] = f'/api/jobs/{job._id}'
+        return respuesta, 202
+        
+    except JobNoEncontrado as e:
+        return jsonify({
+            'error': str(e)
+        }), 404
+        
+    except DatosInvalidos as e:
+        return jsonify({
+            'error': str(e)
+        }), 400
+        
+    except LimiteExcedido as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 429
+        
+    except ErrorBaseDatos as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+    
+    except PlazoAgotado as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
+    
+    except ErrorConexion as e:
+        respuesta = jsonify({
+            'error': str(e)
+        })
+        if e.reintentar_en:
+            respuesta.headers['Retry-After'] = str(e.reintentar_en)
+        return respuesta, 503
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
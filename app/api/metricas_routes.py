@@ -0,0 +1,17 @@
+from flask import Blueprint, jsonify
+from flasgger import swag_from
+from app.common import metricas
+
+metricas_bp = Blueprint('metricas', __name__, url_prefix='/api/metricas')
+
+
+@metricas_bp.route('', methods=['GET'])
+@swag_from('../../docs/swagger/metricas.yml')
+def obtener_metricas():
+    try:
+        return jsonify(metricas.recolectar()), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
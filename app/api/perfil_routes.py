@@ -0,0 +1,52 @@
+from flask import Blueprint, request, jsonify, Response, current_app
+from flasgger import swag_from
+from app.common.perfilado import CABECERA_TOKEN
+
+perfil_bp = Blueprint('perfil', __name__, url_prefix='/api/perfil')
+
+
+def _no_autorizado():
+    return jsonify({
+        'error': f'Se requiere una cabecera {CABECERA_TOKEN} valida'
+    }), 403
+
+
+@perfil_bp.route('/muestras', methods=['GET'])
+@swag_from('../../docs/swagger/perfil_muestras.yml')
+def obtener_muestras():
+    try:
+        perfilador = current_app.extensions['perfilado']
+        if not perfilador.autorizado():
+            return _no_autorizado()
+
+        reiniciar = request.args.get('reiniciar', '').lower() in ('true', '1', 'yes')
+        return Response(perfilador.muestreador.volcar(reiniciar=reiniciar), mimetype='text/plain'), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
+
+
+@perfil_bp.route('/muestreo', methods=['POST'])
+@swag_from('../../docs/swagger/perfil_muestreo.yml')
+def cambiar_muestreo():
+    try:
+        perfilador = current_app.extensions['perfilado']
+        if not perfilador.autorizado():
+            return _no_autorizado()
+
+        datos = request.get_json(silent=True) or {}
+        if not isinstance(datos.get('activo'), bool):
+            return jsonify({'error': 'El campo activo es obligatorio y debe ser booleano'}), 400
+
+        if datos['activo']:
+            perfilador.muestreador.iniciar()
+        else:
+            perfilador.muestreador.detener()
+        return jsonify(perfilador.muestreador.metricas()), 200
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
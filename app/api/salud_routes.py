@@ -0,0 +1,38 @@
+from flask import Blueprint, jsonify, current_app
+from flasgger import swag_from
+from app.api.employees_routes import service
+
+salud_bp = Blueprint('salud', __name__, url_prefix='/health')
+
+
+@salud_bp.route('/live', methods=['GET'])
+@swag_from('../../docs/swagger/salud_live.yml')
+def estado_vivo():
+    # Solo indica que el proceso atiende solicitudes: no consulta la base ni espera al calentamiento
+    return jsonify({
+        'estado': 'vivo'
+    }), 200
+
+
+@salud_bp.route('/ready', methods=['GET'])
+@swag_from('../../docs/swagger/salud_ready.yml')
+def estado_listo():
+    try:
+        calentamiento = current_app.extensions['calentamiento']
+        indices = {
+            nombre: indice.listo.is_set()
+            for nombre, indice in (('busqueda', service.busqueda), ('autocompletado', service.autocompletado), ('analitica', service.analitica))
+            if indice
+        }
+        listo = calentamiento.terminado.is_set() and all(indices.values())
+
+        return jsonify({
+            'listo': listo,
+            'calentamiento': calentamiento.metricas(),
+            'indices': indices
+        }), 200 if listo else 503
+
+    except Exception as e:
+        return jsonify({
+            'error': 'Error interno del servidor'
+        }), 500
@@ -0,0 +1,228 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import request, g, jsonify
+from app.common.errors import ErrorConexion, LimiteExcedido
+from app.common import metricas, contexto
+
+
+LECTURA = 'lectura'
+ESCRITURA = 'escritura'
+AGREGACION = 'agregacion'
+
+ENDPOINTS_AGREGACION = {
+    'obtener_estadisticas',
+    'promedio_salarios_empresa',
+    'exportar_empleados',
+    'listar_cambios_salario',
+    'simular_ajuste_salarial'
+}
+BLUEPRINTS_CONTROLADOS = {'employees', 'employees_empresa', 'jobs'}
+MAX_EMPRESAS_CONTROLADAS = 10000
+
+
+class LimitadorConcurrencia:
+
+    def __init__(self, limite, max_cola):
+        self.limite = max(1, limite)
+        self.max_cola = max(0, max_cola)
+        self._condicion = threading.Condition()
+        self._en_curso = 0
+        self._en_cola = 0
+        self._admitidos = 0
+        self._rechazados = 0
+
+    def adquirir(self, espera_max):
+        with self._condicion:
+            if self._en_curso < self.limite and not self._en_cola:
+                self._en_curso += 1
+                self._admitidos += 1
+                return True
+            if self._en_cola >= self.max_cola:
+                self._rechazados += 1
+                return False
+
+            self._en_cola += 1
+            try:
+                vence = time.monotonic() + espera_max
+                while self._en_curso >= self.limite:
+                    restante = vence - time.monotonic()
+                    if restante <= 0:
+                        self._rechazados += 1
+                        return False
+                    self._condicion.wait(restante)
+                self._en_curso += 1
+                self._admitidos += 1
+                return True
+            finally:
+                self._en_cola -= 1
+
+    def liberar(self):
+        with self._condicion:
+            self._en_curso -= 1
+            self._condicion.notify()
+
+    def metricas(self):
+        with self._condicion:
+            return {
+                'limite': self.limite,
+                'en_curso': self._en_curso,
+                'en_cola': self._en_cola,
+                'admitidos': self._admitidos,
+                'rechazados': self._rechazados
+            }
+
+
+class LimitadorTasa:
+
+    def __init__(self, tasa_por_segundo, rafaga, max_clientes=10000, reloj=time.monotonic):
+        self.tasa = tasa_por_segundo
+        self.rafaga = max(1, rafaga)
+        self.max_clientes = max_clientes
+        self._reloj = reloj
+        self._baldes = OrderedDict()
+        self._lock = threading.Lock()
+        self._rechazados = 0
+
+    def consumir(self, cliente):
+        # Devuelve 0 si se admite o los segundos a esperar hasta tener un token
+        ahora = self._reloj()
+        with self._lock:
+            tokens, ultima = self._baldes.pop(cliente, (self.rafaga, ahora))
+            tokens = min(self.rafaga, tokens + (ahora - ultima) * self.tasa)
+
+            if tokens >= 1:
+                espera = 0
+                tokens -= 1
+            else:
+                espera = (1 - tokens) / self.tasa
+                self._rechazados += 1
+
+            self._baldes[cliente] = (tokens, ahora)
+            while len(self._baldes) > self.max_clientes:
+                self._baldes.popitem(last=False)
+            return espera
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'tasa_por_segundo': self.tasa,
+                'rafaga': self.rafaga,
+                'clientes': len(self._baldes),
+                'rechazados': self._rechazados
+            }
+
+
+def clasificar(endpoint, metodo):
+    if (endpoint or '').rpartition('.')[2] in ENDPOINTS_AGREGACION:
+        return AGREGACION
+    if metodo in ('POST', 'PUT', 'PATCH', 'DELETE'):
+        return ESCRITURA
+    return LECTURA
+
+
+class ControlAdmision:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.habilitado = app.config.get('ADMISION_HABILITADA', True)
+        self.espera_max = app.config.get('ADMISION_ESPERA_MAX_MS', 200) / 1000
+        self.reintentar_en = app.config.get('ADMISION_REINTENTAR_EN', 1)
+        self.limitadores = {
+            clase: LimitadorConcurrencia(limite, app.config.get('ADMISION_MAX_COLA', 64))
+            for clase, limite in (
+                (LECTURA, app.config.get('ADMISION_MAX_LECTURAS', 32)),
+                (ESCRITURA, app.config.get('ADMISION_MAX_ESCRITURAS', 16)),
+                (AGREGACION, app.config.get('ADMISION_MAX_AGREGACIONES', 4))
+            )
+        }
+        self.max_por_empresa = app.config.get('ADMISION_MAX_POR_EMPRESA', 0)
+        self.max_cola = app.config.get('ADMISION_MAX_COLA', 64)
+        self.limitadores_empresa = OrderedDict()
+        self._lock_empresas = threading.Lock()
+        tasa = app.config.get('ADMISION_TASA_POR_CLIENTE', 0)
+        self.limitador_tasa = LimitadorTasa(tasa, app.config.get('ADMISION_RAFAGA_POR_CLIENTE', 20)) if tasa > 0 else None
+
+        app.before_request(self._admitir)
+        app.after_request(self._liberar_al_cerrar)
+        app.teardown_request(self._liberar)
+        app.extensions['admision'] = self
+        metricas.registrar('admision', self.metricas)
+
+    def _admitir(self):
+        if not self.habilitado or request.blueprint not in BLUEPRINTS_CONTROLADOS:
+            return None
+
+        if self.limitador_tasa:
+            cliente = request.headers.get('X-Client-Id') or request.remote_addr or 'anonimo'
+            espera = self.limitador_tasa.consumir(cliente)
+            if espera:
+                return self._rechazar(LimiteExcedido("Demasiadas solicitudes, intente mas tarde", reintentar_en=math.ceil(espera)))
+
+        # El cupo por empresa evita que una empresa grande ocupe todos los cupos globales
+        adquiridos = []
+        limitador_empresa = self._limitador_empresa(contexto.empresa_actual())
+        if limitador_empresa:
+            if not limitador_empresa.adquirir(self.espera_max):
+                return self._rechazar(ErrorConexion("La empresa supero su limite de solicitudes concurrentes", reintentar_en=self.reintentar_en))
+            adquiridos.append(limitador_empresa)
+
+        clase = clasificar(request.endpoint, request.method)
+        limitador = self.limitadores[clase]
+        if not limitador.adquirir(self.espera_max):
+            self._liberar_todos(adquiridos)
+            return self._rechazar(ErrorConexion("Servicio sobrecargado, intente mas tarde", reintentar_en=self.reintentar_en))
+        adquiridos.append(limitador)
+
+        g.admision_limitadores = adquiridos
+        return None
+
+    def _limitador_empresa(self, empresa_id):
+        if self.max_por_empresa <= 0:
+            return None
+        with self._lock_empresas:
+            limitador = self.limitadores_empresa.pop(empresa_id, None)
+            if limitador is None:
+                limitador = LimitadorConcurrencia(self.max_por_empresa, self.max_cola)
+            self.limitadores_empresa[empresa_id] = limitador
+            while len(self.limitadores_empresa) > MAX_EMPRESAS_CONTROLADAS:
+                self.limitadores_empresa.popitem(last=False)
+            return limitador
+
+    def _liberar_al_cerrar(self, respuesta):
+        # En respuestas en streaming el cupo se mantiene hasta terminar de enviar el cuerpo
+        if respuesta.is_streamed:
+            limitadores = g.pop('admision_limitadores', None)
+            if limitadores:
+                respuesta.call_on_close(lambda: self._liberar_todos(limitadores))
+        return respuesta
+
+    def _liberar(self, error=None):
+        self._liberar_todos(g.pop('admision_limitadores', None) or [])
+
+    @staticmethod
+    def _liberar_todos(limitadores):
+        for limitador in reversed(limitadores):
+            limitador.liberar()
+
+    @staticmethod
+    def _rechazar(error):
+        respuesta = jsonify({'error': str(error)})
+        respuesta.status_code = error.codigo_estado
+        if error.reintentar_en:
+            respuesta.headers['Retry-After'] = str(error.reintentar_en)
+        return respuesta
+
+    def metricas(self):
+        datos = {clase: limitador.metricas() for clase, limitador in self.limitadores.items()}
+        if self.limitador_tasa:
+            datos['tasa'] = self.limitador_tasa.metricas()
+        if self.max_por_empresa > 0:
+            with self._lock_empresas:
+                limitadores = list(self.limitadores_empresa.items())
+            datos['empresas'] = {empresa_id: limitador.metricas() for empresa_id, limitador in limitadores}
+        return datos
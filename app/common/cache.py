@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+AUSENTE = object()
+
+
+class CacheLRU:
+    def __init__(self, capacidad=1000, ttl=30, ttl_negativo=5, reloj=time.monotonic):
+        self.capacidad = max(1, int(capacidad))
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self._reloj = reloj
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self._generacion = 0
+        self._aciertos = 0
+        self._aciertos_negativos = 0
+        self._fallos = 0
+        self._expirados = 0
+        self._desalojos = 0
+        self._invalidaciones = 0
+
+    def obtener(self, clave):
+        # Devuelve el valor, AUSENTE si se cacheo como inexistente o None si no esta
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return None
+
+            valor, vence = entrada
+            if vence <= self._reloj():
+                del self._entradas[clave]
+                self._expirados += 1
+                self._fallos += 1
+                return None
+
+            self._entradas.move_to_end(clave)
+            if valor is AUSENTE:
+                self._aciertos_negativos += 1
+            else:
+                self._aciertos += 1
+            return valor
+
+    def marca(self):
+        with self._lock:
+            return self._generacion
+
+    def guardar(self, clave, valor, marca=None):
+        # Si hubo invalidaciones desde la marca tomada antes de leer la base, el valor puede estar viejo
+        ttl = self.ttl_negativo if valor is AUSENTE else self.ttl
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            if marca is not None and marca != self._generacion:
+                return
+
+            self._entradas[clave] = (valor, self._reloj() + ttl)
+            self._entradas.move_to_end(clave)
+
+            while len(self._entradas) > self.capacidad:
+                self._entradas.popitem(last=False)
+                self._desalojos += 1
+
+    def guardar_ausente(self, clave, marca=None):
+        self.guardar(clave, AUSENTE, marca)
+
+    def invalidar(self, clave):
+        with self._lock:
+            self._generacion += 1
+            self._invalidaciones += 1
+            self._entradas.pop(clave, None)
+
+    def limpiar(self):
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+
+    def metricas(self):
+        with self._lock:
+            consultas = self._aciertos + self._aciertos_negativos + self._fallos
+            aciertos_totales = self._aciertos + self._aciertos_negativos
+            return {
+                'tamano': len(self._entradas),
+                'capacidad': self.capacidad,
+                'aciertos': self._aciertos,
+                'aciertos_negativos': self._aciertos_negativos,
+                'fallos': self._fallos,
+                'expirados': self._expirados,
+                'desalojos': self._desalojos,
+                'invalidaciones': self._invalidaciones,
+                'ratio_aciertos': round(aciertos_totales / consultas, 4) if consultas else 0.0
+            }
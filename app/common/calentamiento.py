@@ -0,0 +1,65 @@
+import threading
+import time
+from app.common import metricas
+
+
+class Calentamiento:
+    # Pasos que se ejecutan una vez al arrancar para que las primeras solicitudes no paguen conexiones, indices
+    # fuera de cache ni la generacion de la especificacion. Un paso que falla no detiene a los demas
+    PENDIENTE = 'pendiente'
+    EN_CURSO = 'en_curso'
+    TERMINADO = 'terminado'
+
+    def __init__(self, app=None):
+        self._pasos = []
+        self._resultados = {}
+        self._lock = threading.Lock()
+        self.terminado = threading.Event()
+        self.estado = Calentamiento.PENDIENTE
+        self._duracion = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.habilitado = app.config.get('CALENTAMIENTO_HABILITADO', True)
+        app.extensions['calentamiento'] = self
+        metricas.registrar('calentamiento', self.metricas)
+
+    def agregar(self, nombre, paso):
+        self._pasos.append((nombre, paso))
+
+    def iniciar(self):
+        # En segundo plano: /health/live responde desde el principio y /health/ready recien al terminar
+        if not self.habilitado:
+            self.estado = Calentamiento.TERMINADO
+            self.terminado.set()
+            return None
+        hilo = threading.Thread(target=self.ejecutar, name='peopleflow-calentamiento', daemon=True)
+        hilo.start()
+        return hilo
+
+    def ejecutar(self):
+        self.estado = Calentamiento.EN_CURSO
+        inicio = time.monotonic()
+        for nombre, paso in self._pasos:
+            comienzo = time.monotonic()
+            try:
+                resultado = {'resultado': paso()}
+            except Exception as e:
+                print(f"Error en el paso de calentamiento {nombre}: {e}")
+                resultado = {'error': str(e)}
+            resultado['segundos'] = round(time.monotonic() - comienzo, 3)
+            with self._lock:
+                self._resultados[nombre] = resultado
+        self._duracion = round(time.monotonic() - inicio, 3)
+        self.estado = Calentamiento.TERMINADO
+        self.terminado.set()
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'estado': self.estado,
+                'habilitado': self.habilitado,
+                'segundos': self._duracion,
+                'pasos': dict(self._resultados)
+            }
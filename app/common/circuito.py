@@ -0,0 +1,105 @@
+import math
+import threading
+import time
+from app.common.errors import ErrorConexion
+
+
+class Circuito:
+    # Corta las llamadas a una dependencia caida: tras umbral_fallos fallos consecutivos se abre y rechaza
+    # al instante; pasada la espera deja pasar una sola llamada de prueba que lo cierra o lo vuelve a abrir
+    CERRADO = 'cerrado'
+    ABIERTO = 'abierto'
+    SEMIABIERTO = 'semiabierto'
+
+    def __init__(self, nombre, umbral_fallos=5, espera_segundos=10, es_fallo=None, habilitado=True, reloj=time.monotonic):
+        self.nombre = nombre
+        self.umbral_fallos = max(1, umbral_fallos)
+        self.espera_segundos = espera_segundos
+        self.es_fallo = es_fallo or (lambda error: True)
+        self.habilitado = habilitado
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        with self._lock:
+            self.estado = Circuito.CERRADO
+            self._fallos_consecutivos = 0
+            self._abierto_hasta = 0
+            self._prueba_en_curso = False
+            self._aperturas = 0
+            self._rechazadas = 0
+            self._ultimo_error = None
+
+    def llamar(self, funcion, *args, **kwargs):
+        if not self.habilitado:
+            return self._convertir(funcion, *args, **kwargs)
+        self.permitir()
+        try:
+            resultado = funcion(*args, **kwargs)
+        except Exception as e:
+            if self.es_fallo(e):
+                self._registrar_fallo(e)
+                raise ErrorConexion(f"Error de conexión con {self.nombre}: {e}") from e
+            # La dependencia respondio (p. ej. un email duplicado o el fin de un cursor): no es un fallo
+            self._registrar_exito()
+            raise
+        self._registrar_exito()
+        return resultado
+
+    def _convertir(self, funcion, *args, **kwargs):
+        try:
+            return funcion(*args, **kwargs)
+        except Exception as e:
+            if self.es_fallo(e):
+                raise ErrorConexion(f"Error de conexión con {self.nombre}: {e}") from e
+            raise
+
+    def permitir(self):
+        with self._lock:
+            if self.estado == Circuito.ABIERTO:
+                restante = self._abierto_hasta - self._reloj()
+                if restante > 0:
+                    self._rechazar(restante)
+                self.estado = Circuito.SEMIABIERTO
+                self._prueba_en_curso = False
+            if self.estado == Circuito.SEMIABIERTO:
+                if self._prueba_en_curso:
+                    self._rechazar(1)
+                self._prueba_en_curso = True
+
+    def _rechazar(self, restante):
+        self._rechazadas += 1
+        raise ErrorConexion(f"{self.nombre} no disponible, intente mas tarde", reintentar_en=math.ceil(restante))
+
+    def _registrar_exito(self):
+        # Camino rapido sin lock para el caso normal: cerrado y sin fallos pendientes
+        if self.estado == Circuito.CERRADO and not self._fallos_consecutivos:
+            return
+        with self._lock:
+            self.estado = Circuito.CERRADO
+            self._fallos_consecutivos = 0
+            self._prueba_en_curso = False
+
+    def _registrar_fallo(self, error):
+        with self._lock:
+            self._fallos_consecutivos += 1
+            self._ultimo_error = str(error)
+            if self.estado == Circuito.SEMIABIERTO or self._fallos_consecutivos >= self.umbral_fallos:
+                if self.estado != Circuito.ABIERTO:
+                    self._aperturas += 1
+                self.estado = Circuito.ABIERTO
+                self._abierto_hasta = self._reloj() + self.espera_segundos
+                self._prueba_en_curso = False
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'estado': self.estado,
+                'habilitado': self.habilitado,
+                'fallos_consecutivos': self._fallos_consecutivos,
+                'aperturas': self._aperturas,
+                'rechazadas': self._rechazadas,
+                'reintentar_en': max(0, math.ceil(self._abierto_hasta - self._reloj())) if self.estado == Circuito.ABIERTO else 0,
+                'ultimo_error': self._ultimo_error
+            }
@@ -0,0 +1,141 @@
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+TIPOS_COMPRIMIBLES = ('application/json', 'application/x-ndjson', 'text/')
+
+
+class _CompresorGzip:
+    def __init__(self, nivel):
+        self._compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+    def comprimir(self, datos, vaciar=False):
+        salida = self._compresor.compress(datos)
+        if vaciar:
+            salida += self._compresor.flush(zlib.Z_SYNC_FLUSH)
+        return salida
+
+    def finalizar(self):
+        return self._compresor.flush()
+
+
+class _CompresorBrotli:
+    def __init__(self, nivel):
+        self._compresor = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, datos, vaciar=False):
+        salida = self._compresor.process(datos)
+        if vaciar:
+            salida += self._compresor.flush()
+        return salida
+
+    def finalizar(self):
+        return self._compresor.finish()
+
+
+class _CompresorZstd:
+    def __init__(self, nivel):
+        self._compresor = zstandard.ZstdCompressor(level=nivel).compressobj()
+
+    def comprimir(self, datos, vaciar=False):
+        salida = self._compresor.compress(datos)
+        if vaciar:
+            salida += self._compresor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return salida
+
+    def finalizar(self):
+        return self._compresor.flush()
+
+
+def crear_compresor(codificacion, nivel):
+    if codificacion == 'br':
+        return _CompresorBrotli(nivel)
+    if codificacion == 'zstd':
+        return _CompresorZstd(nivel)
+    return _CompresorGzip(nivel)
+
+
+def codificaciones_disponibles():
+    disponibles = []
+    if zstandard is not None:
+        disponibles.append('zstd')
+    if brotli is not None:
+        disponibles.append('br')
+    disponibles.append('gzip')
+    return disponibles
+
+
+class Compresion:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.habilitada = app.config.get('COMPRESION_HABILITADA', True)
+        self.min_bytes = app.config.get('COMPRESION_MIN_BYTES', 1024)
+        self.niveles = {
+            'gzip': app.config.get('COMPRESION_NIVEL_GZIP', 6),
+            'br': app.config.get('COMPRESION_NIVEL_BROTLI', 4),
+            'zstd': app.config.get('COMPRESION_NIVEL_ZSTD', 3)
+        }
+        self.codificaciones = codificaciones_disponibles()
+        app.after_request(self._comprimir_respuesta)
+        app.extensions['compresion'] = self
+
+    def _comprimir_respuesta(self, respuesta):
+        if not self.habilitada or not self._es_comprimible(respuesta):
+            return respuesta
+
+        respuesta.vary.add('Accept-Encoding')
+        codificacion = request.accept_encodings.best_match(self.codificaciones)
+        if not codificacion:
+            return respuesta
+
+        compresor = crear_compresor(codificacion, self.niveles[codificacion])
+        if respuesta.is_streamed:
+            respuesta.response = self._comprimir_flujo(respuesta.response, compresor)
+            respuesta.headers.pop('Content-Length', None)
+        else:
+            datos = respuesta.get_data()
+            if len(datos) < self.min_bytes:
+                return respuesta
+            respuesta.set_data(compresor.comprimir(datos) + compresor.finalizar())
+
+        respuesta.headers['Content-Encoding'] = codificacion
+        return respuesta
+
+    def _es_comprimible(self, respuesta):
+        if respuesta.status_code < 200 or respuesta.status_code in (204, 304):
+            return False
+        if request.method == 'HEAD' or respuesta.direct_passthrough:
+            return False
+        if 'Content-Encoding' in respuesta.headers:
+            return False
+        tipo = respuesta.mimetype or ''
+        return any(tipo.startswith(comprimible) for comprimible in TIPOS_COMPRIMIBLES)
+
+    @staticmethod
+    def _comprimir_flujo(fragmentos, compresor):
+        # Cada fragmento se envia apenas se genera para no frenar el streaming
+        try:
+            for fragmento in fragmentos:
+                if isinstance(fragmento, str):
+                    fragmento = fragmento.encode('utf-8')
+                salida = compresor.comprimir(fragmento, vaciar=True)
+                if salida:
+                    yield salida
+            yield compresor.finalizar()
+        finally:
+            if hasattr(fragmentos, 'close'):
+                fragmentos.close()
@@ -0,0 +1,120 @@
+import re
+import time
+from contextvars import ContextVar
+from bson.timestamp import Timestamp
+from flask import request, g, jsonify
+from app.config import Config
+
+
+CABECERA_TIEMPO_OPERACION = 'X-Tiempo-Operacion'
+CABECERA_EMPRESA = 'X-Empresa-Id'
+CABECERA_PLAZO = 'X-Plazo-Ms'
+
+_PATRON_EMPRESA = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+tiempo_operacion = ContextVar('tiempo_operacion', default=None)
+empresa = ContextVar('empresa', default=None)
+# Instante (time.monotonic) en que vence la solicitud actual; None sin plazo
+plazo = ContextVar('plazo', default=None)
+
+
+def empresa_actual():
+    return empresa.get() or Config.EMPRESA_POR_DEFECTO
+
+
+def moneda_empresa():
+    return Config.EMPRESAS_MONEDA.get(empresa_actual(), Config.EMPRESA_MONEDA)
+
+
+def plazo_restante():
+    # Segundos que le quedan a la solicitud actual, o None si no tiene plazo
+    vence = plazo.get()
+    return None if vence is None else vence - time.monotonic()
+
+
+def plazo_agotado():
+    restante = plazo_restante()
+    return restante is not None and restante <= 0
+
+
+def plazo_de_solicitud(endpoint, cabecera):
+    # Milisegundos pedidos por el cliente (acotados a PLAZO_MAX_MS) o el valor por defecto de la ruta; 0 sin plazo
+    if cabecera is not None:
+        milisegundos = int(cabecera)
+        if milisegundos <= 0:
+            raise ValueError(cabecera)
+        return min(milisegundos, Config.PLAZO_MAX_MS) if Config.PLAZO_MAX_MS else milisegundos
+    ruta = (endpoint or '').rsplit('.', 1)[-1]
+    return Config.PLAZOS_RUTA.get(ruta, Config.PLAZO_POR_DEFECTO_MS)
+
+
+def registrar_tiempo_operacion(tiempo):
+    if tiempo is None:
+        return
+    actual = tiempo_operacion.get()
+    if actual is None or tiempo > actual:
+        tiempo_operacion.set(tiempo)
+
+
+def serializar_tiempo(tiempo):
+    return f"{tiempo.time}.{tiempo.inc}"
+
+
+def parsear_tiempo(valor):
+    try:
+        segundos, incremento = valor.split('.', 1)
+        return Timestamp(int(segundos), int(incremento))
+    except (AttributeError, ValueError, TypeError, OverflowError):
+        return None
+
+
+class ContextoSolicitud:
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.url_value_preprocessor(self._extraer_empresa)
+        app.before_request(self._iniciar)
+        app.after_request(self._publicar)
+        app.teardown_request(self._finalizar)
+        app.extensions['contexto_solicitud'] = self
+
+    @staticmethod
+    def _extraer_empresa(endpoint, valores):
+        # Las rutas /api/empresas/<empresa>/... no reciben la empresa como argumento
+        if valores and 'empresa' in valores:
+            g.empresa_ruta = valores.pop('empresa')
+
+    def _iniciar(self):
+        # Los hilos del servidor se reutilizan entre solicitudes, por eso siempre se reinicia
+        tiempo_operacion.set(parsear_tiempo(request.headers.get(CABECERA_TIEMPO_OPERACION)))
+        empresa.set(None)
+        plazo.set(None)
+        try:
+            milisegundos = plazo_de_solicitud(request.endpoint, request.headers.get(CABECERA_PLAZO))
+        except ValueError:
+            return jsonify({'error': f'La cabecera {CABECERA_PLAZO} debe ser un entero positivo de milisegundos'}), 400
+        if milisegundos:
+            plazo.set(time.monotonic() + milisegundos / 1000)
+
+        empresa_id = g.pop('empresa_ruta', None) or request.headers.get(CABECERA_EMPRESA)
+        if empresa_id is None:
+            return None
+        if not _PATRON_EMPRESA.fullmatch(empresa_id):
+            return jsonify({'error': 'El identificador de empresa no es valido'}), 400
+        empresa.set(empresa_id)
+        return None
+
+    @staticmethod
+    def _finalizar(error=None):
+        # Fuera de una solicitud (scripts, jobs nuevos, tests) vuelve a regir la empresa por defecto y no hay plazo
+        empresa.set(None)
+        plazo.set(None)
+
+    def _publicar(self, respuesta):
+        tiempo = tiempo_operacion.get()
+        if tiempo is not None:
+            respuesta.headers[CABECERA_TIEMPO_OPERACION] = serializar_tiempo(tiempo)
+        return respuesta
@@ -20,8 +20,10 @@ class EmailYaExiste(EmployeeError):
 class DatosInvalidos(EmployeeError):
     def __init__(self, errores):
         if isinstance(errores, list):
+            self.errores = errores
             mensaje = "; ".join(errores)
         else:
+            self.errores = [str(errores)]
             mensaje = str(errores)
         super().__init__(f"Datos invalidos: {mensaje}", 400)
 
@@ -33,11 +35,18 @@ class ErrorBaseDatos(EmployeeError):
 
 
 class ErrorConexion(EmployeeError):
-    def __init__(self):
-        mensaje = "Error de conexión con la base de datos"
+    def __init__(self, mensaje=None, reintentar_en=None):
+        self.reintentar_en = reintentar_en
+        mensaje = mensaje or "Error de conexión con la base de datos"
         super().__init__(mensaje, 503)
 
 
+class PlazoAgotado(EmployeeError):
+    def __init__(self, mensaje=None):
+        mensaje = mensaje or "Se agoto el plazo de la solicitud antes de completar la operacion"
+        super().__init__(mensaje, 504)
+
+
 class CamposRequeridos(EmployeeError):
     def __init__(self, campos_faltantes):
         if isinstance(campos_faltantes, list):
@@ -45,4 +54,15 @@ class CamposRequeridos(EmployeeError):
         else:
             campos = str(campos_faltantes)
         mensaje = f"Campos requeridos faltantes: {campos}"
-        super().__init__(mensaje, 400)
\ No newline at end of file
+        super().__init__(mensaje, 400)
+
+class LimiteExcedido(EmployeeError):
+    def __init__(self, mensaje, reintentar_en=None):
+        self.reintentar_en = reintentar_en
+        super().__init__(mensaje, 429)
+
+
+class JobNoEncontrado(EmployeeError):
+    def __init__(self, job_id):
+        mensaje = f"Job con ID {job_id} no encontrado"
+        super().__init__(mensaje, 404)
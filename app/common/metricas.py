@@ -0,0 +1,16 @@
+import threading
+
+
+_proveedores = {}
+_lock = threading.Lock()
+
+
+def registrar(nombre, proveedor):
+    with _lock:
+        _proveedores[nombre] = proveedor
+
+
+def recolectar():
+    with _lock:
+        proveedores = list(_proveedores.items())
+    return {nombre: proveedor() for nombre, proveedor in proveedores}
@@ -0,0 +1,23 @@
+import base64
+import binascii
+from bson import json_util
+from bson.errors import InvalidBSON
+from app.common.errors import DatosInvalidos
+
+
+def codificar_cursor(orden, valor, object_id):
+    datos = json_util.dumps({'o': orden, 'v': valor, 'id': object_id})
+    return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(token, orden):
+    try:
+        relleno = '=' * (-len(token) % 4)
+        datos = json_util.loads(base64.urlsafe_b64decode(token + relleno).decode('utf-8'))
+        valor, object_id = datos['v'], datos['id']
+        cursor_orden = datos['o']
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, InvalidBSON):
+        raise DatosInvalidos("El cursor no es valido")
+    if cursor_orden != orden:
+        raise DatosInvalidos("El cursor no corresponde al orden solicitado")
+    return valor, object_id
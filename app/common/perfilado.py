@@ -0,0 +1,195 @@
+import cProfile
+import hmac
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from flask import request, g, jsonify, Response
+from app.common import metricas
+
+
+CABECERA_PERFIL = 'X-Perfil'
+CABECERA_TOKEN = 'X-Perfil-Token'
+FORMATOS = ('texto', 'pstats')
+
+
+class MuestreadorPilas:
+    # Perfilado por muestreo: cada intervalo copia la pila de los hilos que estan atendiendo una solicitud y cuenta
+    # cada pila colapsada ("endpoint;modulo:funcion;..."), el formato que leen flamegraph.pl y speedscope.
+    # No instrumenta el codigo: el costo es una lectura de sys._current_frames() por intervalo
+
+    def __init__(self, intervalo_ms=10, max_pilas=5000, max_profundidad=128):
+        self.intervalo = intervalo_ms / 1000
+        self.max_pilas = max_pilas
+        self.max_profundidad = max_profundidad
+        self._hilos = {}
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+        self._hilo = None
+        self.reiniciar()
+
+    @property
+    def activo(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def iniciar(self):
+        with self._lock:
+            if self.activo:
+                return
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._muestrear, name='peopleflow-muestreo', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo:
+            self._detener.set()
+            hilo.join()
+
+    def reiniciar(self):
+        with self._lock:
+            self._pilas = Counter()
+            self._muestras = 0
+            self._descartadas = 0
+            self._desde = time.time()
+
+    def entrar(self, raiz):
+        self._hilos[threading.get_ident()] = raiz
+
+    def salir(self):
+        self._hilos.pop(threading.get_ident(), None)
+
+    def _muestrear(self):
+        while not self._detener.wait(self.intervalo):
+            marcos = sys._current_frames()
+            pilas = [
+                self._colapsar(raiz, marcos[ident])
+                for ident, raiz in list(self._hilos.items()) if ident in marcos
+            ]
+            with self._lock:
+                for pila in pilas:
+                    # Con el limite alcanzado solo se siguen contando las pilas ya conocidas
+                    if pila in self._pilas or len(self._pilas) < self.max_pilas:
+                        self._pilas[pila] += 1
+                    else:
+                        self._descartadas += 1
+                self._muestras += len(pilas)
+
+    def _colapsar(self, raiz, marco):
+        funciones = []
+        while marco is not None and len(funciones) < self.max_profundidad:
+            funciones.append(f"{marco.f_globals.get('__name__', '?')}:{marco.f_code.co_name}")
+            marco = marco.f_back
+        if marco is not None:
+            funciones.append('...')
+        return ';'.join([raiz, *reversed(funciones)])
+
+    def volcar(self, reiniciar=False):
+        with self._lock:
+            pilas = self._pilas.most_common()
+        if reiniciar:
+            self.reiniciar()
+        return ''.join(f"{pila} {cantidad}\n" for pila, cantidad in pilas)
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'activo': self.activo,
+                'intervalo_ms': round(self.intervalo * 1000, 3),
+                'muestras': self._muestras,
+                'pilas': len(self._pilas),
+                'descartadas': self._descartadas,
+                'desde': self._desde,
+                'solicitudes_en_curso': len(self._hilos)
+            }
+
+
+class Perfilador:
+    # Perfil de una sola solicitud con cProfile (cabecera X-Perfil o ?perfil=texto|pstats) y muestreo continuo de
+    # todas las solicitudes. Ambos requieren X-Perfil-Token igual a PERFILADO_TOKEN; sin token configurado no existen
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.token = (app.config.get('PERFILADO_TOKEN') or '').encode()
+        self.max_filas = app.config.get('PERFILADO_MAX_FILAS', 60)
+        self.muestreador = MuestreadorPilas(
+            intervalo_ms=app.config.get('PERFILADO_MUESTREO_INTERVALO_MS', 10),
+            max_pilas=app.config.get('PERFILADO_MUESTREO_MAX_PILAS', 5000),
+            max_profundidad=app.config.get('PERFILADO_MUESTREO_MAX_PROFUNDIDAD', 128)
+        )
+        # cProfile no admite dos perfiles activos a la vez en el proceso (Python 3.12+): uno por vez
+        self._lock_perfil = threading.Lock()
+        self._perfiles = 0
+        app.before_request(self._iniciar)
+        app.after_request(self._responder)
+        app.teardown_request(self._finalizar)
+        app.extensions['perfilado'] = self
+        metricas.registrar('perfilado', self.metricas)
+        if self.token and app.config.get('PERFILADO_MUESTREO_HABILITADO', False):
+            self.muestreador.iniciar()
+
+    def autorizado(self):
+        token = request.headers.get(CABECERA_TOKEN, '').encode()
+        return bool(self.token) and hmac.compare_digest(token, self.token)
+
+    def _iniciar(self):
+        if self.muestreador.activo:
+            self.muestreador.entrar(request.endpoint or request.path)
+
+        formato = request.headers.get(CABECERA_PERFIL) or request.args.get('perfil')
+        if not formato or not self.token:
+            return None
+        if not self.autorizado():
+            return jsonify({'error': f'Se requiere una cabecera {CABECERA_TOKEN} valida para perfilar la solicitud'}), 403
+        if formato not in FORMATOS:
+            return jsonify({'error': f"Formato de perfil invalido, opciones: {', '.join(FORMATOS)}"}), 400
+        if not self._lock_perfil.acquire(blocking=False):
+            return jsonify({'error': 'Ya hay una solicitud perfilandose, intente de nuevo'}), 409
+
+        perfil = cProfile.Profile()
+        g.perfil = (formato, perfil, time.perf_counter())
+        perfil.enable()
+        return None
+
+    def _responder(self, respuesta):
+        # Las after_request se ejecutan en orden inverso: este corre antes que la compresion
+        if 'perfil' not in g:
+            return respuesta
+        formato, perfil, inicio = g.pop('perfil')
+        perfil.disable()
+        self._perfiles += 1
+        self._lock_perfil.release()
+
+        if formato == 'pstats':
+            # Mismo contenido que Stats.dump_stats: se abre con pstats, snakeviz o gprof2dot
+            perfil.create_stats()
+            resultado = Response(marshal.dumps(perfil.stats), mimetype='application/octet-stream')
+            resultado.headers['Content-Disposition'] = 'attachment; filename=perfil.pstats'
+        else:
+            salida = io.StringIO()
+            pstats.Stats(perfil, stream=salida).sort_stats('cumulative').print_stats(self.max_filas)
+            resultado = Response(salida.getvalue(), mimetype='text/plain')
+        resultado.headers['X-Perfil-Estado'] = str(respuesta.status_code)
+        resultado.headers['X-Perfil-Duracion-Ms'] = str(round((time.perf_counter() - inicio) * 1000, 3))
+        return resultado
+
+    def _finalizar(self, error=None):
+        self.muestreador.salir()
+        # Una excepcion sin manejar puede saltearse _responder: el perfil no debe quedar activo
+        if 'perfil' in g:
+            g.pop('perfil')[1].disable()
+            self._lock_perfil.release()
+
+    def metricas(self):
+        return {
+            'habilitado': bool(self.token),
+            'perfiles_por_solicitud': self._perfiles,
+            'muestreo': self.muestreador.metricas()
+        }
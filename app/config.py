@@ -3,6 +3,22 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+
+def _mapa_empresas(valor):
+    # "acme:USD,globex:EUR" -> {'acme': 'USD', 'globex': 'EUR'}
+    mapa = {}
+    for par in (valor or '').split(','):
+        empresa, _, dato = par.partition(':')
+        if empresa.strip() and dato.strip():
+            mapa[empresa.strip()] = dato.strip()
+    return mapa
+
+
+def _mapa_enteros(valor):
+    # "listar_empleados:3000,exportar_empleados:0" -> {'listar_empleados': 3000, 'exportar_empleados': 0}
+    return {clave: int(dato) for clave, dato in _mapa_empresas(valor).items()}
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY')
     if not SECRET_KEY:
@@ -12,14 +28,113 @@ class Config:
     if not MONGO_URI:
         raise ValueError("MONGODB_URI debe estar definida en las variables de entorno")
     
+    # mongo en produccion; memoria para pruebas y desarrollo sin base (un solo proceso)
+    REPOSITORIO_BACKEND = os.environ.get('REPOSITORIO_BACKEND', 'mongo')
+    
+    # Tiempos de espera de MongoDB en ms; MONGO_MAX_TIME_MS limita cada lectura en el servidor (0 sin limite)
+    MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '2000'))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '2000'))
+    MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '10000'))
+    MONGO_MAX_TIME_MS = int(os.environ.get('MONGO_MAX_TIME_MS', '5000'))
+    # Lecturas por lotes (exportacion, ajustes, carga de indices e instantaneas)
+    MONGO_MAX_TIME_MS_LOTES = int(os.environ.get('MONGO_MAX_TIME_MS_LOTES', '0'))
+    # Conexiones que el pool mantiene abiertas; el calentamiento las abre al arrancar
+    MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '10'))
+    
+    # Calentamiento al arrancar: /health/ready responde 503 hasta que termina
+    CALENTAMIENTO_HABILITADO = os.environ.get('CALENTAMIENTO_HABILITADO', 'True').lower() in ('true', '1', 'yes')
+    # Entradas que se leen del principio de cada indice para traerlo a la cache de WiredTiger
+    CALENTAMIENTO_DOCUMENTOS_INDICE = int(os.environ.get('CALENTAMIENTO_DOCUMENTOS_INDICE', '1000'))
+    
+    # Plazo de cada solicitud en ms (cabecera X-Plazo-Ms o valor por ruta); 0 sin plazo
+    PLAZO_POR_DEFECTO_MS = int(os.environ.get('PLAZO_POR_DEFECTO_MS', '10000'))
+    PLAZO_MAX_MS = int(os.environ.get('PLAZO_MAX_MS', '60000'))
+    PLAZOS_RUTA = _mapa_enteros(os.environ.get(
+        'PLAZOS_RUTA',
+        'listar_empleados:3000,obtener_empleado:2000,obtener_empleados_lote:2000,buscar_empleados:2000,'
+        'autocompletar_empleados:1000,obtener_estadisticas:5000,exportar_empleados:0'
+    ))
+    
+    # Circuito de la base: se abre tras N fallos de conexion consecutivos y responde 503 hasta la proxima prueba
+    CIRCUITO_HABILITADO = os.environ.get('CIRCUITO_HABILITADO', 'True').lower() in ('true', '1', 'yes')
+    CIRCUITO_UMBRAL_FALLOS = int(os.environ.get('CIRCUITO_UMBRAL_FALLOS', '5'))
+    CIRCUITO_ESPERA_SEGUNDOS = float(os.environ.get('CIRCUITO_ESPERA_SEGUNDOS', '10'))
+    
+    # Perfilado bajo demanda; sin PERFILADO_TOKEN queda deshabilitado
+    PERFILADO_TOKEN = os.environ.get('PERFILADO_TOKEN', '')
+    PERFILADO_MAX_FILAS = int(os.environ.get('PERFILADO_MAX_FILAS', '60'))
+    PERFILADO_MUESTREO_HABILITADO = os.environ.get('PERFILADO_MUESTREO_HABILITADO', 'False').lower() in ('true', '1', 'yes')
+    PERFILADO_MUESTREO_INTERVALO_MS = float(os.environ.get('PERFILADO_MUESTREO_INTERVALO_MS', '10'))
+    PERFILADO_MUESTREO_MAX_PILAS = int(os.environ.get('PERFILADO_MUESTREO_MAX_PILAS', '5000'))
+    PERFILADO_MUESTREO_MAX_PROFUNDIDAD = int(os.environ.get('PERFILADO_MUESTREO_MAX_PROFUNDIDAD', '128'))
+    
     DEBUG = os.environ.get('DEBUG', 'False').lower() in ('true', '1', 'yes')
     TESTING = os.environ.get('TESTING', 'False').lower() in ('true', '1', 'yes')
     API_VERSION = os.environ.get('API_VERSION', 'v1')
     DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', '10'))
     MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', '100'))
+    MAX_IDS_LOTE = int(os.environ.get('MAX_IDS_LOTE', '100'))
+    MAX_ITEMS_BULK = int(os.environ.get('MAX_ITEMS_BULK', '10000'))
+    TAMANO_LOTE_BULK = int(os.environ.get('TAMANO_LOTE_BULK', '500'))
+    
+    JOBS_MAX_CONCURRENTES = int(os.environ.get('JOBS_MAX_CONCURRENTES', '2'))
+    JOBS_MAX_EN_COLA = int(os.environ.get('JOBS_MAX_EN_COLA', '10'))
+    JOBS_MAX_ITEMS = int(os.environ.get('JOBS_MAX_ITEMS', '100000'))
+    JOBS_MAX_ERRORES = int(os.environ.get('JOBS_MAX_ERRORES', '100'))
 
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', SECRET_KEY)
-    EMPRESA_MONEDA = 'ARS'
+    EMPRESA_MONEDA = os.environ.get('EMPRESA_MONEDA', 'ARS')
+    EMPRESA_POR_DEFECTO = os.environ.get('EMPRESA_POR_DEFECTO', 'default')
+    EMPRESAS_MONEDA = _mapa_empresas(os.environ.get('EMPRESAS_MONEDA'))
+    EMPRESAS_COLECCION_DEDICADA = _mapa_empresas(os.environ.get('EMPRESAS_COLECCION_DEDICADA'))
     FECHA_FORMATO = '%d/%m/%Y'
     FECHA_HORA_FORMATO = '%d/%m/%Y %H:%M'
-    
\ No newline at end of file
+    VALIDACION_ESQUEMA_ACCION = os.environ.get('VALIDACION_ESQUEMA_ACCION', 'error')
+    
+    LECTURAS_EN_SECUNDARIOS = os.environ.get('LECTURAS_EN_SECUNDARIOS', 'False').lower() in ('true', '1', 'yes')
+    PREFERENCIA_LECTURA_SECUNDARIA = os.environ.get('PREFERENCIA_LECTURA_SECUNDARIA', 'secondaryPreferred')
+    MAX_STALENESS_SEGUNDOS = int(os.environ.get('MAX_STALENESS_SEGUNDOS', '90'))
+    
+    CACHE_EMPLEADOS_HABILITADO = os.environ.get('CACHE_EMPLEADOS_HABILITADO', 'False').lower() in ('true', '1', 'yes')
+    CACHE_EMPLEADOS_CAPACIDAD = int(os.environ.get('CACHE_EMPLEADOS_CAPACIDAD', '1000'))
+    CACHE_EMPLEADOS_TTL = float(os.environ.get('CACHE_EMPLEADOS_TTL', '30'))
+    CACHE_EMPLEADOS_TTL_NEGATIVO = float(os.environ.get('CACHE_EMPLEADOS_TTL_NEGATIVO', '5'))
+    
+    BUSQUEDA_HABILITADA = os.environ.get('BUSQUEDA_HABILITADA', 'True').lower() in ('true', '1', 'yes')
+    BUSQUEDA_MAX_DOCUMENTOS = int(os.environ.get('BUSQUEDA_MAX_DOCUMENTOS', '2000000'))
+    BUSQUEDA_SIMILITUD_MINIMA = float(os.environ.get('BUSQUEDA_SIMILITUD_MINIMA', '0.3'))
+    BUSQUEDA_MAX_RESULTADOS = int(os.environ.get('BUSQUEDA_MAX_RESULTADOS', '50'))
+    AUTOCOMPLETADO_HABILITADO = os.environ.get('AUTOCOMPLETADO_HABILITADO', 'True').lower() in ('true', '1', 'yes')
+    AUTOCOMPLETADO_MAX_RESULTADOS = int(os.environ.get('AUTOCOMPLETADO_MAX_RESULTADOS', '20'))
+    
+    ANALITICA_HABILITADA = os.environ.get('ANALITICA_HABILITADA', 'True').lower() in ('true', '1', 'yes')
+    ANALITICA_REFRESCO_SEGUNDOS = int(os.environ.get('ANALITICA_REFRESCO_SEGUNDOS', '300'))
+    
+    FACETAS_BANDAS_SALARIO = [float(limite) for limite in os.environ.get('FACETAS_BANDAS_SALARIO', '0,250000,500000,1000000,2000000').split(',') if limite.strip()]
+    CACHE_FACETAS_CAPACIDAD = int(os.environ.get('CACHE_FACETAS_CAPACIDAD', '256'))
+    CACHE_FACETAS_TTL = float(os.environ.get('CACHE_FACETAS_TTL', '60'))
+    CACHE_CONTEOS_CAPACIDAD = int(os.environ.get('CACHE_CONTEOS_CAPACIDAD', '1024'))
+    CACHE_CONTEOS_TTL = float(os.environ.get('CACHE_CONTEOS_TTL', '10'))
+    CONTEO_ESTIMADO_HABILITADO = os.environ.get('CONTEO_ESTIMADO_HABILITADO', 'True').lower() in ('true', '1', 'yes')
+    
+    ESCRITURA_AGRUPADA_HABILITADA = os.environ.get('ESCRITURA_AGRUPADA_HABILITADA', 'False').lower() in ('true', '1', 'yes')
+    ESCRITURA_AGRUPADA_MAX_ESPERA_MS = float(os.environ.get('ESCRITURA_AGRUPADA_MAX_ESPERA_MS', '5'))
+    ESCRITURA_AGRUPADA_MAX_LOTE = int(os.environ.get('ESCRITURA_AGRUPADA_MAX_LOTE', '100'))
+    
+    COMPRESION_HABILITADA = os.environ.get('COMPRESION_HABILITADA', 'True').lower() in ('true', '1', 'yes')
+    COMPRESION_MIN_BYTES = int(os.environ.get('COMPRESION_MIN_BYTES', '1024'))
+    COMPRESION_NIVEL_GZIP = int(os.environ.get('COMPRESION_NIVEL_GZIP', '6'))
+    COMPRESION_NIVEL_BROTLI = int(os.environ.get('COMPRESION_NIVEL_BROTLI', '4'))
+    COMPRESION_NIVEL_ZSTD = int(os.environ.get('COMPRESION_NIVEL_ZSTD', '3'))
+    TAMANO_LOTE_EXPORTACION = int(os.environ.get('TAMANO_LOTE_EXPORTACION', '1000'))
+    
+    ADMISION_HABILITADA = os.environ.get('ADMISION_HABILITADA', 'True').lower() in ('true', '1', 'yes')
+    ADMISION_MAX_LECTURAS = int(os.environ.get('ADMISION_MAX_LECTURAS', '32'))
+    ADMISION_MAX_ESCRITURAS = int(os.environ.get('ADMISION_MAX_ESCRITURAS', '16'))
+    ADMISION_MAX_AGREGACIONES = int(os.environ.get('ADMISION_MAX_AGREGACIONES', '4'))
+    ADMISION_MAX_COLA = int(os.environ.get('ADMISION_MAX_COLA', '64'))
+    ADMISION_ESPERA_MAX_MS = float(os.environ.get('ADMISION_ESPERA_MAX_MS', '200'))
+    ADMISION_REINTENTAR_EN = int(os.environ.get('ADMISION_REINTENTAR_EN', '1'))
+    ADMISION_TASA_POR_CLIENTE = float(os.environ.get('ADMISION_TASA_POR_CLIENTE', '0'))
+    ADMISION_RAFAGA_POR_CLIENTE = int(os.environ.get('ADMISION_RAFAGA_POR_CLIENTE', '20'))
+    ADMISION_MAX_POR_EMPRESA = int(os.environ.get('ADMISION_MAX_POR_EMPRESA', '0'))
@@ -1,14 +1,180 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import pymongo
 from pymongo import MongoClient
+from pymongo.errors import ConnectionFailure, ExecutionTimeout, PyMongoError
+from pymongo.uri_parser import parse_uri
 from dotenv import load_dotenv
+from app.config import Config
+from app.common import metricas, contexto
+from app.common.circuito import Circuito
+from app.common.errors import PlazoAgotado
 
 load_dotenv()
 
+_clientes = {}
+_lock_clientes = threading.Lock()
+
 def get_database():
     main_uri = os.environ.get('MONGODB_URI')
     if not main_uri:
         raise ValueError("MONGODB_URI debe estar definida en las variables de entorno")
     
-    client = MongoClient(main_uri)
-    db_name = main_uri.split('/')[-1] if '/' in main_uri else 'peopleflow'
-    return client[db_name]
\ No newline at end of file
+    db_name = parse_uri(main_uri).get('database') or 'peopleflow'
+    return _cliente(main_uri)[db_name]
+
+
+def _cliente(uri):
+    # Un solo cliente (y pool de conexiones) por URI en el proceso, compartido por todos los repositorios
+    with _lock_clientes:
+        if uri not in _clientes:
+            # Sin estos limites una base caida deja cada solicitud esperando los 30 s por defecto del driver
+            _clientes[uri] = MongoClient(
+                uri,
+                connectTimeoutMS=Config.MONGO_CONNECT_TIMEOUT_MS,
+                serverSelectionTimeoutMS=Config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                socketTimeoutMS=Config.MONGO_SOCKET_TIMEOUT_MS,
+                minPoolSize=Config.MONGO_MIN_POOL_SIZE
+            )
+        return _clientes[uri]
+
+
+def abrir_conexiones(cantidad):
+    # El driver completa minPoolSize en segundo plano y de a poco; pings concurrentes abren las conexiones ya
+    if cantidad <= 0:
+        return 0
+    admin = get_database().client.admin
+    with ThreadPoolExecutor(max_workers=cantidad, thread_name_prefix='peopleflow-conexiones') as ejecutor:
+        list(ejecutor.map(lambda _: circuito.llamar(admin.command, 'ping'), range(cantidad)))
+    return cantidad
+
+
+def _es_fallo_conexion(error):
+    # Red, seleccion de servidor, cambio de primario o maxTimeMS agotado; un error de datos no cuenta
+    return isinstance(error, (ConnectionFailure, ExecutionTimeout))
+
+
+circuito = Circuito(
+    'MongoDB',
+    umbral_fallos=Config.CIRCUITO_UMBRAL_FALLOS,
+    espera_segundos=Config.CIRCUITO_ESPERA_SEGUNDOS,
+    es_fallo=_es_fallo_conexion,
+    habilitado=Config.CIRCUITO_HABILITADO
+)
+metricas.registrar('circuito_mongo', circuito.metricas)
+
+
+# Operaciones que van a la base al llamarlas; find y aggregate devuelven cursores que se protegen al iterar
+OPERACIONES = {
+    'insert_one', 'insert_many', 'update_one', 'update_many', 'replace_one', 'delete_one', 'delete_many',
+    'bulk_write', 'find_one', 'find_one_and_update', 'find_one_and_replace', 'find_one_and_delete',
+    'count_documents', 'estimated_document_count', 'distinct', 'create_index', 'drop'
+}
+# Lecturas que aceptan maxTimeMS (find y find_one lo reciben como max_time_ms)
+LECTURAS_CON_LIMITE = {
+    'count_documents', 'estimated_document_count', 'aggregate',
+    'find_one_and_update', 'find_one_and_replace', 'find_one_and_delete'
+}
+ENCADENABLES = {'sort', 'skip', 'limit', 'hint', 'batch_size', 'max_time_ms', 'collation', 'comment'}
+# Un corte por tiempo con menos de esto del plazo se atribuye al plazo (el driver corta antes si no alcanza el RTT)
+MARGEN_PLAZO_SEGUNDOS = 0.1
+
+
+def proteger(coleccion, max_time_ms=None):
+    return ColeccionProtegida(coleccion, circuito, Config.MONGO_MAX_TIME_MS if max_time_ms is None else max_time_ms)
+
+
+def _limite_lectura(max_time_ms):
+    # maxTimeMS de una lectura: el limite de la operacion o lo que queda del plazo de la solicitud, el menor
+    restante = contexto.plazo_restante()
+    if restante is None:
+        return max_time_ms
+    restante_ms = max(1, int(restante * 1000))
+    return restante_ms if max_time_ms is None else min(max_time_ms, restante_ms)
+
+
+def _llamar(circuito, funcion, args, kwargs, max_time_ms=None):
+    # Con plazo, la operacion corre dentro de pymongo.timeout: el driver acota seleccion de servidor, socket y
+    # maxTimeMS (tambien en escrituras) a lo que queda. Un corte por el plazo es PlazoAgotado, no un fallo de la base
+    restante = contexto.plazo_restante()
+    if restante is None:
+        return circuito.llamar(funcion, *args, **kwargs)
+    if restante <= 0:
+        raise PlazoAgotado()
+
+    def con_plazo():
+        try:
+            with pymongo.timeout(restante if max_time_ms is None else min(restante, max_time_ms / 1000)):
+                return funcion(*args, **kwargs)
+        except PyMongoError as e:
+            if e.timeout and contexto.plazo_restante() <= MARGEN_PLAZO_SEGUNDOS:
+                raise PlazoAgotado() from e
+            raise
+    return circuito.llamar(con_plazo)
+
+
+class ColeccionProtegida:
+    # Coleccion que pasa cada operacion por el circuito y limita las lecturas con maxTimeMS y el plazo de la
+    # solicitud. Un find(..., max_time_ms=None) explicito (lecturas por lotes) solo queda acotado por el plazo
+
+    def __init__(self, coleccion, circuito, max_time_ms):
+        self._coleccion = coleccion
+        self._circuito = circuito
+        self._max_time_ms = max_time_ms or None
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._coleccion, nombre)
+        if nombre not in OPERACIONES:
+            return atributo
+
+        def operacion(*args, **kwargs):
+            max_time_ms = None
+            if nombre == 'find_one':
+                max_time_ms = kwargs['max_time_ms'] = _limite_lectura(kwargs.get('max_time_ms', self._max_time_ms))
+            elif nombre in LECTURAS_CON_LIMITE:
+                max_time_ms = _limite_lectura(kwargs.get('maxTimeMS', self._max_time_ms))
+                if max_time_ms:
+                    kwargs['maxTimeMS'] = max_time_ms
+            return _llamar(self._circuito, atributo, args, kwargs, max_time_ms)
+        return operacion
+
+    def find(self, *args, **kwargs):
+        max_time_ms = kwargs.get('max_time_ms', self._max_time_ms)
+        kwargs['max_time_ms'] = _limite_lectura(max_time_ms)
+        return CursorProtegido(self._coleccion.find(*args, **kwargs), self._circuito, max_time_ms)
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        max_time_ms = _limite_lectura(kwargs.get('maxTimeMS', self._max_time_ms))
+        if max_time_ms:
+            kwargs['maxTimeMS'] = max_time_ms
+        cursor = _llamar(self._circuito, self._coleccion.aggregate, (pipeline, *args), kwargs, max_time_ms)
+        return CursorProtegido(cursor, self._circuito, max_time_ms)
+
+    def with_options(self, *args, **kwargs):
+        return ColeccionProtegida(self._coleccion.with_options(*args, **kwargs), self._circuito, self._max_time_ms)
+
+
+class CursorProtegido:
+    # El cursor va a la base al iterarlo (primer lote y getMore): cada avance pasa por el circuito y el plazo
+
+    def __init__(self, cursor, circuito, max_time_ms=None):
+        self._cursor = cursor
+        self._circuito = circuito
+        self._max_time_ms = max_time_ms
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self._cursor, nombre)
+        if nombre not in ENCADENABLES:
+            return atributo
+
+        def encadenar(*args, **kwargs):
+            atributo(*args, **kwargs)
+            return self
+        return encadenar
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return _llamar(self._circuito, next, (self._cursor,), {}, self._max_time_ms)
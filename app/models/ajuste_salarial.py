@@ -0,0 +1,108 @@
+import math
+import numpy as np
+from app.models.employee import salario_a_centavos
+from app.common.errors import DatosInvalidos
+
+
+TIPOS_REGLA = ('porcentaje', 'monto', 'minimo')
+MAX_REGLAS = 20
+
+
+def _numero(valor, campo, errores, indice):
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)) or math.isnan(valor) or math.isinf(valor):
+        errores.append(f"Regla {indice}: {campo} debe ser un numero valido")
+        return None
+    return valor
+
+
+def columnas(documentos):
+    # Salario en centavos (con el campo previo a la migracion como respaldo) y puesto de cada documento
+    salarios = np.fromiter(
+        (
+            documento['salario_centavos'] if documento.get('salario_centavos') is not None
+            else salario_a_centavos(documento.get('salario') or 0)
+            for documento in documentos
+        ),
+        dtype=np.int64,
+        count=len(documentos)
+    )
+    puestos = np.array([documento.get('puesto') for documento in documentos], dtype=object)
+    return salarios, puestos
+
+
+class AjusteSalarial:
+    # Reglas que se aplican en orden sobre el salario: las condiciones (puesto y rango salarial)
+    # se evaluan sobre el salario original y los efectos se acumulan
+
+    def __init__(self, reglas):
+        self.reglas = reglas
+
+    @classmethod
+    def desde_dict(cls, reglas):
+        if not isinstance(reglas, list) or not reglas:
+            raise DatosInvalidos("El ajuste necesita una lista de reglas no vacia")
+        if len(reglas) > MAX_REGLAS:
+            raise DatosInvalidos(f"Un ajuste no puede tener mas de {MAX_REGLAS} reglas")
+
+        errores = []
+        normalizadas = []
+        for indice, regla in enumerate(reglas):
+            if not isinstance(regla, dict):
+                errores.append(f"Regla {indice}: debe ser un objeto")
+                continue
+            tipo = regla.get('tipo')
+            if tipo not in TIPOS_REGLA:
+                errores.append(f"Regla {indice}: tipo invalido. Tipos disponibles: {', '.join(TIPOS_REGLA)}")
+                continue
+            valor = _numero(regla.get('valor'), 'valor', errores, indice)
+            salario_min = _numero(regla.get('salario_min'), 'salario_min', errores, indice)
+            salario_max = _numero(regla.get('salario_max'), 'salario_max', errores, indice)
+            puesto = regla.get('puesto')
+            if puesto is not None and not isinstance(puesto, str):
+                errores.append(f"Regla {indice}: puesto debe ser un texto")
+            if valor is None:
+                if 'valor' not in regla:
+                    errores.append(f"Regla {indice}: valor es obligatorio")
+                continue
+            if tipo == 'porcentaje' and not -100 < valor <= 1000:
+                errores.append(f"Regla {indice}: el porcentaje debe ser mayor a -100 y hasta 1000")
+            if tipo != 'porcentaje' and valor <= 0:
+                errores.append(f"Regla {indice}: el valor debe ser mayor a cero")
+            if salario_min is not None and salario_max is not None and salario_min > salario_max:
+                errores.append(f"Regla {indice}: salario_min no puede ser mayor a salario_max")
+            normalizadas.append({
+                'tipo': tipo,
+                'valor': valor if tipo == 'porcentaje' else salario_a_centavos(valor),
+                'puesto': puesto,
+                'salario_min': salario_a_centavos(salario_min) if salario_min is not None else None,
+                'salario_max': salario_a_centavos(salario_max) if salario_max is not None else None
+            })
+
+        if errores:
+            raise DatosInvalidos(errores)
+        return cls(normalizadas)
+
+    def aplicar(self, salarios, puestos):
+        # salarios: int64 en centavos; puestos: arreglo de objetos con el puesto de cada empleado
+        originales = np.asarray(salarios, dtype=np.int64)
+        puestos = np.asarray(puestos, dtype=object)
+        nuevos = originales.astype(np.float64)
+        for regla in self.reglas:
+            aplica = np.ones(len(originales), dtype=bool)
+            if regla['puesto'] is not None:
+                aplica &= puestos == regla['puesto']
+            if regla['salario_min'] is not None:
+                aplica &= originales >= regla['salario_min']
+            if regla['salario_max'] is not None:
+                aplica &= originales <= regla['salario_max']
+
+            if regla['tipo'] == 'porcentaje':
+                nuevos = np.where(aplica, nuevos * (100 + regla['valor']) / 100, nuevos)
+            elif regla['tipo'] == 'monto':
+                nuevos = np.where(aplica, nuevos + regla['valor'], nuevos)
+            else:
+                nuevos = np.where(aplica, np.maximum(nuevos, regla['valor']), nuevos)
+        # Redondeo al centavo mas cercano, con las mitades hacia arriba como salario_a_centavos
+        return np.maximum(np.floor(nuevos + 0.5), 1).astype(np.int64)
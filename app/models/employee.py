@@ -1,7 +1,18 @@
 from datetime import datetime
-from bson import ObjectId
-import re
-from app.common.errors import DatosInvalidos
+from decimal import Decimal, ROUND_HALF_UP
+from app.models.employee_validator import validador_empleado
+
+
+# Version 2: salario en centavos enteros y fecha de ingreso sin hora
+ESQUEMA_VERSION = 2
+
+
+def salario_a_centavos(salario):
+    return int((Decimal(str(salario)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def solo_fecha(fecha):
+    return datetime(fecha.year, fecha.month, fecha.day)
 
 
 class Employee:
@@ -12,7 +23,8 @@ class Employee:
         self.email = email
         self.puesto = puesto or "Empleado" 
         self.salario = salario
-        self.fecha_ingreso = fecha_ingreso or datetime.now()
+        fecha_ingreso = fecha_ingreso or datetime.now()
+        self.fecha_ingreso = solo_fecha(fecha_ingreso) if isinstance(fecha_ingreso, datetime) else fecha_ingreso
     
     def to_dict(self):
         return {
@@ -27,11 +39,12 @@ class Employee:
     
     def to_mongo_dict(self):
         datos = {
+            'esquema': ESQUEMA_VERSION,
             'nombre': self.nombre,
             'apellido': self.apellido,
             'email': self.email,
             'puesto': self.puesto,
-            'salario': self.salario,
+            'salario_centavos': salario_a_centavos(self.salario),
             'fecha_ingreso': self.fecha_ingreso
         }
         if self._id:
@@ -47,69 +60,29 @@ class Employee:
             except ValueError:
                 raise ValueError("Formato de fecha invalido. Use dd/mm/yyyy")
         
+        salario = datos.get('salario')
+        if datos.get('salario_centavos') is not None:
+            salario = datos['salario_centavos'] / 100
+        
         return cls(
             _id=datos.get('_id'),
             nombre=datos.get('nombre'),
             apellido=datos.get('apellido'),
             email=datos.get('email'),
             puesto=datos.get('puesto'),
-            salario=datos.get('salario'),
+            salario=salario,
             fecha_ingreso=fecha_ingreso
         )
     
+    @staticmethod
+    def campos_mongo(datos):
+        campos = dict(datos)
+        if 'salario' in campos:
+            campos['salario_centavos'] = salario_a_centavos(campos.pop('salario'))
+        if isinstance(campos.get('fecha_ingreso'), datetime):
+            campos['fecha_ingreso'] = solo_fecha(campos['fecha_ingreso'])
+        return campos
 
     @staticmethod
     def validar_campos(datos, validacion_completa=False):
-        if validacion_completa:
-            if 'nombre' not in datos: raise DatosInvalidos("El nombre es obligatorio")
-            if 'apellido' not in datos: raise DatosInvalidos("El apellido es obligatorio")
-            if 'email' not in datos: raise DatosInvalidos("El email es obligatorio")
-            if 'salario' not in datos: raise DatosInvalidos("El salario es obligatorio")
-        
-        if 'nombre' in datos:
-            Employee.validar_nombre(datos['nombre'])
-        if 'apellido' in datos:
-            Employee.validar_apellido(datos['apellido'])
-        if 'email' in datos:
-            Employee.validar_email(datos['email'])
-        if 'puesto' in datos:
-            Employee.validar_puesto(datos['puesto'])
-        if 'salario' in datos:
-            Employee.validar_salario(datos['salario'])
-        if 'fecha_ingreso' in datos:
-            Employee.validar_fecha(datos['fecha_ingreso'])
-    
-    @staticmethod
-    def validar_nombre(nombre):
-        if not nombre or not nombre.strip(): raise DatosInvalidos("El nombre no puede estar vacio")
-        if len(nombre.strip()) > 50: raise DatosInvalidos("El nombre no puede superar los 50 caracteres")
-    
-    @staticmethod
-    def validar_apellido(apellido):
-        if not apellido or not apellido.strip(): raise DatosInvalidos("El apellido no puede estar vacio")
-        if len(apellido.strip()) > 50: raise DatosInvalidos("El apellido no puede superar los 50 caracteres")
-    
-    @staticmethod
-    def validar_email(email):
-        if not email or not email.strip(): raise DatosInvalidos("El email no puede estar vacio")
-        if '@' not in email or '.' not in email: raise DatosInvalidos("El formato del email no es valido")
-    
-    @staticmethod
-    def validar_puesto(puesto):
-        if puesto and len(puesto.strip()) > 100: raise DatosInvalidos("El puesto no puede superar los 100 caracteres")
-    
-    @staticmethod
-    def validar_salario(salario):
-        if salario is None or salario == '': raise DatosInvalidos("El salario no puede estar vacio")
-        try:
-            if float(salario) <= 0: raise DatosInvalidos("El salario debe ser mayor a cero")
-        except: raise DatosInvalidos("El salario debe ser un numero valido")
-    
-    @staticmethod
-    def validar_fecha(fecha):
-        if fecha:
-            try:
-                fecha_obj = datetime.strptime(fecha, '%d/%m/%Y')
-                if fecha_obj.date() > datetime.now().date(): raise DatosInvalidos("La fecha de ingreso no puede ser futura")
-            except: raise DatosInvalidos("La fecha debe tener formato dd/mm/yyyy")
-    
+        return validador_empleado.validar(datos, validacion_completa)
@@ -0,0 +1,115 @@
+import math
+import re
+from datetime import datetime
+from app.common.errors import DatosInvalidos
+
+
+class _ErrorCampo(Exception):
+    pass
+
+
+_PATRON_FECHA = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+
+
+def _texto(etiqueta, maximo, obligatorio_no_vacio=True):
+    def normalizar(valor):
+        if valor is None or valor == '':
+            if obligatorio_no_vacio:
+                raise _ErrorCampo(f"El {etiqueta} no puede estar vacio")
+            return None
+        if not isinstance(valor, str):
+            raise _ErrorCampo(f"El {etiqueta} debe ser texto")
+        valor = valor.strip()
+        if not valor:
+            if obligatorio_no_vacio:
+                raise _ErrorCampo(f"El {etiqueta} no puede estar vacio")
+            return None
+        if len(valor) > maximo:
+            raise _ErrorCampo(f"El {etiqueta} no puede superar los {maximo} caracteres")
+        return valor
+    return normalizar
+
+
+def _email(valor):
+    if not isinstance(valor, str) or not valor.strip():
+        raise _ErrorCampo("El email no puede estar vacio")
+    valor = valor.strip().lower()
+    if '@' not in valor or '.' not in valor:
+        raise _ErrorCampo("El formato del email no es valido")
+    return valor
+
+
+def _salario(valor):
+    if valor is None or valor == '':
+        raise _ErrorCampo("El salario no puede estar vacio")
+    if isinstance(valor, bool):
+        raise _ErrorCampo("El salario debe ser un numero valido")
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        raise _ErrorCampo("El salario debe ser un numero valido")
+    if math.isnan(numero) or math.isinf(numero):
+        raise _ErrorCampo("El salario debe ser un numero valido")
+    if numero <= 0:
+        raise _ErrorCampo("El salario debe ser mayor a cero")
+    return numero
+
+
+def _fecha(valor):
+    if not valor:
+        return None
+    if isinstance(valor, datetime):
+        fecha = valor
+    else:
+        coincidencia = _PATRON_FECHA.fullmatch(valor) if isinstance(valor, str) else None
+        if not coincidencia:
+            raise _ErrorCampo("La fecha debe tener formato dd/mm/yyyy")
+        dia, mes, anio = coincidencia.groups()
+        try:
+            fecha = datetime(int(anio), int(mes), int(dia))
+        except ValueError:
+            raise _ErrorCampo("La fecha debe tener formato dd/mm/yyyy")
+    if fecha.date() > datetime.now().date():
+        raise _ErrorCampo("La fecha de ingreso no puede ser futura")
+    return fecha
+
+
+class ValidadorEmpleado:
+
+    def __init__(self, campos):
+        self._campos = tuple(campos)
+        self._obligatorios = tuple((nombre, mensaje) for nombre, _, mensaje in self._campos if mensaje)
+
+    def validar(self, datos, validacion_completa=False):
+        if not isinstance(datos, dict):
+            raise DatosInvalidos("Los datos deben ser un objeto JSON")
+
+        errores = []
+        if validacion_completa:
+            errores.extend(mensaje for nombre, mensaje in self._obligatorios if nombre not in datos)
+
+        payload = {}
+        for nombre, normalizar, _ in self._campos:
+            if nombre not in datos:
+                continue
+            try:
+                valor = normalizar(datos[nombre])
+            except _ErrorCampo as e:
+                errores.append(str(e))
+                continue
+            if valor is not None:
+                payload[nombre] = valor
+
+        if errores:
+            raise DatosInvalidos(errores)
+        return payload
+
+
+validador_empleado = ValidadorEmpleado([
+    ('nombre', _texto('nombre', 50), "El nombre es obligatorio"),
+    ('apellido', _texto('apellido', 50), "El apellido es obligatorio"),
+    ('email', _email, "El email es obligatorio"),
+    ('puesto', _texto('puesto', 100, obligatorio_no_vacio=False), None),
+    ('salario', _salario, "El salario es obligatorio"),
+    ('fecha_ingreso', _fecha, None),
+])
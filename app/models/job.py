@@ -0,0 +1,99 @@
+from datetime import datetime
+
+
+class Job:
+    PENDIENTE = 'pendiente'
+    EN_EJECUCION = 'en_ejecucion'
+    COMPLETADO = 'completado'
+    FALLIDO = 'fallido'
+    CANCELADO = 'cancelado'
+    FINALIZADOS = (COMPLETADO, FALLIDO, CANCELADO)
+
+    def __init__(self, tipo, total=0, estado=None, procesados=0, exitosos=0, con_errores=0,
+                 errores=None, cancelacion_solicitada=False, creado=None, iniciado=None,
+                 finalizado=None, mensaje=None, parametros=None, checkpoint=None, _id=None):
+        self._id = _id
+        self.tipo = tipo
+        self.estado = estado or Job.PENDIENTE
+        self.total = total
+        self.procesados = procesados
+        self.exitosos = exitosos
+        self.con_errores = con_errores
+        self.errores = errores or []
+        self.cancelacion_solicitada = cancelacion_solicitada
+        self.creado = creado or datetime.now()
+        self.iniciado = iniciado
+        self.finalizado = finalizado
+        self.mensaje = mensaje
+        # Solo los jobs reanudables guardan sus parametros y el ultimo _id procesado
+        self.parametros = parametros
+        self.checkpoint = checkpoint
+
+    def duracion_segundos(self):
+        if not self.iniciado:
+            return 0.0
+        fin = self.finalizado or datetime.now()
+        return max((fin - self.iniciado).total_seconds(), 0.0)
+
+    def to_dict(self):
+        duracion = self.duracion_segundos()
+        return {
+            'id': str(self._id) if self._id else None,
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'total': self.total,
+            'procesados': self.procesados,
+            'exitosos': self.exitosos,
+            'con_errores': self.con_errores,
+            'progreso': round(self.procesados * 100 / self.total, 2) if self.total else 0.0,
+            'items_por_segundo': round(self.procesados / duracion, 2) if duracion else 0.0,
+            'duracion_segundos': round(duracion, 3),
+            'errores': self.errores,
+            'cancelacion_solicitada': self.cancelacion_solicitada,
+            'mensaje': self.mensaje,
+            'reanudable': self.parametros is not None and self.estado in (Job.FALLIDO, Job.CANCELADO),
+            'creado': self.creado.isoformat() if self.creado else None,
+            'iniciado': self.iniciado.isoformat() if self.iniciado else None,
+            'finalizado': self.finalizado.isoformat() if self.finalizado else None
+        }
+
+    def to_mongo_dict(self):
+        datos = {
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'total': self.total,
+            'procesados': self.procesados,
+            'exitosos': self.exitosos,
+            'con_errores': self.con_errores,
+            'errores': self.errores,
+            'cancelacion_solicitada': self.cancelacion_solicitada,
+            'creado': self.creado,
+            'iniciado': self.iniciado,
+            'finalizado': self.finalizado,
+            'mensaje': self.mensaje,
+            'parametros': self.parametros,
+            'checkpoint': self.checkpoint
+        }
+        if self._id:
+            datos['_id'] = self._id
+        return datos
+
+    @classmethod
+    def from_dict(cls, datos):
+        return cls(
+            _id=datos.get('_id'),
+            tipo=datos.get('tipo'),
+            estado=datos.get('estado'),
+            total=datos.get('total', 0),
+            procesados=datos.get('procesados', 0),
+            exitosos=datos.get('exitosos', 0),
+            con_errores=datos.get('con_errores', 0),
+            errores=datos.get('errores'),
+            cancelacion_solicitada=datos.get('cancelacion_solicitada', False),
+            creado=datos.get('creado'),
+            iniciado=datos.get('iniciado'),
+            finalizado=datos.get('finalizado'),
+            mensaje=datos.get('mensaje'),
+            parametros=datos.get('parametros'),
+            checkpoint=datos.get('checkpoint')
+        )
@@ -0,0 +1,26 @@
+from app.config import Config
+from app.repository.employees_repository import EmployeesRepository
+from app.repository.jobs_repository import JobsRepository
+from app.repository.memoria import EmployeesRepositoryMemoria, JobsRepositoryMemoria
+
+
+# Backend -> (repositorio de empleados, repositorio de jobs)
+BACKENDS = {
+    'mongo': (EmployeesRepository, JobsRepository),
+    'memoria': (EmployeesRepositoryMemoria, JobsRepositoryMemoria)
+}
+
+
+def _clases(backend):
+    backend = backend or Config.REPOSITORIO_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de repositorio invalido: {backend}. Backends disponibles: {', '.join(BACKENDS)}")
+    return BACKENDS[backend]
+
+
+def crear_repositorio_empleados(backend=None):
+    return _clases(backend)[0]()
+
+
+def crear_repositorio_jobs(backend=None):
+    return _clases(backend)[1]()
@@ -0,0 +1,244 @@
+from abc import ABC, abstractmethod
+from app.models.employee import salario_a_centavos
+from app.config import Config
+from app.common import contexto
+from app.common.errors import ErrorBaseDatos, ErrorConexion, PlazoAgotado
+from app.common.paginacion import codificar_cursor
+
+
+# Campo de la API -> campo guardado, para los ordenamientos del listado
+CAMPOS_ORDEN = {
+    'apellido': 'apellido',
+    'nombre': 'nombre',
+    'salario': 'salario_centavos',
+    'fecha_ingreso': 'fecha_ingreso',
+    'puesto': 'puesto'
+}
+
+
+class RepositorioEmpleados(ABC):
+    # Contrato comun de los backends de empleados. Los filtros llegan con la forma que arma el servicio:
+    # igualdad, {"$regex", "$options"} y rangos {"$gte", "$lte"}; la empresa la agrega cada backend
+
+    def __init__(self, historial):
+        self.historial = historial
+        self.indices_memoria = []
+
+    @abstractmethod
+    def crear(self, empleado):
+        pass
+
+    @abstractmethod
+    def obtener_por_id(self, empleado_id):
+        pass
+
+    @abstractmethod
+    def obtener_por_ids(self, object_ids):
+        pass
+
+    @abstractmethod
+    def obtener_todos(self, filtros=None, pagina=1, por_pagina=10, orden=None, cursor=None):
+        pass
+
+    @abstractmethod
+    def iterar_todos(self, filtros=None, tamano_lote=1000):
+        pass
+
+    @abstractmethod
+    def actualizar(self, empleado_id, datos_actualizacion):
+        pass
+
+    @abstractmethod
+    def actualizar_masivo(self, actualizaciones):
+        pass
+
+    @abstractmethod
+    def emails_en_uso(self, emails):
+        pass
+
+    @abstractmethod
+    def eliminar(self, empleado_id):
+        pass
+
+    @abstractmethod
+    def contar(self, filtros=None):
+        pass
+
+    @abstractmethod
+    def contar_listado(self, filtros=None):
+        pass
+
+    @abstractmethod
+    def obtener_facetas(self, filtros=None):
+        pass
+
+    @abstractmethod
+    def proyeccion_empresa(self, campos):
+        pass
+
+    @abstractmethod
+    def obtener_promedio_salarios_empresa(self):
+        pass
+
+    @abstractmethod
+    def limites_ajuste_salarial(self, filtros):
+        pass
+
+    @abstractmethod
+    def lotes_ajuste_salarial(self, filtros, hasta_id, desde_id=None, tamano_lote=1000):
+        pass
+
+    @abstractmethod
+    def aplicar_ajuste_salarial(self, ajuste_id, cambios):
+        pass
+
+    @abstractmethod
+    def documentos_para_indices(self, indices=None):
+        pass
+
+    def calentar_indices(self, limite):
+        # Solo los backends con indices en disco tienen algo que calentar
+        return 0
+
+    def cursor_siguiente(self, empleado, orden=None):
+        campo = CAMPOS_ORDEN[orden[0]] if orden else None
+        valor = empleado.to_mongo_dict().get(campo) if campo else None
+        return codificar_cursor(self._nombre_orden(orden), valor, empleado._id)
+
+    @staticmethod
+    def _nombre_orden(orden):
+        if not orden:
+            return "_id"
+        return orden[0] if orden[1] == 1 else f"-{orden[0]}"
+
+    def agregar_indice_memoria(self, indice):
+        self.indices_memoria.append(indice)
+
+    def reiniciar_indices_memoria(self):
+        for indice in self.indices_memoria:
+            indice.reiniciar()
+
+    def _campos_indices(self, modificados):
+        # Campos que necesitan los indices afectados por una escritura de los campos modificados
+        return set().union(*(indice.campos for indice in self.indices_memoria if set(indice.campos) & set(modificados)))
+
+    def _indexar(self, documentos, modificados=None):
+        indices = [
+            indice for indice in self.indices_memoria
+            if modificados is None or set(indice.campos) & set(modificados)
+        ]
+        if not indices:
+            return
+        empresa_id = contexto.empresa_actual()
+        for documento in documentos:
+            for indice in indices:
+                indice.indexar(empresa_id, documento)
+
+    def _desindexar(self, object_id):
+        empresa_id = contexto.empresa_actual()
+        for indice in self.indices_memoria:
+            indice.quitar(empresa_id, object_id)
+
+    def _registrar_historial(self, cambios):
+        # El empleado ya quedo escrito: un fallo del historial no debe revertir la operacion
+        try:
+            self.historial.registrar(cambios)
+        except (ErrorBaseDatos, ErrorConexion, PlazoAgotado) as e:
+            print(f"Error al registrar historial de salarios: {e}")
+
+    @staticmethod
+    def _pendientes_ajuste(ajuste_id, cambios):
+        # Los empleados que ya tienen la marca del ajuste se escribieron en un intento anterior
+        return [(documento, nuevo) for documento, nuevo in cambios if (documento.get('ajuste_salarial') or {}).get('id') != ajuste_id]
+
+    def _registrar_ajuste(self, ajuste_id, cambios):
+        aplicados = []
+        for documento, nuevo in cambios:
+            marca = documento.get('ajuste_salarial') or {}
+            if marca.get('id') == ajuste_id:
+                # Escrito en un intento anterior: solo falta asegurar el historial y los indices
+                aplicados.append((documento, marca.get('salario_anterior_centavos'), self._salario_centavos(documento)))
+            else:
+                aplicados.append((documento, self._salario_centavos(documento), nuevo))
+
+        self.historial.registrar([(documento['_id'], anterior, nuevo) for documento, anterior, nuevo in aplicados], ajuste_id=ajuste_id)
+        self._indexar(
+            [dict(documento, salario_centavos=nuevo) for documento, _, nuevo in aplicados],
+            modificados={"salario_centavos"}
+        )
+        return len(aplicados)
+
+    @staticmethod
+    def _bandas_facetas():
+        return [salario_a_centavos(limite) for limite in sorted(set(Config.FACETAS_BANDAS_SALARIO))]
+
+    @staticmethod
+    def _formatear_facetas(resultado, bandas):
+        # resultado con la forma del $facet: grupos {_id, cantidad} por puesto, banda salarial y anio de ingreso
+        siguientes = dict(zip(bandas, bandas[1:]))
+        return {
+            'puesto': [{'valor': grupo['_id'], 'cantidad': grupo['cantidad']} for grupo in resultado['puesto']],
+            'banda_salarial': [
+                {
+                    'desde': grupo['_id'] / 100 if grupo['_id'] != 'fuera_de_rango' else bandas[-1] / 100,
+                    'hasta': siguientes[grupo['_id']] / 100 if grupo['_id'] in siguientes else None,
+                    'cantidad': grupo['cantidad']
+                }
+                for grupo in resultado['banda_salarial']
+            ],
+            'anio_ingreso': [{'valor': grupo['_id'], 'cantidad': grupo['cantidad']} for grupo in resultado['anio_ingreso']]
+        }
+
+    @staticmethod
+    def _salario_centavos(documento):
+        if documento.get('salario_centavos') is not None:
+            return documento['salario_centavos']
+        if documento.get('salario') is not None:
+            return salario_a_centavos(documento['salario'])
+        return None
+
+
+class RepositorioHistorialSalarios(ABC):
+
+    @abstractmethod
+    def registrar(self, cambios, ajuste_id=None):
+        pass
+
+    @abstractmethod
+    def obtener_por_empleado(self, empleado_id, hasta=None):
+        pass
+
+    @abstractmethod
+    def salario_a_fecha(self, empleado_id, fecha):
+        pass
+
+    @abstractmethod
+    def cambios_en_rango(self, desde, hasta, solo_aumentos=False, pagina=1, por_pagina=100):
+        pass
+
+
+class RepositorioJobs(ABC):
+
+    @abstractmethod
+    def crear(self, job):
+        pass
+
+    @abstractmethod
+    def obtener_por_id(self, job_id):
+        pass
+
+    @abstractmethod
+    def actualizar(self, job_id, campos, errores_nuevos=None, max_errores=100):
+        pass
+
+    @abstractmethod
+    def solicitar_cancelacion(self, job_id):
+        pass
+
+    @abstractmethod
+    def reanudar(self, job_id):
+        pass
+
+    @abstractmethod
+    def cancelacion_solicitada(self, job_id):
+        pass
@@ -1,34 +1,183 @@
+import threading
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from contextlib import contextmanager
 from bson import ObjectId
+from bson import json_util
 from bson.errors import InvalidId
-from pymongo.errors import DuplicateKeyError
-from app.models.employee import Employee
-from app.db import get_database
-from app.common.errors import EmpleadoNoEncontrado, EmailYaExiste, ErrorBaseDatos
+from pymongo import UpdateOne, ReturnDocument
+from pymongo.errors import DuplicateKeyError, BulkWriteError, OperationFailure
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Secondary, SecondaryPreferred, Nearest
+from app.models.employee import Employee, salario_a_centavos
+from app.db import get_database, proteger
+from app.config import Config
+from app.common.cache import CacheLRU, AUSENTE
+from app.repository.escritor_agrupado import EscritorAgrupado
+from app.repository.historial_salarios_repository import HistorialSalariosRepository
+from app.common.errors import EmpleadoNoEncontrado, EmailYaExiste, ErrorBaseDatos, ErrorConexion, PlazoAgotado
+from app.common import metricas, contexto
+from app.common.paginacion import decodificar_cursor
+from app.repository.base import RepositorioEmpleados, CAMPOS_ORDEN
 
 
-class EmployeesRepository:
+PREFERENCIAS_LECTURA = {
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+# Campos con filtros por rango en el listado
+CAMPOS_RANGO = ('salario_centavos', 'fecha_ingreso')
+
+
+def _indice_orden(campo):
+    # Igualdad (empresa), orden (campo y desempate por _id) y al final los rangos,
+    # para descartar documentos con las claves del indice sin leerlos
+    claves = [("empresa_id", 1)] + ([(campo, 1)] if campo else []) + [("_id", 1)]
+    claves += [(rango, 1) for rango in CAMPOS_RANGO if rango != campo]
+    return claves, {"name": f"empresa_{campo}_id" if campo else "empresa_id"}
+
+
+# Todos los indices empiezan por la empresa para que cada consulta quede acotada a su particion
+INDICES = [
+    ([("empresa_id", 1), ("email", 1)], {"name": "empresa_email", "unique": True}),
+    _indice_orden(None),
+] + [_indice_orden(campo) for campo in CAMPOS_ORDEN.values()]
+
+
+def ordenes_indexados():
+    prefijos = [claves[:3] for claves, _ in INDICES]
+    return [
+        campo_api for campo_api, campo in CAMPOS_ORDEN.items()
+        if [("empresa_id", 1), (campo, 1), ("_id", 1)] in prefijos
+    ]
+
+
+# Validador del lado del servidor para los documentos con el esquema actual (ver Employee.to_mongo_dict)
+ESQUEMA_EMPLEADOS = {
+    "bsonType": "object",
+    "required": ["esquema", "empresa_id", "nombre", "apellido", "email", "salario_centavos", "fecha_ingreso"],
+    "properties": {
+        "esquema": {"bsonType": "int", "minimum": 2},
+        "empresa_id": {"bsonType": "string", "maxLength": 64},
+        "nombre": {"bsonType": "string", "maxLength": 50},
+        "apellido": {"bsonType": "string", "maxLength": 50},
+        "email": {"bsonType": "string"},
+        "puesto": {"bsonType": "string", "maxLength": 100},
+        "salario_centavos": {"bsonType": ["int", "long"], "minimum": 1},
+        "fecha_ingreso": {"bsonType": "date"},
+        "ajuste_salarial": {"bsonType": "object"}
+    }
+}
+
+
+def _colecciones_empleados():
+    return {'empleados', *Config.EMPRESAS_COLECCION_DEDICADA.values()}
+
+
+def aplicar_validador(database=None):
+    if Config.VALIDACION_ESQUEMA_ACCION == 'off':
+        return
+    database = database if database is not None else get_database()
+    opciones = {
+        'validator': {'$jsonSchema': ESQUEMA_EMPLEADOS},
+        # moderate: los documentos anteriores a la migracion no se validan hasta que se migren
+        'validationLevel': 'moderate',
+        'validationAction': Config.VALIDACION_ESQUEMA_ACCION
+    }
+    for nombre in _colecciones_empleados():
+        if nombre in database.list_collection_names():
+            database.command('collMod', nombre, **opciones)
+        else:
+            database.create_collection(nombre, **opciones)
+
+
+def asegurar_indices(database=None):
+    database = database if database is not None else get_database()
+    for nombre in _colecciones_empleados():
+        for claves, opciones in INDICES:
+            try:
+                database[nombre].create_index(claves, **opciones)
+            except OperationFailure as e:
+                print(f"No se pudo crear el indice {opciones['name']} en {nombre}: {e}")
+
+
+class EmployeesRepository(RepositorioEmpleados):
     
-    def __init__(self):
-        self.coleccion = get_database().empleados
+    def __init__(self, cache=None, escritor=None, historial=None):
+        super().__init__(historial or HistorialSalariosRepository())
+        self.database = get_database()
+        self.coleccion = proteger(self.database.empleados)
+        self.coleccion_lecturas = self._coleccion_lecturas(self.coleccion)
+        self._colecciones_dedicadas = {}
+        self._versiones_empresa = {}
+        self._lock_versiones = threading.Lock()
+        
+        self.cache_facetas = CacheLRU(capacidad=Config.CACHE_FACETAS_CAPACIDAD, ttl=Config.CACHE_FACETAS_TTL)
+        metricas.registrar('cache_facetas', self.cache_facetas.metricas)
+        self.cache_conteos = CacheLRU(capacidad=Config.CACHE_CONTEOS_CAPACIDAD, ttl=Config.CACHE_CONTEOS_TTL)
+        metricas.registrar('cache_conteos', self.cache_conteos.metricas)
+        
+        if cache is None and Config.CACHE_EMPLEADOS_HABILITADO:
+            cache = CacheLRU(
+                capacidad=Config.CACHE_EMPLEADOS_CAPACIDAD,
+                ttl=Config.CACHE_EMPLEADOS_TTL,
+                ttl_negativo=Config.CACHE_EMPLEADOS_TTL_NEGATIVO
+            )
+        self.cache = cache
+        if self.cache:
+            metricas.registrar('cache_empleados', self.cache.metricas)
+        
+        if escritor is None and Config.ESCRITURA_AGRUPADA_HABILITADA:
+            escritor = self._crear_escritor(self.coleccion)
+        self.escritor = escritor
+        if self.escritor:
+            metricas.registrar('escritura_agrupada', self.escritor.metricas)
     
     def crear(self, empleado):
         if not empleado or not empleado.email:
             raise ErrorBaseDatos("Empleado o email no valido")
-            
+        
+        datos_mongo = empleado.to_mongo_dict()
+        datos_mongo['empresa_id'] = contexto.empresa_actual()
+        coleccion = self._coleccion()
+        
+        escritor = self._escritor(coleccion)
+        if escritor:
+            self._crear_agrupado(escritor, empleado, datos_mongo)
+        else:
+            self._crear_individual(coleccion, empleado, datos_mongo)
+        
+        self._registrar_historial([(empleado._id, None, datos_mongo['salario_centavos'])])
+        self._indexar([dict(datos_mongo, _id=empleado._id)])
+        return empleado
+    
+    def _crear_individual(self, coleccion, empleado, datos_mongo):
         if self._email_existe(empleado.email):
             raise EmailYaExiste(empleado.email)
         
         try:
-            datos_mongo = empleado.to_mongo_dict()
-            resultado = self.coleccion.insert_one(datos_mongo)
+            with self._sesion_causal() as sesion:
+                resultado = coleccion.insert_one(datos_mongo, session=sesion)
             empleado._id = resultado.inserted_id
-            return empleado
+            self._invalidar_cache(empleado._id)
+        except DuplicateKeyError:
+            raise EmailYaExiste(empleado.email)
+        except (ErrorConexion, PlazoAgotado):
+            raise
         except Exception as e:
             raise ErrorBaseDatos(f"Error al crear empleado: {str(e)}")
     
+    def _crear_agrupado(self, escritor, empleado, datos_mongo):
+        try:
+            empleado._id = escritor.insertar(datos_mongo)
+        except FuturesTimeoutError:
+            raise ErrorBaseDatos("Tiempo de espera agotado al crear empleado")
+        self._invalidar_cache(empleado._id)
+    
     def obtener_por_id(self, empleado_id):
         try:
-            documento = self.coleccion.find_one({"_id": ObjectId(empleado_id)})
+            documento = self._buscar_documento(ObjectId(empleado_id))
             
             if not documento:
                 raise EmpleadoNoEncontrado(empleado_id)
@@ -37,48 +186,292 @@ class EmployeesRepository:
         except (InvalidId, ValueError):
             raise EmpleadoNoEncontrado(empleado_id)
     
-    def obtener_todos(self, filtros=None, pagina=1, por_pagina=10):
-        query = {}
+    def obtener_por_ids(self, object_ids):
+        documentos = {}
+        faltantes = []
         
-        if filtros:
-            for campo, valor in filtros.items():
-                if valor:
-                    query[campo] = valor
+        for object_id in object_ids:
+            cacheado = self.cache.obtener(self._clave_cache(object_id)) if self.cache else None
+            if cacheado is AUSENTE:
+                continue
+            if cacheado is not None:
+                documentos[object_id] = cacheado
+            else:
+                faltantes.append(object_id)
+        
+        if faltantes:
+            marca = self.cache.marca() if self.cache else None
+            try:
+                encontrados = {doc['_id']: doc for doc in self._coleccion().find(self._query({"_id": {"$in": faltantes}}))}
+            except (ErrorConexion, PlazoAgotado):
+                raise
+            except Exception as e:
+                raise ErrorBaseDatos(f"Error al obtener empleados: {str(e)}")
+            
+            for object_id in faltantes:
+                documento = encontrados.get(object_id)
+                if documento:
+                    documentos[object_id] = documento
+                if self.cache:
+                    if documento:
+                        self.cache.guardar(self._clave_cache(object_id), documento, marca)
+                    else:
+                        self.cache.guardar_ausente(self._clave_cache(object_id), marca)
+        
+        return {object_id: Employee.from_dict(doc) for object_id, doc in documentos.items()}
+    
+    def _buscar_documento(self, object_id):
+        if not self.cache:
+            return self._coleccion().find_one(self._query({"_id": object_id}))
+        
+        clave = self._clave_cache(object_id)
+        cacheado = self.cache.obtener(clave)
+        if cacheado is AUSENTE:
+            return None
+        if cacheado is not None:
+            return cacheado
+        
+        marca = self.cache.marca()
+        documento = self._coleccion().find_one(self._query({"_id": object_id}))
+        if documento:
+            self.cache.guardar(clave, documento, marca)
+        else:
+            self.cache.guardar_ausente(clave, marca)
+        return documento
+    
+    def obtener_todos(self, filtros=None, pagina=1, por_pagina=10, orden=None, cursor=None):
+        # orden: (campo de la API, 1 o -1) o None para ordenar solo por _id
+        query = self._query(filtros)
         
         pagina = max(1, pagina)
         por_pagina = max(1, min(100, por_pagina))
         
         skip = (pagina - 1) * por_pagina
+        campo, direccion = (CAMPOS_ORDEN[orden[0]], orden[1]) if orden else (None, 1)
+        sort = [(campo, direccion), ("_id", direccion)] if campo else [("_id", 1)]
+        
+        if cursor:
+            query["$and"] = [self._condicion_cursor(cursor, orden, campo, direccion)]
+            skip = 0
         
         try:
-            cursor = self.coleccion.find(query).skip(skip).limit(por_pagina)
-            return [Employee.from_dict(doc) for doc in cursor]
+            with self._sesion_causal() as sesion:
+                resultado = self._coleccion_lecturas_empresa().find(query, session=sesion).sort(sort).skip(skip).limit(por_pagina)
+                if "email" not in query:
+                    # El indice del orden evita el sort en memoria aunque el planificador prefiera el de un rango
+                    resultado = resultado.hint(_indice_orden(campo)[1]["name"])
+                return [Employee.from_dict(doc) for doc in resultado]
+        except (ErrorConexion, PlazoAgotado):
+            raise
         except Exception as e:
             raise ErrorBaseDatos(f"Error al obtener empleados: {str(e)}")
     
+    def _condicion_cursor(self, token, orden, campo, direccion):
+        valor, object_id = decodificar_cursor(token, self._nombre_orden(orden))
+        operador = "$gt" if direccion == 1 else "$lt"
+        if not campo:
+            return {"_id": {operador: object_id}}
+        return {"$or": [
+            {campo: {operador: valor}},
+            {campo: valor, "_id": {operador: object_id}}
+        ]}
+    
+    def iterar_todos(self, filtros=None, tamano_lote=1000):
+        # La empresa se resuelve ahora: el generador se consume despues de terminar la solicitud
+        return self._iterar(self._coleccion_lecturas_empresa(), self._query(filtros), tamano_lote)
+    
+    def _iterar(self, coleccion, query, tamano_lote):
+        try:
+            with self._sesion_causal() as sesion:
+                cursor = coleccion.find(query, session=sesion, max_time_ms=Config.MONGO_MAX_TIME_MS_LOTES or None).batch_size(tamano_lote)
+                for documento in cursor:
+                    yield Employee.from_dict(documento)
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al exportar empleados: {str(e)}")
+    
     def actualizar(self, empleado_id, datos_actualizacion):
         try:
             if 'email' in datos_actualizacion:
                 if self._email_existe(datos_actualizacion['email'], excluir_id=empleado_id):
                     raise EmailYaExiste(datos_actualizacion['email'])
             
-            resultado = self.coleccion.update_one(
-                {"_id": ObjectId(empleado_id)},
-                {"$set": datos_actualizacion}
-            )
+            campos = Employee.campos_mongo(datos_actualizacion)
+            try:
+                # Se lee el salario previo en la misma operacion para registrar el cambio en el historial
+                with self._sesion_causal() as sesion:
+                    anterior = self._coleccion().find_one_and_update(
+                        self._query({"_id": ObjectId(empleado_id)}),
+                        {"$set": campos},
+                        projection=dict.fromkeys({"salario_centavos", "salario"} | self._campos_indices(campos.keys()), 1),
+                        return_document=ReturnDocument.BEFORE,
+                        session=sesion
+                    )
+            except DuplicateKeyError:
+                raise EmailYaExiste(datos_actualizacion.get('email'))
+            finally:
+                self._invalidar_cache(empleado_id)
             
-            if resultado.matched_count == 0:
+            if anterior is None:
                 raise EmpleadoNoEncontrado(empleado_id)
             
+            if 'salario_centavos' in campos:
+                self._registrar_historial([(anterior['_id'], self._salario_centavos(anterior), campos['salario_centavos'])])
+            
+            self._indexar([{**anterior, **campos}], modificados=campos.keys())
             return self.obtener_por_id(empleado_id)
         except (InvalidId, ValueError):
             raise EmpleadoNoEncontrado(empleado_id)
     
+    def actualizar_masivo(self, actualizaciones):
+        resultados = {}
+        tamano_lote = max(1, Config.TAMANO_LOTE_BULK)
+        
+        for inicio in range(0, len(actualizaciones), tamano_lote):
+            lote = actualizaciones[inicio:inicio + tamano_lote]
+            try:
+                ids = [object_id for object_id, _ in lote]
+                coleccion = self._coleccion()
+                existentes = {
+                    doc['_id']: self._salario_centavos(doc)
+                    for doc in coleccion.find(self._query({"_id": {"$in": ids}}), {"salario_centavos": 1, "salario": 1})
+                }
+                
+                aplicables = []
+                for object_id, cambios in lote:
+                    if object_id not in existentes:
+                        resultados[object_id] = EmpleadoNoEncontrado(object_id)
+                        continue
+                    aplicables.append((object_id, cambios))
+                    resultados[object_id] = None
+                
+                if aplicables:
+                    try:
+                        with self._sesion_causal() as sesion:
+                            coleccion.bulk_write(
+                                [UpdateOne(self._query({"_id": object_id}), {"$set": Employee.campos_mongo(cambios)}) for object_id, cambios in aplicables],
+                                ordered=False,
+                                session=sesion
+                            )
+                    except BulkWriteError as e:
+                        for error in e.details.get('writeErrors', []):
+                            object_id, cambios = aplicables[error['index']]
+                            if error.get('code') == 11000 and 'email' in cambios:
+                                resultados[object_id] = EmailYaExiste(cambios['email'])
+                            else:
+                                resultados[object_id] = ErrorBaseDatos(error.get('errmsg', 'Error al actualizar'))
+                    finally:
+                        for object_id, _ in aplicables:
+                            self._invalidar_cache(object_id)
+                    
+                    self._registrar_historial([
+                        (object_id, existentes[object_id], salario_a_centavos(cambios['salario']))
+                        for object_id, cambios in aplicables
+                        if 'salario' in cambios and resultados[object_id] is None
+                    ])
+                    
+                    modificados = {
+                        object_id: Employee.campos_mongo(cambios).keys()
+                        for object_id, cambios in aplicables
+                        if resultados[object_id] is None
+                    }
+                    reindexar = [object_id for object_id, campos in modificados.items() if self._campos_indices(campos)]
+                    if reindexar:
+                        campos_lote = set().union(*modificados.values())
+                        self._indexar(
+                            coleccion.find({"_id": {"$in": reindexar}}, dict.fromkeys(self._campos_indices(campos_lote), 1)),
+                            modificados=campos_lote
+                        )
+            except (ErrorConexion, PlazoAgotado):
+                raise
+            except Exception as e:
+                for object_id, _ in lote:
+                    resultados[object_id] = ErrorBaseDatos(f"Error al actualizar empleados: {str(e)}")
+        
+        return resultados
+    
+    def limites_ajuste_salarial(self, filtros):
+        # Los empleados creados despues de confirmar el ajuste (con _id mayor al ultimo) no entran en el
+        query = self._query(filtros)
+        try:
+            ultimo = self._coleccion().find_one(query, {"_id": 1}, sort=[("_id", -1)])
+            return self._coleccion().count_documents(query), ultimo['_id'] if ultimo else None
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al preparar el ajuste salarial: {str(e)}")
+    
+    def lotes_ajuste_salarial(self, filtros, hasta_id, desde_id=None, tamano_lote=1000):
+        query = self._query(filtros)
+        query["_id"] = {"$lte": hasta_id} if desde_id is None else {"$gt": desde_id, "$lte": hasta_id}
+        return self._lotes_ajuste(self._coleccion(), query, tamano_lote)
+    
+    def _lotes_ajuste(self, coleccion, query, tamano_lote):
+        proyeccion = {"nombre": 1, "apellido": 1, "puesto": 1, "salario_centavos": 1, "salario": 1, "fecha_ingreso": 1, "ajuste_salarial": 1}
+        try:
+            lote = []
+            for documento in coleccion.find(query, proyeccion, max_time_ms=Config.MONGO_MAX_TIME_MS_LOTES or None).sort("_id", 1).batch_size(tamano_lote):
+                lote.append(documento)
+                if len(lote) >= tamano_lote:
+                    yield lote
+                    lote = []
+            if lote:
+                yield lote
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al leer empleados del ajuste salarial: {str(e)}")
+    
+    def aplicar_ajuste_salarial(self, ajuste_id, cambios):
+        # cambios: lista de (documento del lote, salario_centavos nuevo). Cada empleado queda marcado con el
+        # ajuste y su salario anterior, asi reprocesar un lote despues de un fallo no aplica dos veces el aumento
+        coleccion = self._coleccion()
+        pendientes = self._pendientes_ajuste(ajuste_id, cambios)
+        if pendientes:
+            try:
+                with self._sesion_causal() as sesion:
+                    coleccion.bulk_write(
+                        [
+                            UpdateOne(
+                                self._query({"_id": documento['_id'], "ajuste_salarial.id": {"$ne": ajuste_id}}),
+                                {"$set": {
+                                    "salario_centavos": nuevo,
+                                    "ajuste_salarial": {"id": ajuste_id, "salario_anterior_centavos": self._salario_centavos(documento)}
+                                }}
+                            )
+                            for documento, nuevo in pendientes
+                        ],
+                        ordered=False,
+                        session=sesion
+                    )
+            except (ErrorConexion, PlazoAgotado):
+                raise
+            except Exception as e:
+                raise ErrorBaseDatos(f"Error al aplicar el ajuste salarial: {str(e)}")
+            finally:
+                for documento, _ in pendientes:
+                    self._invalidar_cache(documento['_id'])
+        
+        return self._registrar_ajuste(ajuste_id, cambios)
+    
+    def emails_en_uso(self, emails):
+        try:
+            cursor = self._coleccion().find(self._query({"email": {"$in": list(emails)}}), {"email": 1})
+            return {doc['email']: doc['_id'] for doc in cursor}
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al verificar emails: {str(e)}")
+    
     def eliminar(self, empleado_id):
         try:
             empleado = self.obtener_por_id(empleado_id)
             
-            resultado = self.coleccion.delete_one({"_id": ObjectId(empleado_id)})
+            with self._sesion_causal() as sesion:
+                resultado = self._coleccion().delete_one(self._query({"_id": ObjectId(empleado_id)}), session=sesion)
+            self._invalidar_cache(empleado_id)
+            self._desindexar(empleado._id)
             
             if resultado.deleted_count == 0:
                 raise EmpleadoNoEncontrado(empleado_id)
@@ -88,38 +481,227 @@ class EmployeesRepository:
             raise EmpleadoNoEncontrado(empleado_id)
     
     def contar(self, filtros=None):
-        query = {}
-        
-        if filtros:
-            for campo, valor in filtros.items():
-                if valor:
-                    query[campo] = valor
+        query = self._query(filtros)
         
         try:
-            return self.coleccion.count_documents(query)
+            with self._sesion_causal() as sesion:
+                return self._coleccion_lecturas_empresa().count_documents(query, session=sesion)
+        except (ErrorConexion, PlazoAgotado):
+            raise
         except Exception as e:
             raise ErrorBaseDatos(f"Error al contar empleados: {str(e)}")
     
+    def contar_listado(self, filtros=None):
+        # Devuelve (total, exacto). Sin filtros, una empresa con coleccion dedicada usa los metadatos de la
+        # coleccion; el resto se cuenta con count_documents y se cachea por filtro hasta la proxima escritura
+        query = self._query(filtros)
+        if Config.CONTEO_ESTIMADO_HABILITADO and len(query) == 1 and query['empresa_id'] in Config.EMPRESAS_COLECCION_DEDICADA:
+            try:
+                return self._coleccion_lecturas_empresa().estimated_document_count(), False
+            except (ErrorConexion, PlazoAgotado):
+                raise
+            except Exception as e:
+                raise ErrorBaseDatos(f"Error al contar empleados: {str(e)}")
+        
+        clave = self._clave_consulta(query)
+        total = self.cache_conteos.obtener(clave)
+        if total is None:
+            total = self.contar(filtros)
+            self.cache_conteos.guardar(clave, total)
+        return total, True
+    
+    def _clave_consulta(self, query):
+        # La version de la empresa cambia con cada escritura, asi una entrada vieja nunca se vuelve a leer
+        return f"{query['empresa_id']}:{self._version_empresa()}:{json_util.dumps(query, sort_keys=True)}"
+    
+    def obtener_facetas(self, filtros=None):
+        query = self._query(filtros)
+        clave = self._clave_consulta(query)
+        facetas = self.cache_facetas.obtener(clave)
+        if facetas is not None:
+            return facetas
+        
+        bandas = self._bandas_facetas()
+        pipeline = [
+            {"$match": query},
+            {"$facet": {
+                "puesto": [
+                    {"$group": {"_id": "$puesto", "cantidad": {"$sum": 1}}},
+                    {"$sort": {"cantidad": -1, "_id": 1}}
+                ],
+                "banda_salarial": [
+                    {"$bucket": {
+                        "groupBy": "$salario_centavos",
+                        "boundaries": bandas,
+                        "default": "fuera_de_rango",
+                        "output": {"cantidad": {"$sum": 1}}
+                    }}
+                ],
+                "anio_ingreso": [
+                    {"$group": {"_id": {"$year": "$fecha_ingreso"}, "cantidad": {"$sum": 1}}},
+                    {"$sort": {"_id": 1}}
+                ]
+            }}
+        ]
+        
+        try:
+            with self._sesion_causal() as sesion:
+                resultado = list(self._coleccion_lecturas_empresa().aggregate(pipeline, session=sesion))[0]
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al calcular facetas: {str(e)}")
+        
+        facetas = self._formatear_facetas(resultado, bandas)
+        self.cache_facetas.guardar(clave, facetas)
+        return facetas
+    
+    def proyeccion_empresa(self, campos):
+        try:
+            with self._sesion_causal() as sesion:
+                cursor = self._coleccion_lecturas_empresa().find(
+                    self._query(), dict.fromkeys(campos, 1), session=sesion, max_time_ms=Config.MONGO_MAX_TIME_MS_LOTES or None
+                )
+                return list(cursor.batch_size(5000))
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al leer la proyeccion de empleados: {str(e)}")
+    
     def obtener_promedio_salarios_empresa(self):
         try:
             pipeline = [
+                {"$match": self._query()},
                 {"$group": {
                     "_id": None,
-                    "promedio": {"$avg": "$salario"}
+                    "promedio": {"$avg": {"$ifNull": ["$salario_centavos", {"$multiply": ["$salario", 100]}]}}
                 }}
             ]
             
-            resultado = list(self.coleccion.aggregate(pipeline))
+            with self._sesion_causal() as sesion:
+                resultado = list(self._coleccion_lecturas_empresa().aggregate(pipeline, session=sesion))
             
             if not resultado or resultado[0]["promedio"] is None:
                 return 0.0
             
-            return round(resultado[0]["promedio"], 2)
+            return round(resultado[0]["promedio"] / 100, 2)
+        except (ErrorConexion, PlazoAgotado):
+            raise
         except Exception as e:
             raise ErrorBaseDatos(f"Error al calcular promedio: {str(e)}")
 
+    def _coleccion(self):
+        nombre = Config.EMPRESAS_COLECCION_DEDICADA.get(contexto.empresa_actual())
+        if not nombre:
+            return self.coleccion
+        return self._coleccion_dedicada(nombre)[0]
+    
+    def _coleccion_lecturas_empresa(self):
+        nombre = Config.EMPRESAS_COLECCION_DEDICADA.get(contexto.empresa_actual())
+        if not nombre:
+            return self.coleccion_lecturas
+        return self._coleccion_dedicada(nombre)[1]
+    
+    def _coleccion_dedicada(self, nombre):
+        if nombre not in self._colecciones_dedicadas:
+            coleccion = proteger(self.database[nombre])
+            self._colecciones_dedicadas[nombre] = (coleccion, self._coleccion_lecturas(coleccion), None)
+        return self._colecciones_dedicadas[nombre]
+    
+    def _escritor(self, coleccion):
+        if coleccion is self.coleccion:
+            return self.escritor
+        if not Config.ESCRITURA_AGRUPADA_HABILITADA:
+            return None
+
+        coleccion_dedicada, lecturas, escritor = self._coleccion_dedicada(coleccion.name)
+        if escritor is None:
+            escritor = self._crear_escritor(coleccion_dedicada)
+            self._colecciones_dedicadas[coleccion.name] = (coleccion_dedicada, lecturas, escritor)
+            metricas.registrar(f'escritura_agrupada_{coleccion.name}', escritor.metricas)
+        return escritor
+    
+    @staticmethod
+    def _crear_escritor(coleccion):
+        return EscritorAgrupado(
+            coleccion,
+            max_espera_ms=Config.ESCRITURA_AGRUPADA_MAX_ESPERA_MS,
+            max_lote=Config.ESCRITURA_AGRUPADA_MAX_LOTE
+        )
+    
+    @staticmethod
+    def _query(filtros=None):
+        query = {"empresa_id": contexto.empresa_actual()}
+        
+        if filtros:
+            for campo, valor in filtros.items():
+                if valor:
+                    query[campo] = valor
+        
+        return query
+    
+    @staticmethod
+    def _coleccion_lecturas(coleccion):
+        if not Config.LECTURAS_EN_SECUNDARIOS:
+            return coleccion
+        
+        preferencia = PREFERENCIAS_LECTURA.get(Config.PREFERENCIA_LECTURA_SECUNDARIA, SecondaryPreferred)
+        return coleccion.with_options(
+            read_preference=preferencia(max_staleness=Config.MAX_STALENESS_SEGUNDOS),
+            read_concern=ReadConcern('majority')
+        )
+    
+    @contextmanager
+    def _sesion_causal(self):
+        # La sesion causal hace que una lectura en un secundario espere a que este
+        # haya aplicado la ultima escritura conocida por el cliente (X-Tiempo-Operacion)
+        if not Config.LECTURAS_EN_SECUNDARIOS:
+            yield None
+            return
+        
+        with self.coleccion.database.client.start_session(causal_consistency=True) as sesion:
+            tiempo = contexto.tiempo_operacion.get()
+            if tiempo is not None:
+                sesion.advance_operation_time(tiempo)
+            yield sesion
+            contexto.registrar_tiempo_operacion(sesion.operation_time)
+    
+    def documentos_para_indices(self, indices=None):
+        # Recorrido proyectado de todas las colecciones de empleados para construir los indices en memoria
+        proyeccion = dict.fromkeys({"empresa_id"}.union(*(indice.campos for indice in indices or self.indices_memoria)), 1)
+        for nombre in sorted(_colecciones_empleados()):
+            cursor = proteger(self.database[nombre]).find({}, proyeccion, max_time_ms=Config.MONGO_MAX_TIME_MS_LOTES or None).batch_size(5000)
+            for documento in cursor:
+                yield documento
+    
+    def calentar_indices(self, limite):
+        # Consultas cubiertas por el principio de cada indice: traen sus paginas a la cache sin leer documentos
+        tocados = 0
+        for nombre in sorted(_colecciones_empleados()):
+            coleccion = proteger(self.database[nombre])
+            for claves, opciones in INDICES:
+                proyeccion = {'_id': 0, **dict.fromkeys((campo for campo, _ in claves), 1)}
+                list(coleccion.find({}, proyeccion).hint(opciones['name']).limit(limite))
+                tocados += 1
+        return tocados
+    
+    @staticmethod
+    def _clave_cache(object_id):
+        return f"{contexto.empresa_actual()}:{object_id}"
+    
+    def _version_empresa(self):
+        with self._lock_versiones:
+            return self._versiones_empresa.get(contexto.empresa_actual(), 0)
+    
+    def _invalidar_cache(self, empleado_id):
+        empresa_id = contexto.empresa_actual()
+        with self._lock_versiones:
+            self._versiones_empresa[empresa_id] = self._versiones_empresa.get(empresa_id, 0) + 1
+        if self.cache:
+            self.cache.invalidar(self._clave_cache(ObjectId(empleado_id)))
+    
     def _email_existe(self, email, excluir_id=None):
-        query = {"email": email.lower()}
+        query = self._query({"email": email.lower()})
         
         if excluir_id:
             try:
@@ -127,4 +709,4 @@ class EmployeesRepository:
             except (InvalidId, ValueError):
                 pass
         
-        return self.coleccion.count_documents(query) > 0
\ No newline at end of file
+        return self._coleccion().count_documents(query) > 0
\ No newline at end of file
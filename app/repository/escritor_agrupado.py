@@ -0,0 +1,134 @@
+import threading
+import time
+from concurrent.futures import Future
+from pymongo.errors import BulkWriteError
+from app.common.errors import EmailYaExiste, ErrorBaseDatos, ErrorConexion
+
+
+_LIMITES_HISTOGRAMA = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class EscritorAgrupado:
+
+    def __init__(self, coleccion, max_espera_ms=5, max_lote=100, timeout=30):
+        self.coleccion = coleccion
+        self.max_espera = max(0, max_espera_ms) / 1000
+        self.max_lote = max(1, max_lote)
+        self.timeout = timeout
+        self._pendientes = []
+        self._condicion = threading.Condition()
+        self._hilo = None
+        self._lotes = 0
+        self._documentos = 0
+        self._max_tamano = 0
+        self._espera_total = 0.0
+        self._histograma = {limite: 0 for limite in _LIMITES_HISTOGRAMA}
+        self._histograma_mayores = 0
+
+    def insertar(self, documento):
+        futuro = Future()
+        with self._condicion:
+            self._pendientes.append((documento, futuro, time.monotonic()))
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._procesar, name='peopleflow-escritor', daemon=True)
+                self._hilo.start()
+            self._condicion.notify()
+        return futuro.result(timeout=self.timeout)
+
+    def _procesar(self):
+        while True:
+            with self._condicion:
+                while not self._pendientes:
+                    self._condicion.wait()
+
+                limite = self._pendientes[0][2] + self.max_espera
+                while len(self._pendientes) < self.max_lote:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    self._condicion.wait(restante)
+
+                lote = self._pendientes[:self.max_lote]
+                del self._pendientes[:self.max_lote]
+
+            self._escribir(lote)
+
+    def _escribir(self, lote):
+        self._registrar_lote(lote)
+        aceptados = []
+        emails_vistos = {}
+        for documento, futuro, _ in lote:
+            email = documento.get('email')
+            emails_empresa = emails_vistos.setdefault(documento.get('empresa_id'), set())
+            if email in emails_empresa:
+                futuro.set_exception(EmailYaExiste(email))
+            else:
+                emails_empresa.add(email)
+                aceptados.append((documento, futuro))
+
+        try:
+            en_uso = set()
+            for empresa_id, emails in emails_vistos.items():
+                cursor = self.coleccion.find({"empresa_id": empresa_id, "email": {"$in": list(emails)}}, {"email": 1})
+                en_uso.update((empresa_id, doc['email']) for doc in cursor)
+            documentos = []
+            futuros = []
+            for documento, futuro in aceptados:
+                if (documento.get('empresa_id'), documento.get('email')) in en_uso:
+                    futuro.set_exception(EmailYaExiste(documento['email']))
+                else:
+                    documentos.append(documento)
+                    futuros.append(futuro)
+
+            if not documentos:
+                return
+
+            errores = {}
+            try:
+                self.coleccion.insert_many(documentos, ordered=False)
+            except BulkWriteError as e:
+                errores = {error['index']: error for error in e.details.get('writeErrors', [])}
+
+            for indice, (documento, futuro) in enumerate(zip(documentos, futuros)):
+                error = errores.get(indice)
+                if error is None:
+                    futuro.set_result(documento['_id'])
+                elif error.get('code') == 11000:
+                    futuro.set_exception(EmailYaExiste(documento.get('email')))
+                else:
+                    futuro.set_exception(ErrorBaseDatos(f"Error al crear empleado: {error.get('errmsg')}"))
+        except Exception as e:
+            for _, futuro in aceptados:
+                if not futuro.done():
+                    futuro.set_exception(e if isinstance(e, ErrorConexion) else ErrorBaseDatos(f"Error al crear empleado: {str(e)}"))
+
+    def _registrar_lote(self, lote):
+        ahora = time.monotonic()
+        tamano = len(lote)
+        with self._condicion:
+            self._lotes += 1
+            self._documentos += tamano
+            self._max_tamano = max(self._max_tamano, tamano)
+            self._espera_total += sum(ahora - encolado for _, _, encolado in lote)
+            for limite in _LIMITES_HISTOGRAMA:
+                if tamano <= limite:
+                    self._histograma[limite] += 1
+                    break
+            else:
+                self._histograma_mayores += 1
+
+    def metricas(self):
+        with self._condicion:
+            histograma = {f'<={limite}': cantidad for limite, cantidad in self._histograma.items()}
+            histograma[f'>{_LIMITES_HISTOGRAMA[-1]}'] = self._histograma_mayores
+            return {
+                'lotes': self._lotes,
+                'documentos': self._documentos,
+                'pendientes': len(self._pendientes),
+                'tamano_promedio': round(self._documentos / self._lotes, 2) if self._lotes else 0.0,
+                'tamano_maximo': self._max_tamano,
+                'espera_promedio_ms': round(self._espera_total * 1000 / self._documentos, 3) if self._documentos else 0.0,
+                'max_espera_ms': self.max_espera * 1000,
+                'max_lote': self.max_lote,
+                'histograma_tamanos': histograma
+            }
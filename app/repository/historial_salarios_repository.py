@@ -0,0 +1,119 @@
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from app.db import get_database, proteger
+from app.common import contexto
+from app.common.errors import ErrorBaseDatos, ErrorConexion, PlazoAgotado
+from app.repository.base import RepositorioHistorialSalarios
+
+
+# Un documento por empleado y por anio: leer el historial completo o el salario a una
+# fecha recorre pocos documentos aunque el empleado acumule anios de cambios
+INDICES = [
+    ([("empresa_id", 1), ("empleado_id", 1), ("anio", -1)], {"name": "empresa_empleado_anio", "unique": True}),
+    ([("empresa_id", 1), ("anio", 1)], {"name": "empresa_anio"}),
+]
+
+
+def asegurar_indices(database=None):
+    database = database if database is not None else get_database()
+    for claves, opciones in INDICES:
+        try:
+            database.historial_salarios.create_index(claves, **opciones)
+        except OperationFailure as e:
+            print(f"No se pudo crear el indice {opciones['name']} en historial_salarios: {e}")
+
+
+class HistorialSalariosRepository(RepositorioHistorialSalarios):
+
+    def __init__(self):
+        self.coleccion = proteger(get_database().historial_salarios)
+
+    def registrar(self, cambios, ajuste_id=None):
+        # cambios: lista de (empleado_id, salario_anterior_centavos, salario_centavos)
+        ahora = datetime.now()
+        empresa_id = contexto.empresa_actual()
+        filtro = {"empresa_id": empresa_id, "anio": ahora.year}
+        cambio = {"fecha": ahora}
+        if ajuste_id:
+            # Un ajuste reanudado no repite el cambio: si el bucket ya lo tiene, el upsert choca con el indice unico
+            filtro["cambios.ajuste_id"] = {"$ne": ajuste_id}
+            cambio["ajuste_id"] = ajuste_id
+        operaciones = [
+            UpdateOne(
+                dict(filtro, empleado_id=empleado_id),
+                {
+                    "$push": {"cambios": dict(cambio, salario_anterior_centavos=anterior, salario_centavos=nuevo)},
+                    "$inc": {"cantidad": 1}
+                },
+                upsert=True
+            )
+            for empleado_id, anterior, nuevo in cambios
+            if anterior != nuevo
+        ]
+        if not operaciones:
+            return
+        try:
+            self.coleccion.bulk_write(operaciones, ordered=False)
+        except BulkWriteError as e:
+            if ajuste_id is None or any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise ErrorBaseDatos(f"Error al registrar historial de salarios: {str(e)}")
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al registrar historial de salarios: {str(e)}")
+
+    def obtener_por_empleado(self, empleado_id, hasta=None):
+        query = {"empresa_id": contexto.empresa_actual(), "empleado_id": empleado_id}
+        if hasta:
+            query["anio"] = {"$lte": hasta.year}
+        try:
+            cambios = []
+            for bucket in self.coleccion.find(query).sort("anio", 1):
+                cambios.extend(bucket.get('cambios', []))
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al obtener historial de salarios: {str(e)}")
+        if hasta:
+            cambios = [cambio for cambio in cambios if cambio['fecha'] <= hasta]
+        return cambios
+
+    def salario_a_fecha(self, empleado_id, fecha):
+        # Se recorren los buckets del mas reciente al mas antiguo hasta encontrar un cambio previo a la fecha
+        query = {"empresa_id": contexto.empresa_actual(), "empleado_id": empleado_id, "anio": {"$lte": fecha.year}}
+        try:
+            for bucket in self.coleccion.find(query).sort("anio", -1):
+                previos = [cambio for cambio in bucket.get('cambios', []) if cambio['fecha'] <= fecha]
+                if previos:
+                    return max(previos, key=lambda cambio: cambio['fecha'])
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al obtener historial de salarios: {str(e)}")
+        return None
+
+    def cambios_en_rango(self, desde, hasta, solo_aumentos=False, pagina=1, por_pagina=100):
+        filtro_cambio = {"cambios.fecha": {"$gte": desde, "$lte": hasta}}
+        if solo_aumentos:
+            filtro_cambio["cambios.salario_anterior_centavos"] = {"$ne": None}
+            filtro_cambio["$expr"] = {"$gt": ["$cambios.salario_centavos", "$cambios.salario_anterior_centavos"]}
+        pipeline = [
+            {"$match": {"empresa_id": contexto.empresa_actual(), "anio": {"$gte": desde.year, "$lte": hasta.year}}},
+            {"$unwind": "$cambios"},
+            {"$match": filtro_cambio},
+            {"$sort": {"cambios.fecha": 1, "empleado_id": 1}},
+            {"$facet": {
+                "cambios": [{"$skip": (pagina - 1) * por_pagina}, {"$limit": por_pagina}],
+                "total": [{"$count": "cantidad"}]
+            }}
+        ]
+        try:
+            resultado = list(self.coleccion.aggregate(pipeline))[0]
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al obtener cambios de salario: {str(e)}")
+        total = resultado['total'][0]['cantidad'] if resultado['total'] else 0
+        cambios = [dict(documento['cambios'], empleado_id=documento['empleado_id']) for documento in resultado['cambios']]
+        return cambios, total
@@ -0,0 +1,366 @@
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from array import array
+import numpy as np
+from bson import ObjectId
+from app.config import Config
+from app.common.errors import ErrorConexion
+
+
+_PATRON_PALABRA = re.compile(r'[a-z0-9]+')
+_SEPARADOR = '\x1f'
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def clave_prefijo(texto):
+    return ' '.join(_PATRON_PALABRA.findall(normalizar(texto)))
+
+
+def trigramas(texto):
+    # Cada palabra se rellena como en pg_trgm ("  perez ") y cada trigrama se empaqueta en un entero
+    resultado = set()
+    for palabra in _PATRON_PALABRA.findall(normalizar(texto)):
+        relleno = f"  {palabra} "
+        for i in range(len(relleno) - 2):
+            resultado.add(ord(relleno[i]) << 16 | ord(relleno[i + 1]) << 8 | ord(relleno[i + 2]))
+    return resultado
+
+
+class IndiceTrigramas:
+    # Indice invertido de una empresa: cada documento tiene una posicion entera y cada
+    # trigrama una lista de posiciones en un array('I') (4 bytes por aparicion)
+
+    def __init__(self, max_documentos=2000000):
+        self.max_documentos = max_documentos
+        self.desbordado = False
+        self._lock = threading.Lock()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._posiciones = {}
+        self._ids = bytearray()
+        self._textos = []
+        self._longitudes = array('H')
+        self._vivos = bytearray()
+        self._listas = {}
+        self._borrados = 0
+
+    def agregar(self, object_id, nombre, apellido, email):
+        with self._lock:
+            self._quitar(object_id.binary)
+            if len(self._posiciones) >= self.max_documentos:
+                self.desbordado = True
+                return
+            self._agregar(object_id.binary, _SEPARADOR.join((nombre or '', apellido or '', email or '')))
+
+    cargar = agregar
+
+    def _agregar(self, clave, texto):
+        posicion = len(self._textos)
+        claves = trigramas(texto)
+        self._posiciones[clave] = posicion
+        self._ids += clave
+        self._textos.append(texto)
+        self._longitudes.append(min(len(claves), 65535))
+        self._vivos.append(1)
+        for trigrama in claves:
+            lista = self._listas.get(trigrama)
+            if lista is None:
+                lista = self._listas[trigrama] = array('I')
+            lista.append(posicion)
+
+    def quitar(self, object_id):
+        with self._lock:
+            self._quitar(object_id.binary)
+
+    def _quitar(self, clave):
+        # La baja solo marca la posicion; las listas se compactan cuando los borrados pesan
+        posicion = self._posiciones.pop(clave, None)
+        if posicion is None:
+            return
+        self._vivos[posicion] = 0
+        self._textos[posicion] = None
+        self._borrados += 1
+        if self._borrados > max(1000, len(self._textos) // 4):
+            self._compactar()
+
+    def _compactar(self):
+        vivos = [(self._ids[i * 12:(i + 1) * 12], texto) for i, texto in enumerate(self._textos) if texto is not None]
+        self._reiniciar()
+        for clave, texto in vivos:
+            self._agregar(bytes(clave), texto)
+
+    def buscar(self, consulta, limite=10, similitud_minima=0.3):
+        claves = trigramas(consulta)
+        if not claves:
+            return []
+        with self._lock:
+            # Las vistas numpy sobre los array('I') no pueden sobrevivir al lock: un append las invalidaria
+            return self._buscar(claves, limite, similitud_minima)
+
+    def _buscar(self, claves, limite, similitud_minima):
+        total = len(self._textos)
+        listas = [np.frombuffer(self._listas[clave], dtype=np.uint32) for clave in claves if clave in self._listas]
+        if not total or not listas:
+            return []
+
+        coincidencias = np.bincount(np.concatenate(listas), minlength=total)
+        minimo = max(1, math.ceil(similitud_minima * len(claves)))
+        candidatos = np.flatnonzero((coincidencias >= minimo) & (np.frombuffer(self._vivos, dtype=np.uint8) == 1))
+        if not len(candidatos):
+            return []
+
+        compartidos = coincidencias[candidatos]
+        cobertura = compartidos / len(claves)
+        dice = 2 * compartidos / (len(claves) + np.frombuffer(self._longitudes, dtype=np.uint16)[candidatos])
+        # Primero cuanto de la consulta aparece; a igual cobertura, el documento mas parecido en largo
+        puntaje = cobertura + dice * 1e-3
+        if len(candidatos) > limite:
+            mejores = np.argpartition(-puntaje, limite - 1)[:limite]
+        else:
+            mejores = np.arange(len(candidatos))
+        mejores = mejores[np.argsort(-puntaje[mejores], kind='stable')]
+
+        resultados = []
+        for indice in mejores:
+            posicion = int(candidatos[indice])
+            nombre, apellido, email = self._textos[posicion].split(_SEPARADOR)
+            resultados.append({
+                '_id': ObjectId(bytes(self._ids[posicion * 12:(posicion + 1) * 12])),
+                'nombre': nombre,
+                'apellido': apellido,
+                'email': email,
+                'similitud': round(float(cobertura[indice]), 3)
+            })
+        return resultados
+
+    def metricas(self):
+        with self._lock:
+            apariciones = sum(len(lista) for lista in self._listas.values())
+            return {
+                'documentos': len(self._posiciones),
+                'borrados_pendientes': self._borrados,
+                'trigramas': len(self._listas),
+                'apariciones': apariciones,
+                'bytes_listas': apariciones * 4,
+                'desbordado': self.desbordado
+            }
+
+
+class IndicePrefijos:
+    # Arreglos ordenados de "nombre apellido" y "apellido nombre" normalizados. Las altas van a un
+    # arreglo chico de recientes que se fusiona con el principal al crecer, y las bajas solo se marcan
+
+    MAX_RECIENTES = 4096
+
+    def __init__(self, max_documentos=2000000):
+        self.max_documentos = max_documentos
+        self.desbordado = False
+        self._lock = threading.Lock()
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._documentos = {}
+        self._claves = []
+        self._recientes = []
+        self._ordenado = True
+        self._obsoletas = 0
+
+    def agregar(self, object_id, nombre, apellido, email=None):
+        with self._lock:
+            clave = object_id.binary
+            if clave not in self._documentos and len(self._documentos) >= self.max_documentos:
+                self.desbordado = True
+                return
+            self._quitar(clave)
+            nombre, apellido = nombre or '', apellido or ''
+            entradas = tuple({f'{clave_prefijo(nombre)} {clave_prefijo(apellido)}'.strip(), f'{clave_prefijo(apellido)} {clave_prefijo(nombre)}'.strip()})
+            self._documentos[clave] = (nombre, apellido, entradas)
+            for entrada in entradas:
+                self._insertar((entrada, clave))
+
+    def _insertar(self, entrada):
+        if not self._ordenado:
+            # Durante la carga inicial se agrega al final y se ordena una sola vez
+            self._claves.append(entrada)
+            return
+        bisect.insort(self._recientes, entrada)
+        if len(self._recientes) > self.MAX_RECIENTES:
+            self._claves.extend(self._recientes)
+            self._claves.sort()
+            self._recientes = []
+
+    def cargar(self, object_id, nombre, apellido, email=None):
+        with self._lock:
+            self._ordenado = False
+        self.agregar(object_id, nombre, apellido)
+
+    def quitar(self, object_id):
+        with self._lock:
+            self._quitar(object_id.binary)
+
+    def _quitar(self, clave):
+        documento = self._documentos.pop(clave, None)
+        if documento is None:
+            return
+        self._obsoletas += len(documento[2])
+        if self._obsoletas > max(1000, len(self._claves) // 4):
+            self._compactar()
+
+    def _compactar(self):
+        self._claves = sorted(
+            (entrada, clave) for clave, (_, _, entradas) in self._documentos.items() for entrada in entradas
+        )
+        self._recientes = []
+        self._obsoletas = 0
+
+    def buscar(self, consulta, limite=10, **opciones):
+        prefijo = clave_prefijo(consulta)
+        if not prefijo:
+            return []
+        with self._lock:
+            if not self._ordenado:
+                self._claves.sort()
+                self._ordenado = True
+            encontrados = {}
+            for arreglo in (self._claves, self._recientes):
+                self._recorrer(arreglo, prefijo, limite, encontrados)
+            mejores = sorted(encontrados.items(), key=lambda item: item[1])[:limite]
+            return [
+                {'_id': ObjectId(clave), 'nombre': self._documentos[clave][0], 'apellido': self._documentos[clave][1]}
+                for clave, _ in mejores
+            ]
+
+    def _recorrer(self, arreglo, prefijo, limite, encontrados):
+        # Las entradas viejas de un documento modificado o borrado se saltean al leer
+        vistos = set()
+        for posicion in range(bisect.bisect_left(arreglo, (prefijo,)), len(arreglo)):
+            entrada, clave = arreglo[posicion]
+            if not entrada.startswith(prefijo) or len(vistos) >= limite:
+                return
+            documento = self._documentos.get(clave)
+            if documento is None or entrada not in documento[2]:
+                continue
+            vistos.add(clave)
+            if clave not in encontrados or entrada < encontrados[clave]:
+                encontrados[clave] = entrada
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'documentos': len(self._documentos),
+                'entradas': len(self._claves) + len(self._recientes),
+                'recientes': len(self._recientes),
+                'obsoletas': self._obsoletas,
+                'desbordado': self.desbordado
+            }
+
+
+class IndiceBusqueda:
+    # Un indice en memoria por empresa, construido al iniciar y mantenido por las escrituras del repositorio
+
+    def __init__(self, fabrica, nombre='busqueda', campos=('nombre', 'apellido', 'email')):
+        self.nombre = nombre
+        self.campos = campos
+        self._fabrica = fabrica
+        self._indices = {}
+        self._lock = threading.Lock()
+        self._modificados = set()
+        self.listo = threading.Event()
+        self.error = None
+
+    def _indice(self, empresa_id, crear=True):
+        indice = self._indices.get(empresa_id)
+        if indice is None and crear:
+            indice = self._indices[empresa_id] = self._fabrica()
+        return indice
+
+    def indexar(self, empresa_id, documento):
+        with self._lock:
+            if not self.listo.is_set():
+                self._modificados.add((empresa_id, documento['_id']))
+            self._indice(empresa_id).agregar(documento['_id'], documento.get('nombre'), documento.get('apellido'), documento.get('email'))
+
+    def quitar(self, empresa_id, object_id):
+        with self._lock:
+            if not self.listo.is_set():
+                self._modificados.add((empresa_id, object_id))
+            indice = self._indice(empresa_id, crear=False)
+            if indice:
+                indice.quitar(object_id)
+
+    def cargar(self, documento):
+        # Un documento escrito por la API durante la construccion ya tiene su version vigente en el indice
+        empresa_id = documento.get('empresa_id') or Config.EMPRESA_POR_DEFECTO
+        with self._lock:
+            if not self.listo.is_set() and (empresa_id, documento['_id']) not in self._modificados:
+                self._indice(empresa_id).cargar(documento['_id'], documento.get('nombre'), documento.get('apellido'), documento.get('email'))
+
+    def iniciar_construccion(self):
+        # Vuelve a un indice vacio que acepta la carga inicial
+        with self._lock:
+            self._indices = {}
+            self._modificados.clear()
+            self.listo.clear()
+
+    def terminar_construccion(self):
+        with self._lock:
+            self._modificados.clear()
+            self.listo.set()
+
+    def reiniciar(self):
+        # Descarta todo, incluida una construccion en curso, y deja el indice vacio y listo
+        with self._lock:
+            self._indices = {}
+            self._modificados.clear()
+            self.listo.set()
+
+    def construir(self, documentos):
+        for documento in documentos:
+            self.cargar(documento)
+        self.terminar_construccion()
+
+    def buscar(self, empresa_id, consulta, **opciones):
+        if not self.listo.is_set():
+            raise ErrorConexion(f"El indice de {self.nombre} se esta construyendo, intente mas tarde", reintentar_en=5)
+        indice = self._indice(empresa_id, crear=False)
+        if indice is None:
+            return []
+        if indice.desbordado:
+            raise ErrorConexion(f"El indice de {self.nombre} supero su capacidad para esta empresa")
+        return indice.buscar(consulta, **opciones)
+
+    def metricas(self):
+        with self._lock:
+            indices = list(self._indices.items())
+        return {
+            'listo': self.listo.is_set(),
+            'error': self.error,
+            'empresas': {empresa_id: indice.metricas() for empresa_id, indice in indices}
+        }
+
+
+def construir_en_segundo_plano(indices, proveedor):
+    # Una sola lectura de la coleccion alimenta todos los indices en memoria
+    def construir():
+        try:
+            for documento in proveedor():
+                for indice in indices:
+                    indice.cargar(documento)
+            for indice in indices:
+                indice.terminar_construccion()
+        except Exception as e:
+            for indice in indices:
+                indice.error = str(e)
+            print(f"Error al construir los indices en memoria: {e}")
+
+    hilo = threading.Thread(target=construir, name='peopleflow-indices', daemon=True)
+    hilo.start()
+    return hilo
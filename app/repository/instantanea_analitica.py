@@ -0,0 +1,284 @@
+import threading
+import time
+import numpy as np
+from app.config import Config
+from app.models.employee import salario_a_centavos
+
+
+PERCENTILES = (10, 25, 50, 75, 90)
+_BITS_SALARIO = 42
+
+
+class ColumnasEmpresa:
+    # Columnas numpy de una empresa: salario en centavos, codigo de puesto y anio de ingreso.
+    # Las bajas liberan su fila para la proxima alta
+
+    def __init__(self, capacidad=1024):
+        self._posiciones = {}
+        self._libres = []
+        self._tamano = 0
+        self._codigos_puesto = {}
+        self.puestos = []
+        self.salarios = np.zeros(capacidad, dtype=np.int64)
+        self.codigos = np.zeros(capacidad, dtype=np.int32)
+        self.anios = np.zeros(capacidad, dtype=np.int16)
+        self.vivos = np.zeros(capacidad, dtype=bool)
+
+    def __len__(self):
+        return len(self._posiciones)
+
+    def agregar(self, object_id, documento):
+        posicion = self._posiciones.get(object_id)
+        if posicion is None:
+            posicion = self._libres.pop() if self._libres else self._nueva_fila()
+            self._posiciones[object_id] = posicion
+
+        salario = documento.get('salario_centavos')
+        if salario is None:
+            salario = salario_a_centavos(documento.get('salario') or 0)
+        puesto = documento.get('puesto')
+        codigo = self._codigos_puesto.get(puesto)
+        if codigo is None:
+            codigo = self._codigos_puesto[puesto] = len(self.puestos)
+            self.puestos.append(puesto)
+        fecha = documento.get('fecha_ingreso')
+
+        self.salarios[posicion] = salario
+        self.codigos[posicion] = codigo
+        self.anios[posicion] = fecha.year if fecha else 0
+        self.vivos[posicion] = True
+
+    def _nueva_fila(self):
+        if self._tamano == len(self.salarios):
+            capacidad = len(self.salarios) * 2
+            self.salarios = np.resize(self.salarios, capacidad)
+            self.codigos = np.resize(self.codigos, capacidad)
+            self.anios = np.resize(self.anios, capacidad)
+            self.vivos = np.concatenate((self.vivos, np.zeros(capacidad - len(self.vivos), dtype=bool)))
+        self._tamano += 1
+        return self._tamano - 1
+
+    def quitar(self, object_id):
+        posicion = self._posiciones.pop(object_id, None)
+        if posicion is not None:
+            self.vivos[posicion] = False
+            self._libres.append(posicion)
+
+    def filas_vivas(self):
+        # Copias de las filas vigentes: el calculo se hace fuera del lock
+        vivos = self.vivos[:self._tamano]
+        return self.salarios[:self._tamano][vivos], self.codigos[:self._tamano][vivos], self.anios[:self._tamano][vivos], list(self.puestos)
+
+    def bytes(self):
+        return self.salarios.nbytes + self.codigos.nbytes + self.anios.nbytes + self.vivos.nbytes
+
+
+def _agrupar(claves, salarios):
+    # Cantidad, promedio y mediana por grupo ordenando una sola vez por (clave, salario)
+    if not len(claves):
+        return []
+    minimo = int(claves.min())
+    desplazadas = claves.astype(np.int64) - minimo
+    if salarios.min() >= 0 and salarios.max() < 1 << _BITS_SALARIO and desplazadas.max() < 1 << (63 - _BITS_SALARIO):
+        # Clave y salario en un unico int64: ordenar enteros es un orden de magnitud mas rapido que lexsort
+        combinadas = np.sort(desplazadas << _BITS_SALARIO | salarios)
+        claves = (combinadas >> _BITS_SALARIO) + minimo
+        salarios = combinadas & ((1 << _BITS_SALARIO) - 1)
+    else:
+        orden = np.lexsort((salarios, claves))
+        claves, salarios = claves[orden], salarios[orden]
+    inicios = np.flatnonzero(np.r_[True, claves[1:] != claves[:-1]])
+    cantidades = np.diff(np.r_[inicios, len(claves)])
+    sumas = np.add.reduceat(salarios, inicios)
+    medianas = (salarios[inicios + (cantidades - 1) // 2] + salarios[inicios + cantidades // 2]) / 2
+    return [
+        (clave, int(cantidad), round(float(suma) / cantidad / 100, 2), round(float(mediana) / 100, 2))
+        for clave, cantidad, suma, mediana in zip(claves[inicios].tolist(), cantidades, sumas, medianas)
+    ]
+
+
+def calcular_estadisticas(salarios, codigos, anios, puestos, bandas):
+    if not len(salarios):
+        return {
+            'total_empleados': 0,
+            'promedio_salarios': 0.0,
+            'salario_minimo': None,
+            'salario_maximo': None,
+            'percentiles_salario': {f'p{p}': None for p in PERCENTILES},
+            'por_puesto': [],
+            'por_anio_ingreso': [],
+            'por_banda_salarial': []
+        }
+
+    percentiles = np.percentile(salarios, PERCENTILES) / 100
+    por_puesto = sorted(_agrupar(codigos, salarios), key=lambda grupo: (-grupo[1], str(puestos[grupo[0]])))
+
+    bandas = np.array(bandas, dtype=np.int64)
+    banda = np.searchsorted(bandas, salarios, side='right') - 1
+    banda[banda == len(bandas) - 1] = -1
+    por_banda = []
+    for indice, cantidad, promedio, mediana in _agrupar(banda, salarios):
+        fuera_de_rango = indice < 0
+        por_banda.append({
+            'desde': bandas[-1] / 100 if fuera_de_rango else bandas[indice] / 100,
+            'hasta': None if fuera_de_rango else bandas[indice + 1] / 100,
+            'cantidad': cantidad,
+            'promedio_salarios': promedio,
+            'mediana_salarios': mediana
+        })
+    # Igual que en las facetas, los salarios fuera de las bandas van al final
+    por_banda.sort(key=lambda grupo: grupo['hasta'] is None)
+
+    return {
+        'total_empleados': int(len(salarios)),
+        'promedio_salarios': round(float(salarios.mean()) / 100, 2),
+        'salario_minimo': int(salarios.min()) / 100,
+        'salario_maximo': int(salarios.max()) / 100,
+        'percentiles_salario': {f'p{p}': round(float(valor), 2) for p, valor in zip(PERCENTILES, percentiles)},
+        'por_puesto': [
+            {'valor': puestos[codigo], 'cantidad': cantidad, 'promedio_salarios': promedio, 'mediana_salarios': mediana}
+            for codigo, cantidad, promedio, mediana in por_puesto
+        ],
+        'por_anio_ingreso': [
+            {'valor': anio or None, 'cantidad': cantidad, 'promedio_salarios': promedio, 'mediana_salarios': mediana}
+            for anio, cantidad, promedio, mediana in _agrupar(anios, salarios)
+        ],
+        'por_banda_salarial': por_banda
+    }
+
+
+class InstantaneaAnalitica:
+    # Proyeccion en memoria de salario, puesto y fecha de ingreso por empresa. Las escrituras del
+    # proceso se aplican al momento y una recarga periodica completa corrige lo escrito por otros procesos
+
+    nombre = 'analitica'
+    campos = ('salario_centavos', 'salario', 'puesto', 'fecha_ingreso')
+
+    def __init__(self, refresco_segundos=300, reloj=time.monotonic):
+        self.refresco_segundos = refresco_segundos
+        self._reloj = reloj
+        self._lock = threading.Lock()
+        self._empresas = {}
+        self._cargando = {}
+        self._pendientes = {}
+        self._generada = None
+        self._recargas = 0
+        self.listo = threading.Event()
+        self.error = None
+
+    def indexar(self, empresa_id, documento):
+        with self._lock:
+            self._columnas(self._empresas, empresa_id).agregar(documento['_id'], documento)
+            if self._cargando is not None:
+                self._pendientes[(empresa_id, documento['_id'])] = documento
+
+    def quitar(self, empresa_id, object_id):
+        with self._lock:
+            columnas = self._empresas.get(empresa_id)
+            if columnas is not None:
+                columnas.quitar(object_id)
+            if self._cargando is not None:
+                self._pendientes[(empresa_id, object_id)] = None
+
+    def cargar(self, documento):
+        empresa_id = documento.get('empresa_id') or Config.EMPRESA_POR_DEFECTO
+        with self._lock:
+            if self._cargando is not None:
+                self._columnas(self._cargando, empresa_id).agregar(documento['_id'], documento)
+
+    def terminar_construccion(self):
+        # Lo escrito durante la carga pisa lo leido, que puede ser anterior a la escritura
+        with self._lock:
+            if self._cargando is None:
+                return
+            for (empresa_id, object_id), documento in self._pendientes.items():
+                columnas = self._columnas(self._cargando, empresa_id)
+                if documento is None:
+                    columnas.quitar(object_id)
+                else:
+                    columnas.agregar(object_id, documento)
+            self._empresas = self._cargando
+            self._cargando = None
+            self._pendientes = {}
+            self._generada = self._reloj()
+            self._recargas += 1
+            self.listo.set()
+
+    def iniciar_construccion(self):
+        # Descarta la instantanea vigente: hasta terminar la carga las estadisticas se leen de la base
+        with self._lock:
+            self._empresas = {}
+            self._cargando = {}
+            self._pendientes = {}
+            self._generada = None
+            self.listo.clear()
+
+    def recargar(self, documentos):
+        with self._lock:
+            self._cargando = {}
+            self._pendientes = {}
+        for documento in documentos:
+            self.cargar(documento)
+        self.terminar_construccion()
+
+    def reiniciar(self):
+        with self._lock:
+            self._empresas = {}
+            self._cargando = None
+            self._pendientes = {}
+            self._generada = self._reloj()
+            self.listo.set()
+
+    def iniciar_refresco(self, proveedor):
+        def refrescar():
+            while True:
+                time.sleep(self.refresco_segundos)
+                try:
+                    self.recargar(proveedor())
+                    self.error = None
+                except Exception as e:
+                    self.error = str(e)
+                    print(f"Error al recargar la instantanea analitica: {e}")
+
+        hilo = threading.Thread(target=refrescar, name='peopleflow-analitica', daemon=True)
+        hilo.start()
+        return hilo
+
+    @staticmethod
+    def _columnas(empresas, empresa_id):
+        columnas = empresas.get(empresa_id)
+        if columnas is None:
+            columnas = empresas[empresa_id] = ColumnasEmpresa()
+        return columnas
+
+    def antiguedad(self):
+        with self._lock:
+            return round(self._reloj() - self._generada, 1) if self._generada is not None else None
+
+    def filas(self, empresa_id):
+        with self._lock:
+            columnas = self._empresas.get(empresa_id)
+            if columnas is None:
+                return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int16), []
+            return columnas.filas_vivas()
+
+    def estadisticas(self, empresa_id, bandas):
+        return calcular_estadisticas(*self.filas(empresa_id), bandas)
+
+    def promedio(self, empresa_id):
+        salarios = self.filas(empresa_id)[0]
+        return round(float(salarios.mean()) / 100, 2) if len(salarios) else 0.0
+
+    def metricas(self):
+        antiguedad = self.antiguedad()
+        with self._lock:
+            return {
+                'listo': self.listo.is_set(),
+                'cargando': self._cargando is not None,
+                'error': self.error,
+                'antiguedad_segundos': antiguedad,
+                'recargas': self._recargas,
+                'empresas': len(self._empresas),
+                'filas': sum(len(columnas) for columnas in self._empresas.values()),
+                'bytes': sum(columnas.bytes() for columnas in self._empresas.values())
+            }
@@ -0,0 +1,74 @@
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from app.models.job import Job
+from app.db import get_database, proteger
+from app.common import contexto
+from app.common.errors import JobNoEncontrado, ErrorBaseDatos, ErrorConexion, PlazoAgotado
+from app.repository.base import RepositorioJobs
+
+
+class JobsRepository(RepositorioJobs):
+
+    def __init__(self):
+        self.coleccion = proteger(get_database().jobs)
+
+    def crear(self, job):
+        try:
+            datos_mongo = job.to_mongo_dict()
+            datos_mongo['empresa_id'] = contexto.empresa_actual()
+            resultado = self.coleccion.insert_one(datos_mongo)
+            job._id = resultado.inserted_id
+            return job
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al crear job: {str(e)}")
+
+    def obtener_por_id(self, job_id):
+        try:
+            documento = self.coleccion.find_one({"_id": ObjectId(job_id), "empresa_id": contexto.empresa_actual()})
+        except (InvalidId, TypeError):
+            raise JobNoEncontrado(job_id)
+
+        if not documento:
+            raise JobNoEncontrado(job_id)
+        return Job.from_dict(documento)
+
+    def actualizar(self, job_id, campos, errores_nuevos=None, max_errores=100):
+        operacion = {"$set": campos}
+        if errores_nuevos:
+            operacion["$push"] = {"errores": {"$each": errores_nuevos, "$slice": max_errores}}
+        try:
+            self.coleccion.update_one({"_id": ObjectId(job_id)}, operacion)
+        except (ErrorConexion, PlazoAgotado):
+            raise
+        except Exception as e:
+            raise ErrorBaseDatos(f"Error al actualizar job: {str(e)}")
+
+    def solicitar_cancelacion(self, job_id):
+        try:
+            documento = self.coleccion.find_one_and_update(
+                {"_id": ObjectId(job_id), "empresa_id": contexto.empresa_actual()},
+                {"$set": {"cancelacion_solicitada": True}},
+                return_document=ReturnDocument.AFTER
+            )
+        except (InvalidId, TypeError):
+            raise JobNoEncontrado(job_id)
+
+        if not documento:
+            raise JobNoEncontrado(job_id)
+        return Job.from_dict(documento)
+
+    def reanudar(self, job_id):
+        # Solo un pedido de reanudacion gana: el job pasa a pendiente si seguia fallido o cancelado
+        documento = self.coleccion.find_one_and_update(
+            {"_id": ObjectId(job_id), "empresa_id": contexto.empresa_actual(), "estado": {"$in": [Job.FALLIDO, Job.CANCELADO]}},
+            {"$set": {"estado": Job.PENDIENTE, "cancelacion_solicitada": False, "mensaje": None, "finalizado": None}},
+            return_document=ReturnDocument.AFTER
+        )
+        return Job.from_dict(documento) if documento else None
+
+    def cancelacion_solicitada(self, job_id):
+        documento = self.coleccion.find_one({"_id": ObjectId(job_id)}, {"cancelacion_solicitada": 1})
+        return bool(documento and documento.get('cancelacion_solicitada'))
@@ -0,0 +1,457 @@
+import re
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
+from app.models.employee import Employee, salario_a_centavos
+from app.models.job import Job
+from app.common import contexto
+from app.common.errors import EmpleadoNoEncontrado, EmailYaExiste, JobNoEncontrado
+from app.common.paginacion import decodificar_cursor
+from app.repository.base import RepositorioEmpleados, RepositorioHistorialSalarios, RepositorioJobs, CAMPOS_ORDEN
+
+
+def _copiar(documento):
+    # Como un documento leido de MongoDB: quien lo recibe puede modificarlo sin tocar el guardado
+    copia = dict(documento)
+    if isinstance(copia.get('ajuste_salarial'), dict):
+        copia['ajuste_salarial'] = dict(copia['ajuste_salarial'])
+    return copia
+
+
+def _clave_valor(valor):
+    # Igual que MongoDB, los valores nulos o ausentes ordenan antes que cualquier otro
+    return (0,) if valor is None else (1, valor)
+
+
+def _cumple(valor, condicion):
+    if not isinstance(condicion, dict):
+        return valor == condicion
+    for operador, esperado in condicion.items():
+        if operador == '$regex':
+            opciones = re.IGNORECASE if 'i' in condicion.get('$options', '') else 0
+            if not isinstance(valor, str) or not re.search(esperado, valor, opciones):
+                return False
+        elif operador == '$options':
+            continue
+        elif operador == '$ne':
+            if valor == esperado:
+                return False
+        elif operador == '$in':
+            if valor not in esperado:
+                return False
+        elif valor is None:
+            return False
+        elif operador == '$gte' and not valor >= esperado:
+            return False
+        elif operador == '$gt' and not valor > esperado:
+            return False
+        elif operador == '$lte' and not valor <= esperado:
+            return False
+        elif operador == '$lt' and not valor < esperado:
+            return False
+    return True
+
+
+def _coincide(documento, filtros):
+    return all(_cumple(documento.get(campo), condicion) for campo, condicion in filtros.items())
+
+
+class _ParticionEmpresa:
+    # Empleados de una empresa por _id, con indice unico de email y ordenes del listado construidos
+    # al primer uso y mantenidos en cada escritura
+
+    def __init__(self):
+        self.documentos = {}
+        self.emails = {}
+        self._ordenes = {}
+
+    def orden(self, campo):
+        claves = self._ordenes.get(campo)
+        if claves is None:
+            claves = self._ordenes[campo] = sorted(self._clave(campo, documento) for documento in self.documentos.values())
+        return claves
+
+    @staticmethod
+    def _clave(campo, documento):
+        return (_clave_valor(documento.get(campo)) if campo else (), documento['_id'])
+
+    def guardar(self, documento):
+        anterior = self.documentos.get(documento['_id'])
+        if anterior is not None:
+            self._quitar_de_indices(anterior)
+        self.documentos[documento['_id']] = documento
+        self.emails[documento['email']] = documento['_id']
+        for campo, claves in self._ordenes.items():
+            insort(claves, self._clave(campo, documento))
+
+    def quitar(self, object_id):
+        documento = self.documentos.pop(object_id, None)
+        if documento is not None:
+            self._quitar_de_indices(documento)
+        return documento
+
+    def _quitar_de_indices(self, documento):
+        if self.emails.get(documento['email']) == documento['_id']:
+            del self.emails[documento['email']]
+        for campo, claves in self._ordenes.items():
+            del claves[bisect_left(claves, self._clave(campo, documento))]
+
+
+class EmployeesRepositoryMemoria(RepositorioEmpleados):
+    # Backend en memoria con la misma semantica que el de MongoDB: unicidad del email por empresa,
+    # filtros, paginacion por pagina o cursor, agregados e historial. Pensado para pruebas y desarrollo
+
+    def __init__(self, historial=None):
+        super().__init__(historial or HistorialSalariosMemoria())
+        self._empresas = {}
+        self._lock = threading.RLock()
+
+    def _particion(self, empresa_id=None):
+        empresa_id = empresa_id or contexto.empresa_actual()
+        particion = self._empresas.get(empresa_id)
+        if particion is None:
+            particion = self._empresas[empresa_id] = _ParticionEmpresa()
+        return particion
+
+    @staticmethod
+    def _object_id(empleado_id):
+        try:
+            return ObjectId(empleado_id)
+        except (InvalidId, TypeError):
+            raise EmpleadoNoEncontrado(empleado_id)
+
+    def crear(self, empleado):
+        datos = empleado.to_mongo_dict()
+        datos['empresa_id'] = contexto.empresa_actual()
+        with self._lock:
+            particion = self._particion()
+            if empleado.email.lower() in particion.emails:
+                raise EmailYaExiste(empleado.email)
+            empleado._id = datos['_id'] = ObjectId()
+            particion.guardar(datos)
+
+        self._registrar_historial([(empleado._id, None, datos['salario_centavos'])])
+        self._indexar([_copiar(datos)])
+        return empleado
+
+    def obtener_por_id(self, empleado_id):
+        object_id = self._object_id(empleado_id)
+        with self._lock:
+            documento = self._particion().documentos.get(object_id)
+            if documento is None:
+                raise EmpleadoNoEncontrado(empleado_id)
+            return Employee.from_dict(_copiar(documento))
+
+    def obtener_por_ids(self, object_ids):
+        with self._lock:
+            documentos = self._particion().documentos
+            return {
+                object_id: Employee.from_dict(_copiar(documentos[object_id]))
+                for object_id in object_ids if object_id in documentos
+            }
+
+    def obtener_todos(self, filtros=None, pagina=1, por_pagina=10, orden=None, cursor=None):
+        filtros = self._filtros(filtros)
+        pagina = max(1, pagina)
+        por_pagina = max(1, min(100, por_pagina))
+        campo, direccion = (CAMPOS_ORDEN[orden[0]], orden[1]) if orden else (None, 1)
+
+        with self._lock:
+            particion = self._particion()
+            claves = particion.orden(campo)
+            if cursor:
+                valor, object_id = decodificar_cursor(cursor, self._nombre_orden(orden))
+                limite = ((_clave_valor(valor) if campo else ()), object_id)
+                posiciones = range(bisect_right(claves, limite), len(claves)) if direccion == 1 else range(bisect_left(claves, limite) - 1, -1, -1)
+                saltear = 0
+            else:
+                posiciones = range(len(claves)) if direccion == 1 else range(len(claves) - 1, -1, -1)
+                saltear = (pagina - 1) * por_pagina
+
+            empleados = []
+            for posicion in posiciones:
+                documento = particion.documentos[claves[posicion][1]]
+                if not _coincide(documento, filtros):
+                    continue
+                if saltear:
+                    saltear -= 1
+                    continue
+                empleados.append(Employee.from_dict(_copiar(documento)))
+                if len(empleados) == por_pagina:
+                    break
+            return empleados
+
+    def iterar_todos(self, filtros=None, tamano_lote=1000):
+        # Igual que el cursor de MongoDB, la empresa y el filtro se fijan al pedir la exportacion
+        documentos = self._buscar(filtros)
+        return (Employee.from_dict(documento) for documento in documentos)
+
+    def _buscar(self, filtros=None, empresa_id=None):
+        filtros = self._filtros(filtros)
+        with self._lock:
+            particion = self._particion(empresa_id)
+            return [_copiar(documento) for documento in particion.documentos.values() if _coincide(documento, filtros)]
+
+    @staticmethod
+    def _filtros(filtros):
+        return {campo: valor for campo, valor in (filtros or {}).items() if valor}
+
+    def actualizar(self, empleado_id, datos_actualizacion):
+        object_id = self._object_id(empleado_id)
+        campos = Employee.campos_mongo(datos_actualizacion)
+        with self._lock:
+            particion = self._particion()
+            if 'email' in campos:
+                propietario = particion.emails.get(campos['email'].lower())
+                if propietario is not None and propietario != object_id:
+                    raise EmailYaExiste(datos_actualizacion['email'])
+            anterior = particion.documentos.get(object_id)
+            if anterior is None:
+                raise EmpleadoNoEncontrado(empleado_id)
+            particion.guardar({**anterior, **campos})
+
+        if 'salario_centavos' in campos:
+            self._registrar_historial([(object_id, self._salario_centavos(anterior), campos['salario_centavos'])])
+        self._indexar([{**anterior, **campos}], modificados=campos.keys())
+        return self.obtener_por_id(empleado_id)
+
+    def actualizar_masivo(self, actualizaciones):
+        resultados = {}
+        historial = []
+        indexar = []
+        with self._lock:
+            particion = self._particion()
+            for object_id, cambios in actualizaciones:
+                anterior = particion.documentos.get(object_id)
+                if anterior is None:
+                    resultados[object_id] = EmpleadoNoEncontrado(object_id)
+                    continue
+                campos = Employee.campos_mongo(cambios)
+                propietario = particion.emails.get(campos['email'].lower()) if 'email' in campos else None
+                if propietario is not None and propietario != object_id:
+                    resultados[object_id] = EmailYaExiste(cambios['email'])
+                    continue
+                particion.guardar({**anterior, **campos})
+                resultados[object_id] = None
+                if 'salario' in cambios:
+                    historial.append((object_id, self._salario_centavos(anterior), salario_a_centavos(cambios['salario'])))
+                indexar.append(({**anterior, **campos}, campos.keys()))
+
+        self._registrar_historial(historial)
+        for documento, modificados in indexar:
+            self._indexar([documento], modificados=modificados)
+        return resultados
+
+    def limites_ajuste_salarial(self, filtros):
+        # Los empleados creados despues de confirmar el ajuste (con _id mayor al ultimo) no entran en el
+        documentos = self._buscar(filtros)
+        return len(documentos), max((documento['_id'] for documento in documentos), default=None)
+
+    def lotes_ajuste_salarial(self, filtros, hasta_id, desde_id=None, tamano_lote=1000):
+        filtros = self._filtros(filtros)
+        filtros['_id'] = {"$lte": hasta_id} if desde_id is None else {"$gt": desde_id, "$lte": hasta_id}
+        return self._lotes_ajuste(contexto.empresa_actual(), filtros, tamano_lote)
+
+    def _lotes_ajuste(self, empresa_id, filtros, tamano_lote):
+        with self._lock:
+            ids = sorted(documento['_id'] for documento in self._particion(empresa_id).documentos.values() if _coincide(documento, filtros))
+        for inicio in range(0, len(ids), tamano_lote):
+            # Cada lote se lee al procesarlo, con lo que escribieron los lotes anteriores
+            with self._lock:
+                documentos = self._particion(empresa_id).documentos
+                lote = [_copiar(documentos[object_id]) for object_id in ids[inicio:inicio + tamano_lote] if object_id in documentos]
+            if lote:
+                yield lote
+
+    def aplicar_ajuste_salarial(self, ajuste_id, cambios):
+        with self._lock:
+            particion = self._particion()
+            for documento, nuevo in self._pendientes_ajuste(ajuste_id, cambios):
+                guardado = particion.documentos.get(documento['_id'])
+                if guardado is None or (guardado.get('ajuste_salarial') or {}).get('id') == ajuste_id:
+                    continue
+                particion.guardar(dict(
+                    guardado,
+                    salario_centavos=nuevo,
+                    ajuste_salarial={'id': ajuste_id, 'salario_anterior_centavos': self._salario_centavos(documento)}
+                ))
+        return self._registrar_ajuste(ajuste_id, cambios)
+
+    def emails_en_uso(self, emails):
+        with self._lock:
+            en_uso = self._particion().emails
+            return {email: en_uso[email] for email in emails if email in en_uso}
+
+    def eliminar(self, empleado_id):
+        empleado = self.obtener_por_id(empleado_id)
+        with self._lock:
+            if self._particion().quitar(empleado._id) is None:
+                raise EmpleadoNoEncontrado(empleado_id)
+        self._desindexar(empleado._id)
+        return empleado
+
+    def contar(self, filtros=None):
+        filtros = self._filtros(filtros)
+        with self._lock:
+            return sum(1 for documento in self._particion().documentos.values() if _coincide(documento, filtros))
+
+    def contar_listado(self, filtros=None):
+        return self.contar(filtros), True
+
+    def obtener_facetas(self, filtros=None):
+        bandas = self._bandas_facetas()
+        puestos = {}
+        rangos = {}
+        anios = {}
+        for documento in self._buscar(filtros):
+            puestos[documento.get('puesto')] = puestos.get(documento.get('puesto'), 0) + 1
+            salario = documento.get('salario_centavos')
+            # Mismo criterio que $bucket: fuera de [primer limite, ultimo limite) va al grupo por defecto
+            banda = bandas[bisect_right(bandas, salario) - 1] if salario is not None and bandas[0] <= salario < bandas[-1] else 'fuera_de_rango'
+            rangos[banda] = rangos.get(banda, 0) + 1
+            anio = documento['fecha_ingreso'].year if documento.get('fecha_ingreso') else None
+            anios[anio] = anios.get(anio, 0) + 1
+
+        resultado = {
+            'puesto': [
+                {'_id': puesto, 'cantidad': cantidad}
+                for puesto, cantidad in sorted(puestos.items(), key=lambda item: (-item[1], _clave_valor(item[0])))
+            ],
+            'banda_salarial': [
+                {'_id': banda, 'cantidad': rangos[banda]}
+                for banda in bandas + ['fuera_de_rango'] if banda in rangos
+            ],
+            'anio_ingreso': [
+                {'_id': anio, 'cantidad': cantidad}
+                for anio, cantidad in sorted(anios.items(), key=lambda item: _clave_valor(item[0]))
+            ]
+        }
+        return self._formatear_facetas(resultado, bandas)
+
+    def proyeccion_empresa(self, campos):
+        return [
+            {campo: documento[campo] for campo in ('_id', *campos) if campo in documento}
+            for documento in self._buscar()
+        ]
+
+    def obtener_promedio_salarios_empresa(self):
+        salarios = [salario for salario in map(self._salario_centavos, self._buscar()) if salario is not None]
+        return round(sum(salarios) / len(salarios) / 100, 2) if salarios else 0.0
+
+    def documentos_para_indices(self, indices=None):
+        campos = {"_id", "empresa_id"}.union(*(indice.campos for indice in indices or self.indices_memoria))
+        with self._lock:
+            documentos = [documento for particion in self._empresas.values() for documento in particion.documentos.values()]
+        for documento in documentos:
+            yield {campo: documento[campo] for campo in campos if campo in documento}
+
+
+class HistorialSalariosMemoria(RepositorioHistorialSalarios):
+
+    def __init__(self):
+        self._cambios = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, cambios, ajuste_id=None):
+        # cambios: lista de (empleado_id, salario_anterior_centavos, salario_centavos)
+        ahora = datetime.now()
+        empresa_id = contexto.empresa_actual()
+        with self._lock:
+            for empleado_id, anterior, nuevo in cambios:
+                if anterior == nuevo:
+                    continue
+                registrados = self._cambios.setdefault((empresa_id, empleado_id), [])
+                # Un ajuste reanudado no repite el cambio
+                if ajuste_id and any(cambio.get('ajuste_id') == ajuste_id for cambio in registrados):
+                    continue
+                cambio = {'fecha': ahora, 'salario_anterior_centavos': anterior, 'salario_centavos': nuevo}
+                if ajuste_id:
+                    cambio['ajuste_id'] = ajuste_id
+                registrados.append(cambio)
+
+    def obtener_por_empleado(self, empleado_id, hasta=None):
+        with self._lock:
+            cambios = [dict(cambio) for cambio in self._cambios.get((contexto.empresa_actual(), empleado_id), [])]
+        if hasta:
+            cambios = [cambio for cambio in cambios if cambio['fecha'] <= hasta]
+        return cambios
+
+    def salario_a_fecha(self, empleado_id, fecha):
+        previos = self.obtener_por_empleado(empleado_id, hasta=fecha)
+        return max(previos, key=lambda cambio: cambio['fecha']) if previos else None
+
+    def cambios_en_rango(self, desde, hasta, solo_aumentos=False, pagina=1, por_pagina=100):
+        empresa_id = contexto.empresa_actual()
+        with self._lock:
+            cambios = [
+                dict(cambio, empleado_id=empleado_id)
+                for (empresa, empleado_id), registrados in self._cambios.items() if empresa == empresa_id
+                for cambio in registrados
+                if desde <= cambio['fecha'] <= hasta
+                and (not solo_aumentos or (cambio['salario_anterior_centavos'] is not None and cambio['salario_centavos'] > cambio['salario_anterior_centavos']))
+            ]
+        cambios.sort(key=lambda cambio: (cambio['fecha'], cambio['empleado_id']))
+        inicio = (pagina - 1) * por_pagina
+        return cambios[inicio:inicio + por_pagina], len(cambios)
+
+
+class JobsRepositoryMemoria(RepositorioJobs):
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def crear(self, job):
+        datos = job.to_mongo_dict()
+        datos['empresa_id'] = contexto.empresa_actual()
+        with self._lock:
+            job._id = datos['_id'] = ObjectId()
+            self._jobs[job._id] = datos
+        return job
+
+    def _documento(self, job_id):
+        try:
+            documento = self._jobs.get(ObjectId(job_id))
+        except (InvalidId, TypeError):
+            raise JobNoEncontrado(job_id)
+        if documento is None or documento['empresa_id'] != contexto.empresa_actual():
+            raise JobNoEncontrado(job_id)
+        return documento
+
+    def obtener_por_id(self, job_id):
+        with self._lock:
+            return Job.from_dict(dict(self._documento(job_id)))
+
+    def actualizar(self, job_id, campos, errores_nuevos=None, max_errores=100):
+        with self._lock:
+            documento = self._jobs.get(ObjectId(job_id))
+            if documento is None:
+                return
+            documento.update(campos)
+            if errores_nuevos:
+                documento['errores'] = (documento['errores'] + list(errores_nuevos))[:max_errores]
+
+    def solicitar_cancelacion(self, job_id):
+        with self._lock:
+            documento = self._documento(job_id)
+            documento['cancelacion_solicitada'] = True
+            return Job.from_dict(dict(documento))
+
+    def reanudar(self, job_id):
+        # Solo un pedido de reanudacion gana: el job pasa a pendiente si seguia fallido o cancelado
+        with self._lock:
+            try:
+                documento = self._documento(job_id)
+            except JobNoEncontrado:
+                return None
+            if documento['estado'] not in (Job.FALLIDO, Job.CANCELADO):
+                return None
+            documento.update({'estado': Job.PENDIENTE, 'cancelacion_solicitada': False, 'mensaje': None, 'finalizado': None})
+            return Job.from_dict(dict(documento))
+
+    def cancelacion_solicitada(self, job_id):
+        with self._lock:
+            documento = self._jobs.get(ObjectId(job_id))
+            return bool(documento and documento.get('cancelacion_solicitada'))
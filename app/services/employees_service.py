@@ -1,23 +1,58 @@
-from app.repository.employees_repository import EmployeesRepository
-from app.models.employee import Employee
-from app.common.errors import DatosInvalidos, EmpleadoNoEncontrado, ErrorBaseDatos
+from app.repository.employees_repository import ordenes_indexados
+from app.repository.backends import crear_repositorio_empleados
+from app.repository.indice_busqueda import IndiceBusqueda, IndicePrefijos, IndiceTrigramas, construir_en_segundo_plano
+from app.repository.instantanea_analitica import ColumnasEmpresa, InstantaneaAnalitica, calcular_estadisticas
+from app.models.employee import Employee, salario_a_centavos
+from app.models.ajuste_salarial import AjusteSalarial, columnas
+from app.common.errors import DatosInvalidos, EmpleadoNoEncontrado, ErrorBaseDatos, EmailYaExiste, ErrorConexion, PlazoAgotado
 from app.config import Config
-from datetime import datetime
+from app.common import contexto, metricas
+from datetime import datetime, timedelta
+import math
+import numpy as np
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+FILTROS_AJUSTE = ('nombre', 'apellido', 'email', 'puesto', 'salario_min', 'salario_max', 'fecha_desde', 'fecha_hasta')
+TAMANO_MUESTRA_AJUSTE = 20
+# Marca para agrupar con numpy a los empleados sin puesto; no puede coincidir con un puesto real
+_SIN_PUESTO = '\x1f'
 
 
 class EmployeesService:
     
-    def __init__(self):
-        self.repo = EmployeesRepository()
+    def __init__(self, repo=None):
+        self.busqueda = None
+        self.autocompletado = None
+        if Config.BUSQUEDA_HABILITADA:
+            self.busqueda = IndiceBusqueda(lambda: IndiceTrigramas(Config.BUSQUEDA_MAX_DOCUMENTOS), nombre='busqueda')
+            metricas.registrar('indice_busqueda', self.busqueda.metricas)
+        if Config.AUTOCOMPLETADO_HABILITADO:
+            self.autocompletado = IndiceBusqueda(lambda: IndicePrefijos(Config.BUSQUEDA_MAX_DOCUMENTOS), nombre='autocompletado')
+            metricas.registrar('indice_autocompletado', self.autocompletado.metricas)
+        self.analitica = None
+        if Config.ANALITICA_HABILITADA:
+            self.analitica = InstantaneaAnalitica(Config.ANALITICA_REFRESCO_SEGUNDOS)
+            metricas.registrar('instantanea_analitica', self.analitica.metricas)
+        self.usar_repositorio(repo or crear_repositorio_empleados())
+        if self.analitica and Config.ANALITICA_REFRESCO_SEGUNDOS > 0:
+            self.analitica.iniciar_refresco(lambda: self.repo.documentos_para_indices([self.analitica]))
+    
+    def usar_repositorio(self, repo):
+        # Los indices en memoria pasan al nuevo repositorio y se reconstruyen con sus datos
+        self.repo = repo
+        self.historial = repo.historial
+        for indice in (self.busqueda, self.autocompletado, self.analitica):
+            if indice:
+                indice.iniciar_construccion()
+                repo.agregar_indice_memoria(indice)
+        if repo.indices_memoria:
+            construir_en_segundo_plano(repo.indices_memoria, repo.documentos_para_indices)
     
     def crear_empleado(self, datos_request):
-        try:
-            Employee.validar_campos(datos_request, validacion_completa=True)
-            empleado = Employee.from_dict(datos_request)
-        except ValueError as e:
-            raise DatosInvalidos(str(e))
-        
-        return self.repo.crear(empleado)
+        datos = Employee.validar_campos(datos_request, validacion_completa=True)
+        return self.repo.crear(Employee.from_dict(datos))
     
     def obtener_empleado(self, empleado_id):
         empleado = self.repo.obtener_por_id(empleado_id)
@@ -25,13 +60,109 @@ class EmployeesService:
             raise EmpleadoNoEncontrado(empleado_id)
         return empleado
     
-    def listar_empleados(self, filtros=None, pagina=1, por_pagina=10, **kwargs):
+    def obtener_empleados_lote(self, ids):
+        if not ids:
+            raise DatosInvalidos("Debe indicar al menos un ID")
+        if len(ids) > Config.MAX_IDS_LOTE:
+            raise DatosInvalidos(f"No se pueden solicitar mas de {Config.MAX_IDS_LOTE} IDs por lote")
+        
+        object_ids = {}
+        for empleado_id in ids:
+            try:
+                object_ids[empleado_id] = ObjectId(empleado_id)
+            except (InvalidId, TypeError):
+                object_ids[empleado_id] = None
+        
+        validos = list(dict.fromkeys(oid for oid in object_ids.values() if oid))
+        encontrados = self.repo.obtener_por_ids(validos) if validos else {}
+        
+        resultados = []
+        for empleado_id in ids:
+            object_id = object_ids[empleado_id]
+            if object_id is None:
+                resultados.append({'id': empleado_id, 'estado': 'id_invalido'})
+            elif object_id in encontrados:
+                resultados.append({
+                    'id': empleado_id,
+                    'estado': 'encontrado',
+                    'empleado': encontrados[object_id].to_dict()
+                })
+            else:
+                resultados.append({'id': empleado_id, 'estado': 'no_encontrado'})
+        
+        return {
+            'empleados': resultados,
+            'solicitados': len(ids),
+            'encontrados': sum(1 for r in resultados if r['estado'] == 'encontrado')
+        }
+    
+    def listar_empleados(self, filtros=None, pagina=1, por_pagina=10, orden=None, cursor=None, facetas=False, **kwargs):
         try:
             pagina = max(int(pagina), 1)
             por_pagina = max(min(int(por_pagina), 100), 1)
         except (ValueError, TypeError):
             raise DatosInvalidos("Parámetros de paginación inválidos")
         
+        orden = self._parsear_orden(orden)
+        filtros = self._construir_filtros(filtros, **kwargs)
+        
+        empleados = self.repo.obtener_todos(filtros, pagina, por_pagina, orden=orden, cursor=cursor)
+        # La pagina es lo imprescindible: el total y las facetas se omiten si ya no queda plazo
+        total, exacto = self._paso_opcional(self.repo.contar_listado, filtros) or (None, False)
+        
+        resultado = {
+            'empleados': [empleado.to_dict() for empleado in empleados],
+            'total': total,
+            'total_exacto': exacto,
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'total_paginas': (total + por_pagina - 1) // por_pagina if total is not None else None,
+            'siguiente_cursor': self.repo.cursor_siguiente(empleados[-1], orden) if len(empleados) == por_pagina else None
+        }
+        if facetas:
+            resultado['facetas'] = self._paso_opcional(self.repo.obtener_facetas, filtros)
+        omitidos = [campo for campo in ('total', 'facetas') if campo in resultado and resultado[campo] is None]
+        if omitidos:
+            resultado['omitidos_por_plazo'] = omitidos
+        return resultado
+    
+    @staticmethod
+    def _paso_opcional(paso, *args):
+        if contexto.plazo_agotado():
+            return None
+        try:
+            return paso(*args)
+        except PlazoAgotado:
+            return None
+    
+    def calentar_caches(self):
+        # Primera pagina con total y facetas de cada empresa conocida: llena las caches de conteos y facetas
+        empresas = list(dict.fromkeys([Config.EMPRESA_POR_DEFECTO, *Config.EMPRESAS_COLECCION_DEDICADA, *Config.EMPRESAS_MONEDA]))
+        for empresa_id in empresas:
+            token = contexto.empresa.set(empresa_id)
+            try:
+                self.listar_empleados(facetas=True)
+            finally:
+                contexto.empresa.reset(token)
+        return len(empresas)
+    
+    @staticmethod
+    def _parsear_orden(orden):
+        # "apellido" ascendente, "-apellido" descendente; solo campos con indice compuesto declarado
+        if not orden:
+            return None
+        campo = orden[1:] if orden.startswith('-') else orden
+        permitidos = ordenes_indexados()
+        if campo not in permitidos:
+            raise DatosInvalidos(f"Orden invalido. Campos disponibles: {', '.join(permitidos)}")
+        return (campo, -1 if orden.startswith('-') else 1)
+    
+    def exportar_empleados(self, **kwargs):
+        filtros = self._construir_filtros(None, **kwargs)
+        empleados = self.repo.iterar_todos(filtros, Config.TAMANO_LOTE_EXPORTACION)
+        return (empleado.to_dict() for empleado in empleados)
+    
+    def _construir_filtros(self, filtros=None, **kwargs):
         if not filtros:
             filtros = {}
             
@@ -44,49 +175,358 @@ class EmployeesService:
         if 'puesto' in kwargs and kwargs['puesto']:
             filtros['puesto'] = {'$regex': kwargs['puesto'], '$options': 'i'}
         
-        empleados = self.repo.obtener_todos(filtros, pagina, por_pagina)
-        total = self.repo.contar(filtros)
+        salario = self._rango(
+            self._parsear_salario(kwargs.get('salario_min')),
+            self._parsear_salario(kwargs.get('salario_max')),
+            "El salario minimo no puede ser mayor al maximo"
+        )
+        if salario:
+            filtros['salario_centavos'] = salario
+        
+        fecha_desde = kwargs.get('fecha_desde')
+        fecha_hasta = kwargs.get('fecha_hasta')
+        fecha = self._rango(
+            self._parsear_fecha(fecha_desde) if fecha_desde else None,
+            self._parsear_fecha(fecha_hasta, fin_del_dia=True) if fecha_hasta else None,
+            "La fecha desde no puede ser posterior a la fecha hasta"
+        )
+        if fecha:
+            filtros['fecha_ingreso'] = fecha
+        
+        return filtros
+    
+    @staticmethod
+    def _parsear_salario(valor):
+        if valor is None or valor == '':
+            return None
+        try:
+            salario = float(valor)
+        except (ValueError, TypeError):
+            raise DatosInvalidos("El salario del filtro debe ser un numero valido")
+        if math.isnan(salario) or math.isinf(salario) or salario < 0:
+            raise DatosInvalidos("El salario del filtro debe ser un numero valido")
+        return salario_a_centavos(salario)
+    
+    @staticmethod
+    def _rango(minimo, maximo, mensaje):
+        if minimo is not None and maximo is not None and minimo > maximo:
+            raise DatosInvalidos(mensaje)
+        rango = {}
+        if minimo is not None:
+            rango['$gte'] = minimo
+        if maximo is not None:
+            rango['$lte'] = maximo
+        return rango
+    
+    def actualizar_empleado(self, empleado_id, datos_request):
+        datos = Employee.validar_campos(datos_request)
+        if not datos:
+            raise DatosInvalidos("No se proporcionaron campos validos para actualizar")
         
+        return self.repo.actualizar(empleado_id, datos)
+    
+    def actualizar_empleados_masivo(self, items):
+        if not isinstance(items, list) or not items:
+            raise DatosInvalidos("Debe enviar una lista de actualizaciones")
+        if len(items) > Config.MAX_ITEMS_BULK:
+            raise DatosInvalidos(f"No se pueden actualizar mas de {Config.MAX_ITEMS_BULK} empleados por solicitud")
+        
+        resultados = [None] * len(items)
+        pendientes = []
+        ids_vistos = set()
+        
+        for indice, item in enumerate(items):
+            empleado_id = item.get('id') if isinstance(item, dict) else None
+            cambios = item.get('cambios', item.get('changes')) if isinstance(item, dict) else None
+            try:
+                object_id = ObjectId(empleado_id)
+            except (InvalidId, TypeError):
+                resultados[indice] = {'id': empleado_id, 'estado': 'error', 'errores': ["ID invalido"]}
+                continue
+            if object_id in ids_vistos:
+                resultados[indice] = {'id': empleado_id, 'estado': 'error', 'errores': ["ID repetido en la solicitud"]}
+                continue
+            ids_vistos.add(object_id)
+            
+            try:
+                datos = Employee.validar_campos(cambios if cambios is not None else {})
+                if not datos:
+                    raise DatosInvalidos("No se proporcionaron campos validos para actualizar")
+            except DatosInvalidos as e:
+                resultados[indice] = {'id': empleado_id, 'estado': 'error', 'errores': e.errores}
+                continue
+            pendientes.append((indice, object_id, datos))
+        
+        pendientes = self._descartar_emails_duplicados(pendientes, items, resultados)
+        
+        estados = self.repo.actualizar_masivo([(object_id, datos) for _, object_id, datos in pendientes])
+        for indice, object_id, _ in pendientes:
+            error = estados.get(object_id)
+            if error is None:
+                resultados[indice] = {'id': items[indice]['id'], 'estado': 'actualizado'}
+            else:
+                resultados[indice] = {'id': items[indice]['id'], 'estado': 'error', 'errores': [error.mensaje]}
+        
+        actualizados = sum(1 for r in resultados if r['estado'] == 'actualizado')
         return {
-            'empleados': [empleado.to_dict() for empleado in empleados],
+            'resultados': resultados,
+            'actualizados': actualizados,
+            'con_errores': len(items) - actualizados
+        }
+    
+    def _descartar_emails_duplicados(self, pendientes, items, resultados):
+        emails = {}
+        for indice, object_id, datos in pendientes:
+            if 'email' in datos:
+                emails.setdefault(datos['email'], []).append(indice)
+        if not emails:
+            return pendientes
+        
+        en_uso = self.repo.emails_en_uso(emails.keys())
+        rechazados = set()
+        for indice, object_id, datos in pendientes:
+            email = datos.get('email')
+            if not email:
+                continue
+            propietario = en_uso.get(email)
+            if (propietario is not None and propietario != object_id) or emails[email][0] != indice:
+                rechazados.add(indice)
+                resultados[indice] = {'id': items[indice]['id'], 'estado': 'error', 'errores': [EmailYaExiste(email).mensaje]}
+        
+        return [pendiente for pendiente in pendientes if pendiente[0] not in rechazados]
+    
+    def buscar_empleados(self, consulta, limite=10):
+        if not self.busqueda:
+            raise ErrorConexion("La busqueda aproximada no esta habilitada")
+        consulta = (consulta or '').strip()
+        if len(consulta) < 2:
+            raise DatosInvalidos("La busqueda necesita al menos 2 caracteres")
+        limite = self._parsear_limite(limite, Config.BUSQUEDA_MAX_RESULTADOS)
+        
+        resultados = self.busqueda.buscar(
+            contexto.empresa_actual(), consulta, limite=limite, similitud_minima=Config.BUSQUEDA_SIMILITUD_MINIMA
+        )
+        return {
+            'consulta': consulta,
+            'resultados': [
+                {
+                    'id': str(resultado['_id']),
+                    'nombre': resultado['nombre'],
+                    'apellido': resultado['apellido'],
+                    'email': resultado['email'],
+                    'similitud': resultado['similitud']
+                }
+                for resultado in resultados
+            ]
+        }
+    
+    def autocompletar(self, prefijo, limite=10):
+        if not self.autocompletado:
+            raise ErrorConexion("El autocompletado no esta habilitado")
+        limite = self._parsear_limite(limite, Config.AUTOCOMPLETADO_MAX_RESULTADOS)
+        
+        resultados = self.autocompletado.buscar(contexto.empresa_actual(), prefijo or '', limite=limite)
+        return {
+            'resultados': [
+                {'id': str(resultado['_id']), 'nombre': resultado['nombre'], 'apellido': resultado['apellido']}
+                for resultado in resultados
+            ]
+        }
+    
+    def _parsear_limite(self, limite, maximo):
+        try:
+            return max(min(int(limite), maximo), 1)
+        except (ValueError, TypeError):
+            raise DatosInvalidos("El limite debe ser un numero entero")
+    
+    def simular_ajuste_salarial(self, datos):
+        ajuste, filtros = self._parsear_ajuste(datos)
+        _, hasta_id = self.repo.limites_ajuste_salarial(filtros)
+        
+        evaluados = afectados = masa_actual = masa_nueva = 0
+        por_puesto = {}
+        muestra = []
+        lotes = self.repo.lotes_ajuste_salarial(filtros, hasta_id, tamano_lote=Config.TAMANO_LOTE_BULK) if hasta_id else []
+        for lote in lotes:
+            salarios, puestos = columnas(lote)
+            nuevos = ajuste.aplicar(salarios, puestos)
+            cambia = nuevos != salarios
+            evaluados += len(lote)
+            afectados += int(cambia.sum())
+            masa_actual += int(salarios.sum())
+            masa_nueva += int(nuevos.sum())
+            
+            if cambia.any():
+                claves = np.array([_SIN_PUESTO if puesto is None else puesto for puesto in puestos[cambia]])
+                valores, inversa = np.unique(claves, return_inverse=True)
+                cantidades = np.bincount(inversa)
+                diferencias = np.bincount(inversa, weights=(nuevos - salarios)[cambia])
+                for valor, cantidad, diferencia in zip(valores.tolist(), cantidades.tolist(), diferencias.tolist()):
+                    grupo = por_puesto.setdefault(None if valor == _SIN_PUESTO else valor, [0, 0])
+                    grupo[0] += cantidad
+                    grupo[1] += int(diferencia)
+            
+            for posicion in np.flatnonzero(cambia)[:TAMANO_MUESTRA_AJUSTE - len(muestra)].tolist():
+                documento = lote[posicion]
+                muestra.append({
+                    'id': str(documento['_id']),
+                    'nombre': documento.get('nombre'),
+                    'apellido': documento.get('apellido'),
+                    'puesto': documento.get('puesto'),
+                    'salario_actual': int(salarios[posicion]) / 100,
+                    'salario_nuevo': int(nuevos[posicion]) / 100
+                })
+        
+        diferencia = masa_nueva - masa_actual
+        return {
+            'empleados_evaluados': evaluados,
+            'empleados_afectados': afectados,
+            'masa_salarial_actual': masa_actual / 100,
+            'masa_salarial_nueva': masa_nueva / 100,
+            'costo_adicional': diferencia / 100,
+            'variacion_porcentual': round(diferencia * 100 / masa_actual, 2) if masa_actual else 0.0,
+            'aumento_promedio': round(diferencia / afectados / 100, 2) if afectados else 0.0,
+            'por_puesto': [
+                {'valor': puesto, 'afectados': cantidad, 'costo_adicional': costo / 100}
+                for puesto, (cantidad, costo) in sorted(por_puesto.items(), key=lambda item: -item[1][1])
+            ],
+            'muestra': muestra,
+            'moneda': contexto.moneda_empresa(),
+            'confirmar': {'tipo': 'ajuste_salarial', 'datos': {'reglas': datos['reglas'], 'filtros': datos.get('filtros') or {}}}
+        }
+    
+    def preparar_ajuste_salarial(self, datos):
+        # Valida el ajuste y fija el ultimo empleado alcanzado: devuelve los parametros del job y su total
+        _, filtros = self._parsear_ajuste(datos)
+        total, hasta_id = self.repo.limites_ajuste_salarial(filtros)
+        if not total:
+            raise DatosInvalidos("Ningun empleado coincide con los filtros del ajuste")
+        return {'reglas': datos['reglas'], 'filtros': datos.get('filtros') or {}, 'hasta_id': hasta_id}, total
+    
+    def ejecutar_ajuste_salarial(self, ajuste_id, parametros, desde_id=None):
+        # Por cada lote devuelve (ajustados, evaluados, ultimo _id) para que el job guarde su avance
+        ajuste, filtros = self._parsear_ajuste(parametros)
+        for lote in self.repo.lotes_ajuste_salarial(filtros, parametros['hasta_id'], desde_id, Config.TAMANO_LOTE_BULK):
+            salarios, puestos = columnas(lote)
+            nuevos = ajuste.aplicar(salarios, puestos)
+            cambios = [
+                (documento, int(nuevo))
+                for documento, salario, nuevo in zip(lote, salarios.tolist(), nuevos.tolist())
+                if salario != nuevo or (documento.get('ajuste_salarial') or {}).get('id') == ajuste_id
+            ]
+            yield self.repo.aplicar_ajuste_salarial(ajuste_id, cambios), len(lote), lote[-1]['_id']
+    
+    def _parsear_ajuste(self, datos):
+        if not isinstance(datos, dict):
+            raise DatosInvalidos("El ajuste necesita un objeto con reglas y filtros")
+        filtros = datos.get('filtros') or {}
+        if not isinstance(filtros, dict):
+            raise DatosInvalidos("Los filtros del ajuste deben ser un objeto")
+        desconocidos = sorted(set(filtros) - set(FILTROS_AJUSTE))
+        if desconocidos:
+            raise DatosInvalidos(f"Filtros invalidos: {', '.join(desconocidos)}. Filtros disponibles: {', '.join(FILTROS_AJUSTE)}")
+        return AjusteSalarial.desde_dict(datos.get('reglas')), self._construir_filtros(None, **filtros)
+    
+    def obtener_historial_salarios(self, empleado_id, fecha=None):
+        empleado = self.obtener_empleado(empleado_id)
+        
+        if fecha:
+            cambio = self.historial.salario_a_fecha(empleado._id, self._parsear_fecha(fecha, fin_del_dia=True))
+            return {
+                'empleado_id': str(empleado._id),
+                'fecha': fecha,
+                'salario': cambio['salario_centavos'] / 100 if cambio else None,
+                'vigente_desde': cambio['fecha'].strftime(Config.FECHA_HORA_FORMATO) if cambio else None
+            }
+        
+        cambios = self.historial.obtener_por_empleado(empleado._id)
+        return {
+            'empleado_id': str(empleado._id),
+            'salario_actual': empleado.salario,
+            'cambios': [self._cambio_a_dict(cambio) for cambio in cambios]
+        }
+    
+    def listar_cambios_salario(self, desde, hasta=None, solo_aumentos=False, pagina=1, por_pagina=100):
+        if not desde:
+            raise DatosInvalidos("Debe indicar la fecha desde")
+        try:
+            pagina = max(int(pagina), 1)
+            por_pagina = max(min(int(por_pagina), Config.MAX_PAGE_SIZE), 1)
+        except (ValueError, TypeError):
+            raise DatosInvalidos("Parámetros de paginación inválidos")
+        
+        fecha_desde = self._parsear_fecha(desde)
+        fecha_hasta = self._parsear_fecha(hasta, fin_del_dia=True) if hasta else datetime.now()
+        if fecha_desde > fecha_hasta:
+            raise DatosInvalidos("La fecha desde no puede ser posterior a la fecha hasta")
+        
+        cambios, total = self.historial.cambios_en_rango(fecha_desde, fecha_hasta, solo_aumentos, pagina, por_pagina)
+        return {
+            'cambios': [self._cambio_a_dict(cambio) for cambio in cambios],
             'total': total,
             'pagina': pagina,
             'por_pagina': por_pagina,
             'total_paginas': (total + por_pagina - 1) // por_pagina
         }
     
-    def actualizar_empleado(self, empleado_id, datos_request):
-        Employee.validar_campos(datos_request)  
-        
-        if 'fecha_ingreso' in datos_request and isinstance(datos_request['fecha_ingreso'], str):
-            try:
-                datos_request['fecha_ingreso'] = datetime.strptime(datos_request['fecha_ingreso'], '%d/%m/%Y')
-            except ValueError:
-                raise DatosInvalidos("Formato de fecha inválido. Use dd/mm/yyyy")
-        
-        if 'salario' in datos_request:
-            datos_request['salario'] = float(datos_request['salario'])
-        
-        return self.repo.actualizar(empleado_id, datos_request)
+    @staticmethod
+    def _parsear_fecha(valor, fin_del_dia=False):
+        try:
+            fecha = datetime.strptime(valor, Config.FECHA_FORMATO)
+        except (ValueError, TypeError):
+            raise DatosInvalidos("La fecha debe tener formato dd/mm/yyyy")
+        return fecha + timedelta(days=1, microseconds=-1) if fin_del_dia else fecha
+    
+    @staticmethod
+    def _cambio_a_dict(cambio):
+        anterior = cambio.get('salario_anterior_centavos')
+        nuevo = cambio['salario_centavos']
+        datos = {
+            'fecha': cambio['fecha'].strftime(Config.FECHA_HORA_FORMATO),
+            'salario_anterior': anterior / 100 if anterior is not None else None,
+            'salario': nuevo / 100,
+            'variacion_porcentual': round((nuevo - anterior) * 100 / anterior, 2) if anterior else None
+        }
+        if 'empleado_id' in cambio:
+            datos = {'empleado_id': str(cambio['empleado_id']), **datos}
+        return datos
     
     def eliminar_empleado(self, empleado_id):
         return self.repo.eliminar(empleado_id)
     
     def obtener_estadisticas(self):
-        total_empleados = self.repo.contar()
-        promedio_salarios = self.calcular_promedio_salarios_empresa()
+        bandas = [salario_a_centavos(limite) for limite in sorted(set(Config.FACETAS_BANDAS_SALARIO))]
+        if self._analitica_lista():
+            estadisticas = self.analitica.estadisticas(contexto.empresa_actual(), bandas)
+        else:
+            # Sin instantanea (deshabilitada o todavia cargando) se calcula sobre una proyeccion leida en el momento
+            columnas = ColumnasEmpresa()
+            for documento in self.repo.proyeccion_empresa(InstantaneaAnalitica.campos):
+                columnas.agregar(documento['_id'], documento)
+            estadisticas = calcular_estadisticas(*columnas.filas_vivas(), bandas)
         
         return {
-            'total_empleados': total_empleados,
-            'promedio_salarios': promedio_salarios,
-            'moneda': 'ARS',
-            'fecha_reporte': datetime.now().strftime('%d/%m/%Y %H:%M')
+            **estadisticas,
+            'empresa': contexto.empresa_actual(),
+            'moneda': contexto.moneda_empresa(),
+            'fecha_reporte': datetime.now().strftime('%d/%m/%Y %H:%M'),
+            'antiguedad_datos_segundos': self.antiguedad_datos()
         }
     
+    def antiguedad_datos(self):
+        return self.analitica.antiguedad() if self._analitica_lista() else 0
+    
+    def _analitica_lista(self):
+        return self.analitica is not None and self.analitica.listo.is_set()
+    
     def calcular_promedio_salarios_empresa(self):
         try:
+            if self._analitica_lista():
+                return self.analitica.promedio(contexto.empresa_actual())
             promedio = self.repo.obtener_promedio_salarios_empresa()
             return round(promedio, 2) if promedio else 0.0
+        except (ErrorConexion, PlazoAgotado):
+            raise
         except Exception as e:
             print(f"Error al calcular promedio: {e}")
             return 0.0
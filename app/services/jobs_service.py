@@ -0,0 +1,201 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import ObjectId
+from app.repository.backends import crear_repositorio_jobs
+from app.models.job import Job
+from app.common.errors import EmployeeError, DatosInvalidos, LimiteExcedido
+from app.common import contexto, metricas
+from app.config import Config
+
+
+def _lotes(items, tamano):
+    tamano = max(1, tamano)
+    for inicio in range(0, len(items), tamano):
+        yield inicio, items[inicio:inicio + tamano]
+
+
+class _ProgresoJob:
+
+    def __init__(self, repo, job_id, cancelacion, job=None):
+        self.repo = repo
+        self.job_id = job_id
+        self.cancelacion = cancelacion
+        # Un job reanudado continua con los contadores y el checkpoint del intento anterior
+        self.procesados = job.procesados if job else 0
+        self.exitosos = job.exitosos if job else 0
+        self.con_errores = job.con_errores if job else 0
+        self.checkpoint = job.checkpoint if job else None
+
+    def registrar(self, exitosos, errores, procesados=None, checkpoint=None):
+        self.exitosos += exitosos
+        self.con_errores += len(errores)
+        self.procesados += exitosos + len(errores) if procesados is None else procesados
+        campos = {'procesados': self.procesados, 'exitosos': self.exitosos, 'con_errores': self.con_errores}
+        if checkpoint is not None:
+            self.checkpoint = campos['checkpoint'] = checkpoint
+        self.repo.actualizar(
+            self.job_id,
+            campos,
+            errores_nuevos=errores[:Config.JOBS_MAX_ERRORES],
+            max_errores=Config.JOBS_MAX_ERRORES
+        )
+
+    def cancelado(self):
+        if self.cancelacion.is_set():
+            return True
+        if self.repo.cancelacion_solicitada(self.job_id):
+            self.cancelacion.set()
+            return True
+        return False
+
+
+class JobsService:
+
+    def __init__(self, employees_service, repo=None):
+        self.repo = repo or crear_repositorio_jobs()
+        self.employees_service = employees_service
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, Config.JOBS_MAX_CONCURRENTES),
+            thread_name_prefix='peopleflow-job'
+        )
+        self._cancelaciones = {}
+        self._en_ejecucion = 0
+        self._lock = threading.Lock()
+        self._tipos = {
+            'actualizacion_masiva': self._ejecutar_actualizacion_masiva,
+            'importacion': self._ejecutar_importacion,
+            'ajuste_salarial': self._ejecutar_ajuste_salarial
+        }
+        # Tipos reanudables: validan sus parametros al crearse y los guardan en el job
+        self._preparadores = {
+            'ajuste_salarial': self.employees_service.preparar_ajuste_salarial
+        }
+        metricas.registrar('jobs', self.metricas)
+
+    def crear_job(self, tipo, datos):
+        if tipo not in self._tipos:
+            raise DatosInvalidos(f"Tipo de job invalido. Tipos disponibles: {', '.join(self._tipos)}")
+        if tipo in self._preparadores:
+            datos, total = self._preparadores[tipo](datos)
+        else:
+            if not isinstance(datos, list) or not datos:
+                raise DatosInvalidos("El job necesita una lista de datos no vacia")
+            if len(datos) > Config.JOBS_MAX_ITEMS:
+                raise DatosInvalidos(f"Un job no puede procesar mas de {Config.JOBS_MAX_ITEMS} items")
+            total = len(datos)
+
+        with self._lock:
+            self._verificar_capacidad()
+            job = self.repo.crear(Job(tipo, total=total, parametros=datos if tipo in self._preparadores else None))
+            job_id = str(job._id)
+            self._cancelaciones[job_id] = threading.Event()
+
+        self._executor.submit(self._contexto_job().run, self._ejecutar, job_id, tipo, datos)
+        return job
+
+    def reanudar_job(self, job_id):
+        job = self.repo.obtener_por_id(job_id)
+        if job.parametros is None:
+            raise DatosInvalidos(f"Los jobs de tipo {job.tipo} no se pueden reanudar")
+
+        with self._lock:
+            self._verificar_capacidad()
+            job = self.repo.reanudar(job_id)
+            if job is None:
+                raise DatosInvalidos("Solo se pueden reanudar jobs fallidos o cancelados")
+            self._cancelaciones[job_id] = threading.Event()
+
+        self._executor.submit(self._contexto_job().run, self._ejecutar, job_id, job.tipo, job.parametros, job)
+        return job
+
+    @staticmethod
+    def _contexto_job():
+        # El job conserva la empresa de la solicitud pero no su plazo: sigue corriendo despues de responder
+        ctx = contextvars.copy_context()
+        ctx.run(contexto.plazo.set, None)
+        return ctx
+
+    def _verificar_capacidad(self):
+        if len(self._cancelaciones) >= Config.JOBS_MAX_CONCURRENTES + Config.JOBS_MAX_EN_COLA:
+            raise LimiteExcedido("Hay demasiados jobs en curso, intente mas tarde", reintentar_en=30)
+
+    def obtener_job(self, job_id):
+        return self.repo.obtener_por_id(job_id)
+
+    def cancelar_job(self, job_id):
+        job = self.repo.solicitar_cancelacion(job_id)
+        with self._lock:
+            cancelacion = self._cancelaciones.get(job_id)
+        if cancelacion:
+            cancelacion.set()
+        return job
+
+    def metricas(self):
+        with self._lock:
+            return {
+                'en_ejecucion': self._en_ejecucion,
+                'en_cola': len(self._cancelaciones) - self._en_ejecucion,
+                'max_concurrentes': Config.JOBS_MAX_CONCURRENTES,
+                'max_en_cola': Config.JOBS_MAX_EN_COLA
+            }
+
+    def _ejecutar(self, job_id, tipo, datos, job=None):
+        with self._lock:
+            cancelacion = self._cancelaciones[job_id]
+            self._en_ejecucion += 1
+        progreso = _ProgresoJob(self.repo, job_id, cancelacion, job)
+        try:
+            if progreso.cancelado():
+                self.repo.actualizar(job_id, {'estado': Job.CANCELADO, 'finalizado': datetime.now()})
+                return
+
+            self.repo.actualizar(job_id, {'estado': Job.EN_EJECUCION, 'iniciado': datetime.now()})
+            self._tipos[tipo](datos, progreso)
+
+            estado = Job.CANCELADO if cancelacion.is_set() else Job.COMPLETADO
+            self.repo.actualizar(job_id, {'estado': estado, 'finalizado': datetime.now()})
+        except Exception as e:
+            try:
+                self.repo.actualizar(job_id, {'estado': Job.FALLIDO, 'mensaje': str(e), 'finalizado': datetime.now()})
+            except Exception as error_registro:
+                print(f"Error al registrar fallo del job {job_id}: {error_registro}")
+        finally:
+            with self._lock:
+                self._cancelaciones.pop(job_id, None)
+                self._en_ejecucion -= 1
+
+    def _ejecutar_actualizacion_masiva(self, datos, progreso):
+        for _, lote in _lotes(datos, Config.TAMANO_LOTE_BULK):
+            if progreso.cancelado():
+                return
+            resultado = self.employees_service.actualizar_empleados_masivo(lote)
+            errores = [r for r in resultado['resultados'] if r['estado'] == 'error']
+            progreso.registrar(resultado['actualizados'], errores)
+
+    def _ejecutar_importacion(self, datos, progreso):
+        for inicio, lote in _lotes(datos, Config.TAMANO_LOTE_BULK):
+            if progreso.cancelado():
+                return
+            exitosos = 0
+            errores = []
+            for desplazamiento, item in enumerate(lote):
+                try:
+                    self.employees_service.crear_empleado(item)
+                    exitosos += 1
+                except EmployeeError as e:
+                    errores.append({
+                        'indice': inicio + desplazamiento,
+                        'estado': 'error',
+                        'errores': getattr(e, 'errores', [e.mensaje])
+                    })
+            progreso.registrar(exitosos, errores)
+
+    def _ejecutar_ajuste_salarial(self, parametros, progreso):
+        # Cada lote deja su checkpoint: si el job falla, reanudarlo sigue desde el ultimo lote confirmado
+        lotes = self.employees_service.ejecutar_ajuste_salarial(ObjectId(progreso.job_id), parametros, desde_id=progreso.checkpoint)
+        for ajustados, evaluados, ultimo_id in lotes:
+            progreso.registrar(ajustados, [], procesados=evaluados, checkpoint=ultimo_id)
+            if progreso.cancelado():
+                return
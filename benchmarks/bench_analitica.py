@@ -0,0 +1,69 @@
+"""Benchmark de la instantanea analitica de estadisticas.
+
+Carga N empleados sinteticos en las columnas numpy de una empresa y mide el
+tiempo de carga, la memoria de las columnas, el calculo completo de
+estadisticas (promedio, percentiles y agrupados por puesto, anio de ingreso y
+banda salarial) y la aplicacion de escrituras individuales.
+
+Uso:
+    python -m benchmarks.bench_analitica [empleados] [repeticiones]
+"""
+import random
+import sys
+import time
+from datetime import datetime
+from bson import ObjectId
+from app.config import Config
+from app.models.employee import salario_a_centavos
+from app.repository.instantanea_analitica import InstantaneaAnalitica
+
+
+PUESTOS = ('Desarrollador', 'Analista', 'Manager', 'Disenador', 'QA', 'Soporte', 'Ventas', None)
+
+
+def documentos(cantidad, aleatorio):
+    for _ in range(cantidad):
+        yield {
+            '_id': ObjectId(),
+            'empresa_id': 'default',
+            'puesto': aleatorio.choice(PUESTOS),
+            'salario_centavos': aleatorio.randrange(20000000, 300000000),
+            'fecha_ingreso': datetime(aleatorio.randrange(2000, 2026), 1, 1)
+        }
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2], tiempos[-1]
+
+
+if __name__ == '__main__':
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    aleatorio = random.Random(42)
+    bandas = [salario_a_centavos(limite) for limite in sorted(set(Config.FACETAS_BANDAS_SALARIO))]
+
+    instantanea = InstantaneaAnalitica()
+    inicio = time.perf_counter()
+    instantanea.recargar(documentos(cantidad, aleatorio))
+    carga = time.perf_counter() - inicio
+    metricas = instantanea.metricas()
+
+    print(f"empleados:            {cantidad}")
+    print(f"carga:                {carga:.2f} s ({cantidad / carga:,.0f} docs/s)")
+    print(f"columnas:             {metricas['bytes'] / 2**20:.1f} MB")
+    p50, maximo = medir(lambda: instantanea.estadisticas('default', bandas), repeticiones)
+    print(f"estadisticas:         p50 {p50:.1f} ms, max {maximo:.1f} ms")
+    p50, maximo = medir(lambda: instantanea.promedio('default'), repeticiones)
+    print(f"promedio:             p50 {p50:.1f} ms, max {maximo:.1f} ms")
+
+    nuevos = list(documentos(10000, aleatorio))
+    inicio = time.perf_counter()
+    for documento in nuevos:
+        instantanea.indexar('default', documento)
+    print(f"escritura individual: {(time.perf_counter() - inicio) * 1e6 / len(nuevos):.1f} us")
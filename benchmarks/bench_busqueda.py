@@ -0,0 +1,86 @@
+"""Benchmark de los indices en memoria de busqueda y autocompletado.
+
+Construye los indices de una empresa con N empleados sinteticos y mide el
+tiempo de construccion, el tamano de las listas de posiciones y la latencia
+(p50 y p99) de consultas con errores de tipeo y de prefijos de 1 a 4 letras.
+
+Uso:
+    python -m benchmarks.bench_busqueda [empleados] [consultas]
+"""
+import random
+import sys
+import time
+from bson import ObjectId
+from app.repository.indice_busqueda import IndicePrefijos, IndiceTrigramas
+
+
+NOMBRES = ('Juan', 'Ana', 'Martina', 'Lucas', 'Sofia', 'Mateo', 'Valentina', 'Santiago', 'Camila', 'Joaquin')
+APELLIDOS = ('Perez', 'Gonzalez', 'Rodriguez', 'Fernandez', 'Lopez', 'Martinez', 'Garcia', 'Romero', 'Sosa', 'Alvarez')
+
+
+def percentiles(tiempos):
+    tiempos = sorted(tiempos)
+    return tiempos[len(tiempos) // 2], tiempos[int(len(tiempos) * 0.99)]
+
+
+def medir(buscar, consultas):
+    tiempos = []
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        buscar(consulta, limite=10)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return percentiles(tiempos)
+
+
+def con_error(texto, aleatorio):
+    posicion = aleatorio.randrange(len(texto))
+    return texto[:posicion] + aleatorio.choice('aeiourst') + texto[posicion + 1:]
+
+
+if __name__ == '__main__':
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    aleatorio = random.Random(42)
+
+    empleados = []
+    for i in range(cantidad):
+        nombre = aleatorio.choice(NOMBRES)
+        apellido = f'{aleatorio.choice(APELLIDOS)}{i % 997}'
+        empleados.append((ObjectId(), nombre, apellido, f'{nombre.lower()}.{apellido.lower()}{i}@empresa.com'))
+
+    indice = IndiceTrigramas(max_documentos=cantidad)
+    inicio = time.perf_counter()
+    for empleado in empleados:
+        indice.cargar(*empleado)
+    construccion = time.perf_counter() - inicio
+    metricas = indice.metricas()
+    p50, p99 = medir(indice.buscar, [
+        con_error(f'{aleatorio.choice(APELLIDOS)}{aleatorio.randrange(997)}', aleatorio) for _ in range(consultas)
+    ])
+
+    print(f"empleados:          {cantidad}")
+    print("trigramas")
+    print(f"  construccion:     {construccion:.2f} s ({cantidad / construccion:,.0f} docs/s)")
+    print(f"  trigramas:        {metricas['trigramas']}")
+    print(f"  listas:           {metricas['bytes_listas'] / 2**20:.1f} MB ({metricas['apariciones']} apariciones)")
+    print(f"  consulta p50:     {p50:.2f} ms")
+    print(f"  consulta p99:     {p99:.2f} ms")
+
+    prefijos = IndicePrefijos(max_documentos=cantidad)
+    inicio = time.perf_counter()
+    for empleado in empleados:
+        prefijos.cargar(*empleado)
+    prefijos.buscar('a')
+    construccion = time.perf_counter() - inicio
+    print("prefijos")
+    print(f"  construccion:     {construccion:.2f} s ({cantidad / construccion:,.0f} docs/s)")
+    print(f"  entradas:         {prefijos.metricas()['entradas']}")
+    for largo in (1, 2, 4):
+        p50, p99 = medir(prefijos.buscar, [
+            aleatorio.choice(NOMBRES + APELLIDOS)[:largo] for _ in range(consultas)
+        ])
+        print(f"  prefijo de {largo}:      p50 {p50:.3f} ms, p99 {p99:.3f} ms")
+    for _ in range(1000):
+        prefijos.agregar(ObjectId(), aleatorio.choice(NOMBRES), aleatorio.choice(APELLIDOS))
+    p50, p99 = medir(prefijos.buscar, [aleatorio.choice(NOMBRES)[:3] for _ in range(consultas)])
+    print(f"  con 1000 recientes: p50 {p50:.3f} ms, p99 {p99:.3f} ms")
@@ -0,0 +1,62 @@
+"""Benchmark de compresion de respuestas: CPU contra bytes.
+
+Mide, para un listado de 100 empleados y para una exportacion NDJSON,
+el tamano resultante y el throughput de cada codificacion disponible
+(gzip siempre; brotli y zstd si estan instalados) a distintos niveles.
+
+Uso:
+    python -m benchmarks.bench_compresion [empleados_exportacion]
+"""
+import json
+import sys
+import time
+from app.common.compresion import crear_compresor, codificaciones_disponibles
+
+
+NIVELES = {
+    'gzip': (1, 3, 6, 9),
+    'br': (1, 4, 6, 11),
+    'zstd': (1, 3, 9, 19)
+}
+
+
+def generar_empleados(cantidad):
+    puestos = ('Desarrollador', 'Analista', 'Manager', 'Disenador', 'QA')
+    return [
+        {
+            'id': f'{i:024x}',
+            'nombre': f'Nombre{i}',
+            'apellido': f'Apellido{i % 500}',
+            'email': f'empleado{i}@empresa.com',
+            'puesto': puestos[i % len(puestos)],
+            'salario': 300000.0 + (i * 37) % 900000,
+            'fecha_ingreso': f'{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/20{10 + i % 15}'
+        }
+        for i in range(cantidad)
+    ]
+
+
+def medir(nombre, fragmentos, repeticiones):
+    original = sum(len(f) for f in fragmentos)
+    print(f"\n{nombre}: {original:,} bytes sin comprimir")
+    print(f"{'codificacion':<12}{'nivel':>6}{'bytes':>12}{'ratio':>8}{'MB/s':>10}")
+    for codificacion in codificaciones_disponibles():
+        for nivel in NIVELES[codificacion]:
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                compresor = crear_compresor(codificacion, nivel)
+                comprimido = sum(len(compresor.comprimir(f, vaciar=len(fragmentos) > 1)) for f in fragmentos)
+                comprimido += len(compresor.finalizar())
+            duracion = (time.perf_counter() - inicio) / repeticiones
+            print(f"{codificacion:<12}{nivel:>6}{comprimido:>12,}{original / comprimido:>8.1f}{original / duracion / 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    pagina = json.dumps({'empleados': generar_empleados(100), 'total': 100, 'pagina': 1}).encode('utf-8')
+    medir('Listado por_pagina=100', [pagina], repeticiones=50)
+
+    lineas = [(json.dumps(e) + '\n').encode('utf-8') for e in generar_empleados(cantidad)]
+    fragmentos = [b''.join(lineas[i:i + 1000]) for i in range(0, len(lineas), 1000)]
+    medir(f'Exportacion NDJSON de {cantidad} empleados (fragmentos de 1000)', fragmentos, repeticiones=1)
@@ -0,0 +1,66 @@
+"""Benchmark del tamano de documento segun el esquema de almacenamiento.
+
+Compara el tamano BSON de un empleado con el esquema original (salario
+float o int segun el cliente, fecha con hora), con el esquema version 2
+(salario en centavos enteros, fecha sin hora) y con una variante de claves
+cortas, y estima el espacio que ocupan en el cache de WiredTiger, que
+guarda los documentos sin comprimir.
+
+Uso:
+    python -m benchmarks.bench_esquema [empleados]
+"""
+import sys
+from datetime import datetime
+import bson
+from app.models.employee import Employee
+
+
+CLAVES_CORTAS = {
+    'esquema': 'v', 'empresa_id': 'e', 'nombre': 'n', 'apellido': 'a', 'email': 'm',
+    'puesto': 'p', 'salario_centavos': 's', 'fecha_ingreso': 'f'
+}
+
+
+def generar_empleados(cantidad):
+    puestos = ('Desarrollador', 'Analista', 'Manager', 'Disenador', 'QA')
+    return [
+        Employee(
+            f'Nombre{i}', f'Apellido{i % 500}', f'empleado{i}@empresa.com',
+            salario=300000 + (i % 1000) * 250.5 if i % 2 else 300000 + i % 1000,
+            fecha_ingreso=datetime(2010 + i % 15, i % 12 + 1, i % 28 + 1, 9, 30, 15, 123000),
+            puesto=puestos[i % len(puestos)],
+            _id=bson.ObjectId()
+        )
+        for i in range(cantidad)
+    ]
+
+
+def documento_original(empleado):
+    return {
+        '_id': empleado._id, 'nombre': empleado.nombre, 'apellido': empleado.apellido, 'email': empleado.email,
+        'puesto': empleado.puesto, 'salario': empleado.salario,
+        'fecha_ingreso': datetime(2020, 1, 1, 9, 30, 15), 'empresa_id': 'default'
+    }
+
+
+def documento_v2(empleado):
+    documento = empleado.to_mongo_dict()
+    documento['empresa_id'] = 'default'
+    return documento
+
+
+def documento_claves_cortas(empleado):
+    return {CLAVES_CORTAS.get(clave, clave): valor for clave, valor in documento_v2(empleado).items()}
+
+
+if __name__ == '__main__':
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    empleados = generar_empleados(cantidad)
+
+    print(f"{'esquema':<16}{'bytes/doc':>10}{'MB cada 1M docs':>18}")
+    base = None
+    for nombre, convertir in (('original', documento_original), ('v2', documento_v2), ('claves cortas', documento_claves_cortas)):
+        total = sum(len(bson.encode(convertir(empleado))) for empleado in empleados)
+        promedio = total / cantidad
+        base = base or promedio
+        print(f"{nombre:<16}{promedio:>10.1f}{promedio * 1e6 / 2**20:>18.1f}  ({(promedio - base) / base:+.1%})")
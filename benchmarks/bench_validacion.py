@@ -0,0 +1,76 @@
+"""Benchmark de validacion de payloads de empleados.
+
+Compara el validador compilado de una sola pasada contra el flujo anterior
+(validacion campo por campo + segundo strptime en Employee.from_dict).
+
+Uso:
+    python -m benchmarks.bench_validacion [cantidad]
+"""
+import sys
+import time
+from datetime import datetime
+from app.common.errors import DatosInvalidos
+from app.models.employee import Employee
+
+
+def generar_payloads(cantidad):
+    payloads = []
+    for i in range(cantidad):
+        payload = {
+            'nombre': f'Nombre{i}',
+            'apellido': f'Apellido{i}',
+            'email': f'Empleado{i}@Test.com',
+            'puesto': 'Desarrollador',
+            'salario': 300000 + i,
+            'fecha_ingreso': f'{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2020'
+        }
+        if i % 10 == 0:
+            payload['salario'] = 'no_es_numero'
+            payload['email'] = 'invalido'
+        payloads.append(payload)
+    return payloads
+
+
+def flujo_anterior(datos):
+    for campo in ('nombre', 'apellido', 'email', 'salario'):
+        if campo not in datos:
+            raise DatosInvalidos(f"El {campo} es obligatorio")
+    if not datos['nombre'].strip() or len(datos['nombre'].strip()) > 50:
+        raise DatosInvalidos("nombre")
+    if not datos['apellido'].strip() or len(datos['apellido'].strip()) > 50:
+        raise DatosInvalidos("apellido")
+    if '@' not in datos['email'] or '.' not in datos['email']:
+        raise DatosInvalidos("email")
+    try:
+        if float(datos['salario']) <= 0:
+            raise DatosInvalidos("salario")
+    except (TypeError, ValueError):
+        raise DatosInvalidos("salario")
+    fecha = datetime.strptime(datos['fecha_ingreso'], '%d/%m/%Y')
+    if fecha.date() > datetime.now().date():
+        raise DatosInvalidos("fecha")
+    datos = dict(datos, fecha_ingreso=datetime.strptime(datos['fecha_ingreso'], '%d/%m/%Y'))
+    return Employee.from_dict(datos)
+
+
+def flujo_actual(datos):
+    return Employee.from_dict(Employee.validar_campos(datos, validacion_completa=True))
+
+
+def medir(nombre, funcion, payloads):
+    inicio = time.perf_counter()
+    errores = 0
+    for payload in payloads:
+        try:
+            funcion(payload)
+        except DatosInvalidos:
+            errores += 1
+    duracion = time.perf_counter() - inicio
+    print(f"{nombre:<10} {len(payloads) / duracion:>12,.0f} payloads/s  ({errores} con errores)")
+
+
+if __name__ == '__main__':
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    payloads = generar_payloads(cantidad)
+    medir('anterior', flujo_anterior, payloads)
+    medir('actual', flujo_actual, payloads)
@@ -0,0 +1,64 @@
+"""Migracion de datos para el particionado por empresa.
+
+- asignar: completa empresa_id en los empleados que no lo tienen (datos
+  anteriores al particionado) con la empresa indicada.
+- mover: traslada los empleados de una empresa desde la coleccion compartida
+  a su coleccion dedicada, por lotes. Despues de moverla hay que agregarla a
+  EMPRESAS_COLECCION_DEDICADA para que la API lea de la nueva coleccion.
+
+Uso:
+    python -m scripts.migrar_empresas asignar [empresa]
+    python -m scripts.migrar_empresas mover <empresa> <coleccion> [tamano_lote]
+"""
+import sys
+from pymongo.errors import BulkWriteError
+from app.db import get_database
+from app.config import Config
+from app.repository.employees_repository import INDICES
+
+
+def asignar_empresa(database, empresa_id):
+    resultado = database.empleados.update_many(
+        {"empresa_id": {"$exists": False}},
+        {"$set": {"empresa_id": empresa_id}}
+    )
+    return resultado.modified_count
+
+
+def mover_empresa(database, empresa_id, nombre_coleccion, tamano_lote=1000):
+    origen = database.empleados
+    destino = database[nombre_coleccion]
+    for claves, opciones in INDICES:
+        destino.create_index(claves, **opciones)
+
+    movidos = 0
+    while True:
+        lote = list(origen.find({"empresa_id": empresa_id}).limit(tamano_lote))
+        if not lote:
+            return movidos
+        try:
+            destino.insert_many(lote, ordered=False)
+        except BulkWriteError as e:
+            # Si una ejecucion anterior se interrumpio, los documentos ya copiados se ignoran
+            if any(error.get('code') != 11000 for error in e.details.get('writeErrors', [])):
+                raise
+        origen.delete_many({"_id": {"$in": [doc['_id'] for doc in lote]}})
+        movidos += len(lote)
+        print(f"{movidos} empleados movidos a {nombre_coleccion}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in ('asignar', 'mover'):
+        print(__doc__)
+        sys.exit(1)
+
+    database = get_database()
+    if sys.argv[1] == 'asignar':
+        empresa_id = sys.argv[2] if len(sys.argv) > 2 else Config.EMPRESA_POR_DEFECTO
+        print(f"{asignar_empresa(database, empresa_id)} empleados asignados a {empresa_id}")
+    else:
+        if len(sys.argv) < 4:
+            print(__doc__)
+            sys.exit(1)
+        tamano_lote = int(sys.argv[4]) if len(sys.argv) > 4 else 1000
+        print(f"{mover_empresa(database, sys.argv[2], sys.argv[3], tamano_lote)} empleados movidos en total")
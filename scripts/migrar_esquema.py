@@ -0,0 +1,44 @@
+"""Migracion de empleados al esquema de almacenamiento version 2.
+
+Convierte el salario a centavos enteros (salario_centavos), quita la hora de
+fecha_ingreso y marca el documento con esquema=2. Es idempotente: solo toca
+los documentos que todavia no tienen la version actual, por lo que puede
+interrumpirse y volver a ejecutarse. Conviene correr antes
+`python -m scripts.migrar_empresas asignar` para que los documentos migrados
+cumplan el validador $jsonSchema.
+
+Uso:
+    python -m scripts.migrar_esquema [coleccion] [tamano_lote]
+"""
+import sys
+from pymongo import UpdateOne
+from app.db import get_database
+from app.models.employee import ESQUEMA_VERSION, salario_a_centavos, solo_fecha
+
+
+def migrar_documento(documento):
+    cambios = {'esquema': ESQUEMA_VERSION}
+    # Un documento viejo actualizado por la API ya tiene salario_centavos, que es el valor vigente
+    if documento.get('salario_centavos') is None and documento.get('salario') is not None:
+        cambios['salario_centavos'] = salario_a_centavos(documento['salario'])
+    if documento.get('fecha_ingreso') is not None:
+        cambios['fecha_ingreso'] = solo_fecha(documento['fecha_ingreso'])
+    return UpdateOne({'_id': documento['_id']}, {'$set': cambios, '$unset': {'salario': ''}})
+
+
+def migrar_esquema(coleccion, tamano_lote=1000):
+    pendientes = {'$or': [{'esquema': {'$exists': False}}, {'esquema': {'$lt': ESQUEMA_VERSION}}]}
+    migrados = 0
+    while True:
+        lote = list(coleccion.find(pendientes, {'salario': 1, 'salario_centavos': 1, 'fecha_ingreso': 1}).limit(tamano_lote))
+        if not lote:
+            return migrados
+        coleccion.bulk_write([migrar_documento(documento) for documento in lote], ordered=False)
+        migrados += len(lote)
+        print(f"{migrados} empleados migrados")
+
+
+if __name__ == '__main__':
+    nombre = sys.argv[1] if len(sys.argv) > 1 else 'empleados'
+    tamano_lote = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    print(f"{migrar_esquema(get_database()[nombre], tamano_lote)} empleados migrados en total")
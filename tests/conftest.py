@@ -1,17 +1,31 @@
 import pytest
 import os
 from dotenv import load_dotenv
+
+load_dotenv()
+# Por defecto los tests corren contra el backend en memoria; los que dependen de MongoDB usan la marca mongo
+os.environ.setdefault('REPOSITORIO_BACKEND', 'memoria')
+# Sin calentamiento en segundo plano por cada app creada; tests/test_salud.py lo ejecuta explicitamente
+os.environ.setdefault('CALENTAMIENTO_HABILITADO', 'False')
+
 from app import create_app
+from app.api.employees_routes import service
 from pymongo import MongoClient
 
-load_dotenv()
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'mongo: el test necesita el backend de MongoDB')
+
+
+def backend_del_test(request):
+    return 'mongo' if request.node.get_closest_marker('mongo') else os.environ['REPOSITORIO_BACKEND']
 
 
 @pytest.fixture
-def app():
+def app(request):
     """Crear app de Flask para testing"""
     os.environ['TESTING'] = 'True'
-    app = create_app()
+    app = create_app(backend=backend_del_test(request))
     app.config['TESTING'] = True
     
     main_uri = os.environ.get('MONGODB_URI')
@@ -36,7 +50,7 @@ def runner(app):
 
 
 @pytest.fixture(autouse=True)
-def clean_db():
+def clean_db(request):
     """Limpiar base de datos antes y despues de cada test"""
     main_uri = os.environ.get('MONGODB_URI')
     if not main_uri:
@@ -54,11 +68,18 @@ def clean_db():
     
     # Limpiar antes del test
     db.empleados.delete_many({})
+    db.jobs.delete_many({})
+    db.historial_salarios.delete_many({})
+    # Cada test arranca con un repositorio nuevo del backend que le corresponde, con indices y caches vacios
+    if 'app' not in request.fixturenames:
+        create_app(backend=backend_del_test(request))
     
     yield
     
     # Limpiar despues del test
     db.empleados.delete_many({})
+    db.jobs.delete_many({})
+    db.historial_salarios.delete_many({})
     client.close()
 
 
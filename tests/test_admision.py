@@ -0,0 +1,83 @@
+import threading
+from app import create_app
+from app.config import Config
+from app.common.admision import LimitadorConcurrencia, LimitadorTasa, clasificar, LECTURA, ESCRITURA, AGREGACION
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestAdmision:
+
+    def test_limitador_rechaza_cuando_se_supera_la_espera(self):
+        """Verifica que una solicitud que no consigue cupo dentro del presupuesto de espera es rechazada"""
+        limitador = LimitadorConcurrencia(limite=1, max_cola=4)
+
+        assert limitador.adquirir(0.01)
+        assert not limitador.adquirir(0.01)
+        limitador.liberar()
+        assert limitador.adquirir(0.01)
+        assert limitador.metricas()['rechazados'] == 1
+
+    def test_limitador_rechaza_sin_esperar_con_la_cola_llena(self):
+        """Verifica que con la cola llena el rechazo es inmediato"""
+        limitador = LimitadorConcurrencia(limite=1, max_cola=0)
+        limitador.adquirir(1)
+
+        assert not limitador.adquirir(60)
+
+    def test_limitador_admite_al_liberarse_un_cupo(self):
+        """Verifica que una solicitud en cola es admitida cuando otra libera su cupo"""
+        limitador = LimitadorConcurrencia(limite=1, max_cola=1)
+        limitador.adquirir(1)
+        threading.Timer(0.05, limitador.liberar).start()
+
+        assert limitador.adquirir(2)
+
+    def test_token_bucket_por_cliente(self):
+        """Verifica que cada cliente tiene su propio balde de tokens que se recarga con el tiempo"""
+        reloj = RelojFalso()
+        limitador = LimitadorTasa(tasa_por_segundo=2, rafaga=2, reloj=reloj)
+
+        assert limitador.consumir('a') == 0
+        assert limitador.consumir('a') == 0
+        assert limitador.consumir('a') == 0.5
+        assert limitador.consumir('b') == 0
+
+        reloj.ahora = 0.5
+        assert limitador.consumir('a') == 0
+
+    def test_clasificacion_de_rutas(self):
+        """Verifica que las rutas se clasifican en lecturas, escrituras y agregaciones"""
+        assert clasificar('employees.listar_empleados', 'GET') == LECTURA
+        assert clasificar('employees.crear_empleado', 'POST') == ESCRITURA
+        assert clasificar('employees.obtener_estadisticas', 'GET') == AGREGACION
+
+    def test_responde_429_con_retry_after(self, monkeypatch):
+        """Verifica que al superar la tasa por cliente se responde 429 con Retry-After"""
+        monkeypatch.setattr(Config, 'ADMISION_TASA_POR_CLIENTE', 1)
+        monkeypatch.setattr(Config, 'ADMISION_RAFAGA_POR_CLIENTE', 1)
+        client = create_app().test_client()
+
+        assert client.get('/api/empleados', headers={'X-Client-Id': 'c1'}).status_code == 200
+        response = client.get('/api/empleados', headers={'X-Client-Id': 'c1'})
+
+        assert response.status_code == 429
+        assert int(response.headers['Retry-After']) >= 1
+
+    def test_cupo_por_empresa(self, monkeypatch):
+        """Verifica que una empresa sin cupo propio es rechazada sin afectar a las demas"""
+        monkeypatch.setattr(Config, 'ADMISION_MAX_POR_EMPRESA', 1)
+        monkeypatch.setattr(Config, 'ADMISION_ESPERA_MAX_MS', 10)
+        app = create_app()
+        client = app.test_client()
+        app.extensions['admision']._limitador_empresa('grande').adquirir(1)
+
+        assert client.get('/api/empleados', headers={'X-Empresa-Id': 'grande'}).status_code == 503
+        assert client.get('/api/empleados', headers={'X-Empresa-Id': 'chica'}).status_code == 200
+        assert client.get('/api/empresas/chica/empleados/estadisticas').status_code == 200
@@ -0,0 +1,155 @@
+import json
+import numpy as np
+import pytest
+from bson import ObjectId
+from app.api.employees_routes import service
+from app.models.ajuste_salarial import AjusteSalarial
+from app.common.errors import DatosInvalidos
+from app.config import Config
+from tests.test_jobs import esperar_job
+
+
+def crear(client, nombre, puesto, salario):
+    datos = {'nombre': nombre, 'apellido': 'Test', 'email': f'{nombre.lower()}@test.com', 'puesto': puesto, 'salario': salario}
+    respuesta = client.post('/api/empleados', data=json.dumps(datos), content_type='application/json')
+    return respuesta.get_json()['empleado']['id']
+
+
+def salario(client, empleado_id):
+    return client.get(f'/api/empleados/{empleado_id}').get_json()['salario']
+
+
+AJUSTE = {
+    'reglas': [
+        {'tipo': 'porcentaje', 'valor': 10, 'puesto': 'Desarrollador'},
+        {'tipo': 'monto', 'valor': 50000, 'salario_max': 300000}
+    ]
+}
+
+
+@pytest.fixture
+def empleados(client):
+    return {
+        'ana': crear(client, 'Ana', 'Desarrollador', 400000),
+        'luis': crear(client, 'Luis', 'Desarrollador', 250000),
+        'eva': crear(client, 'Eva', 'Gerente', 900000),
+        'juan': crear(client, 'Juan', 'Soporte', 280000)
+    }
+
+
+class TestAjusteSalarial:
+
+    def test_reglas_vectorizadas(self):
+        """Verifica que las reglas evaluan sus condiciones sobre el salario original, acumulan efectos y redondean al centavo"""
+        ajuste = AjusteSalarial.desde_dict(AJUSTE['reglas'] + [{'tipo': 'minimo', 'valor': 350000, 'puesto': 'Soporte'}])
+        salarios = np.array([40000000, 25000000, 90000000, 28000000, 32000000], dtype=np.int64)
+        puestos = np.array(['Desarrollador', 'Desarrollador', 'Gerente', 'Soporte', None], dtype=object)
+
+        nuevos = ajuste.aplicar(salarios, puestos)
+
+        assert nuevos.tolist() == [44000000, 32500000, 90000000, 35000000, 32000000]
+        assert AjusteSalarial.desde_dict([{'tipo': 'porcentaje', 'valor': 3.333}]).aplicar(np.array([1001]), np.array([None])).tolist() == [1034]
+
+    def test_reglas_invalidas(self, client):
+        """Verifica que reglas o filtros invalidos se rechazan con 400 y el detalle de cada error"""
+        with pytest.raises(DatosInvalidos):
+            AjusteSalarial.desde_dict([])
+
+        response = client.post(
+            '/api/empleados/ajuste-salarial/simular',
+            data=json.dumps({'reglas': [{'tipo': 'otro', 'valor': 1}, {'tipo': 'porcentaje', 'valor': -100}]}),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+        assert len(response.get_json()['errores']) == 2
+
+        response = client.post(
+            '/api/empleados/ajuste-salarial/simular',
+            data=json.dumps({'reglas': AJUSTE['reglas'], 'filtros': {'departamento': 'IT'}}),
+            content_type='application/json'
+        )
+        assert response.status_code == 400
+
+    def test_simulacion_no_modifica(self, client, empleados):
+        """Verifica los totales, el desglose por puesto y la muestra de la simulacion, sin escribir cambios"""
+        response = client.post('/api/empleados/ajuste-salarial/simular', data=json.dumps(AJUSTE), content_type='application/json')
+
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['empleados_evaluados'] == 4
+        assert data['empleados_afectados'] == 3
+        assert data['masa_salarial_actual'] == 1830000
+        assert data['costo_adicional'] == 40000 + 75000 + 50000
+        assert data['por_puesto'] == [
+            {'valor': 'Desarrollador', 'afectados': 2, 'costo_adicional': 115000},
+            {'valor': 'Soporte', 'afectados': 1, 'costo_adicional': 50000}
+        ]
+        assert {item['nombre']: item['salario_nuevo'] for item in data['muestra']} == {'Ana': 440000, 'Luis': 325000, 'Juan': 330000}
+        assert data['confirmar'] == {'tipo': 'ajuste_salarial', 'datos': {'reglas': AJUSTE['reglas'], 'filtros': {}}}
+        assert salario(client, empleados['ana']) == 400000
+
+    def test_job_aplica_el_ajuste(self, client, empleados):
+        """Verifica que el job confirmado aplica el ajuste filtrado y deja historial y estadisticas consistentes"""
+        datos = dict(AJUSTE, filtros={'puesto': 'Desarrollador'})
+        salario(client, empleados['ana'])
+
+        response = client.post('/api/jobs', data=json.dumps({'tipo': 'ajuste_salarial', 'datos': datos}), content_type='application/json')
+        assert response.status_code == 202
+        job = esperar_job(client, response.get_json()['job_id'])
+
+        assert job['estado'] == 'completado'
+        assert (job['total'], job['procesados'], job['exitosos']) == (2, 2, 2)
+        assert not job['reanudable']
+        assert salario(client, empleados['ana']) == 440000
+        assert salario(client, empleados['luis']) == 325000
+        assert salario(client, empleados['juan']) == 280000
+        historial = client.get(f"/api/empleados/{empleados['luis']}/historial-salarios").get_json()
+        assert [cambio['salario'] for cambio in historial['cambios']] == [250000, 325000]
+        estadisticas = client.get('/api/empleados/estadisticas').get_json()
+        assert estadisticas['salario_maximo'] == 900000
+        assert estadisticas['promedio_salarios'] == (440000 + 325000 + 900000 + 280000) / 4
+
+    def test_reanudar_sin_duplicar(self, client, empleados, monkeypatch):
+        """Verifica que un job fallido a mitad se reanuda desde su checkpoint sin aplicar dos veces el aumento ni duplicar el historial"""
+        monkeypatch.setattr(Config, 'TAMANO_LOTE_BULK', 2)
+        original = service.repo.historial.registrar
+        llamadas = []
+
+        def registrar_con_fallo(cambios, ajuste_id=None):
+            llamadas.append(len(cambios))
+            original(cambios, ajuste_id=ajuste_id)
+            if len(llamadas) == 2:
+                raise RuntimeError("Conexion perdida")
+
+        monkeypatch.setattr(service.repo.historial, 'registrar', registrar_con_fallo)
+        datos = {'reglas': [{'tipo': 'porcentaje', 'valor': 10}]}
+        response = client.post('/api/jobs', data=json.dumps({'tipo': 'ajuste_salarial', 'datos': datos}), content_type='application/json')
+        job_id = response.get_json()['job_id']
+        job = esperar_job(client, job_id)
+
+        assert job['estado'] == 'fallido'
+        assert job['reanudable']
+        assert job['procesados'] == 2
+
+        response = client.post(f'/api/jobs/{job_id}/reanudar')
+        assert response.status_code == 202
+        job = esperar_job(client, job_id)
+
+        assert job['estado'] == 'completado'
+        assert job['procesados'] == 4
+        assert [salario(client, empleados[nombre]) for nombre in ('ana', 'luis', 'eva', 'juan')] == [440000, 275000, 990000, 308000]
+        for nombre in ('ana', 'luis', 'eva', 'juan'):
+            assert len(service.historial.obtener_por_empleado(ObjectId(empleados[nombre]))) == 2
+        assert client.post(f'/api/jobs/{job_id}/reanudar').status_code == 400
+
+    def test_excluye_empleados_posteriores(self, client, empleados):
+        """Verifica que los empleados creados despues de confirmar el ajuste no entran en el job"""
+        parametros, total = service.preparar_ajuste_salarial({'reglas': [{'tipo': 'monto', 'valor': 1000}]})
+        nuevo = crear(client, 'Sofia', 'Soporte', 200000)
+
+        resultados = list(service.ejecutar_ajuste_salarial(ObjectId(), parametros))
+
+        assert total == 4
+        assert sum(ajustados for ajustados, _, _ in resultados) == 4
+        assert salario(client, nuevo) == 200000
+        assert salario(client, empleados['eva']) == 901000
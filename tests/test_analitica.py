@@ -0,0 +1,133 @@
+import json
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app.api.employees_routes import service
+from app.db import get_database
+from app.repository.instantanea_analitica import ColumnasEmpresa, InstantaneaAnalitica
+
+
+EMPLEADOS = [
+    ('ana@test.com', 'Desarrollador', 400000, '10/03/2020'),
+    ('luis@test.com', 'Desarrollador', 600000, '01/07/2021'),
+    ('eva@test.com', 'Analista', 300000, '15/01/2021'),
+    ('juan@test.com', 'Desarrollador', 1500000, '20/11/2021')
+]
+
+
+def crear(client, email, puesto, salario, fecha_ingreso):
+    datos = {'nombre': 'Ana', 'apellido': 'Garcia', 'email': email, 'puesto': puesto, 'salario': salario, 'fecha_ingreso': fecha_ingreso}
+    respuesta = client.post('/api/empleados', data=json.dumps(datos), content_type='application/json')
+    return respuesta.get_json()['empleado']['id']
+
+
+@pytest.fixture
+def empleados(client):
+    return [crear(client, *empleado) for empleado in EMPLEADOS]
+
+
+class TestEstadisticas:
+
+    def test_agregados_por_grupo(self, client, empleados):
+        """Verifica promedio, percentiles y agregados por puesto, anio de ingreso y banda salarial"""
+        data = client.get('/api/empleados/estadisticas').get_json()
+
+        assert data['total_empleados'] == 4
+        assert data['promedio_salarios'] == 700000.0
+        assert data['salario_minimo'] == 300000.0
+        assert data['salario_maximo'] == 1500000.0
+        assert data['percentiles_salario']['p50'] == 500000.0
+        assert data['por_puesto'][0] == {'valor': 'Desarrollador', 'cantidad': 3, 'promedio_salarios': 833333.33, 'mediana_salarios': 600000.0}
+        assert [(grupo['valor'], grupo['cantidad']) for grupo in data['por_anio_ingreso']] == [(2020, 1), (2021, 3)]
+        assert [(grupo['desde'], grupo['cantidad']) for grupo in data['por_banda_salarial']] == [(250000.0, 2), (500000.0, 1), (1000000.0, 1)]
+        assert data['antiguedad_datos_segundos'] >= 0
+
+    def test_escrituras_se_aplican_al_momento(self, client, empleados):
+        """Verifica que cambios de salario o puesto y bajas se reflejan sin esperar la recarga"""
+        client.put(f'/api/empleados/{empleados[0]}', data=json.dumps({'puesto': 'Analista', 'salario': 500000}), content_type='application/json')
+        client.patch('/api/empleados/bulk', data=json.dumps([{'id': empleados[1], 'cambios': {'salario': 700000}}]),
+                     content_type='application/json')
+        client.delete(f'/api/empleados/{empleados[3]}')
+
+        data = client.get('/api/empleados/estadisticas').get_json()
+        promedio = client.get('/api/empleados/promedio-empresa').get_json()
+
+        assert data['total_empleados'] == 3
+        assert data['promedio_salarios'] == 500000.0
+        assert promedio['promedio_salarios'] == 500000.0
+        assert 'antiguedad_datos_segundos' in promedio
+        assert {grupo['valor']: grupo['cantidad'] for grupo in data['por_puesto']} == {'Analista': 2, 'Desarrollador': 1}
+
+    def test_sin_instantanea_lista_usa_la_base(self, client, empleados, monkeypatch):
+        """Verifica que mientras la instantanea carga las estadisticas se calculan igual sobre una proyeccion de la base"""
+        esperado = client.get('/api/empleados/estadisticas').get_json()
+        monkeypatch.setattr(service, 'analitica', InstantaneaAnalitica())
+
+        data = client.get('/api/empleados/estadisticas').get_json()
+
+        assert data['antiguedad_datos_segundos'] == 0
+        for clave in ('total_empleados', 'promedio_salarios', 'percentiles_salario', 'por_puesto', 'por_anio_ingreso', 'por_banda_salarial'):
+            assert data[clave] == esperado[clave]
+
+
+class TestInstantaneaAnalitica:
+
+    @pytest.mark.mongo
+    def test_recarga_incorpora_escrituras_externas(self, client, empleados):
+        """Verifica que la recarga periodica ve documentos escritos por otro proceso y reinicia la antiguedad"""
+        get_database().empleados.insert_one({
+            'empresa_id': 'default', 'email': 'otro@test.com', 'puesto': 'QA',
+            'salario_centavos': 20000000, 'fecha_ingreso': datetime(2022, 5, 1)
+        })
+        assert client.get('/api/empleados/estadisticas').get_json()['total_empleados'] == 4
+
+        service.analitica.recargar(service.repo.documentos_para_indices([service.analitica]))
+
+        data = client.get('/api/empleados/estadisticas').get_json()
+        assert data['total_empleados'] == 5
+        assert data['antiguedad_datos_segundos'] < 1
+
+    def test_escrituras_durante_la_recarga_prevalecen(self):
+        """Verifica que una baja o un cambio ocurridos mientras se recarga no se pierden al reemplazar la instantanea"""
+        instantanea = InstantaneaAnalitica()
+        primero, segundo = ObjectId(), ObjectId()
+
+        def documentos():
+            yield {'_id': primero, 'empresa_id': 'acme', 'salario_centavos': 100}
+            # Escrituras de la API mientras la lectura sigue en curso
+            instantanea.quitar('acme', primero)
+            instantanea.indexar('acme', {'_id': segundo, 'salario_centavos': 500})
+            yield {'_id': segundo, 'empresa_id': 'acme', 'salario_centavos': 300}
+
+        instantanea.recargar(documentos())
+
+        assert instantanea.estadisticas('acme', [0])['total_empleados'] == 1
+        assert instantanea.promedio('acme') == 5.0
+
+    def test_columnas_crecen_y_reusan_filas(self):
+        """Verifica que las columnas crecen al superar la capacidad y que una baja libera su fila"""
+        columnas = ColumnasEmpresa(capacidad=2)
+        ids = [ObjectId() for _ in range(5)]
+        for numero, object_id in enumerate(ids):
+            columnas.agregar(object_id, {'salario_centavos': numero * 100, 'puesto': 'QA'})
+        columnas.quitar(ids[0])
+        columnas.agregar(ObjectId(), {'salario_centavos': 1000})
+
+        salarios, codigos, _, puestos = columnas.filas_vivas()
+
+        assert len(columnas.salarios) == 8
+        assert sorted(salarios.tolist()) == [100, 200, 300, 400, 1000]
+        assert [puestos[codigo] for codigo in codigos].count(None) == 1
+
+    def test_salarios_fuera_del_rango_empaquetado(self):
+        """Verifica que los agrupados son correctos aunque un salario no entre en la clave combinada de 64 bits"""
+        instantanea = InstantaneaAnalitica()
+        instantanea.recargar([
+            {'_id': ObjectId(), 'empresa_id': 'acme', 'puesto': 'QA', 'salario_centavos': centavos}
+            for centavos in (100, 300, 2 ** 50)
+        ])
+
+        grupo = instantanea.estadisticas('acme', [0])['por_puesto'][0]
+
+        assert grupo['cantidad'] == 3
+        assert grupo['mediana_salarios'] == 3.0
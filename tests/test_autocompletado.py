@@ -0,0 +1,92 @@
+import json
+import pytest
+from bson import ObjectId
+from app.api.employees_routes import service
+from app.repository.indice_busqueda import IndiceBusqueda, IndicePrefijos
+
+
+def crear(client, nombre, apellido, email, empresa=None):
+    headers = {'X-Empresa-Id': empresa} if empresa else {}
+    datos = {'nombre': nombre, 'apellido': apellido, 'email': email, 'salario': 500000}
+    respuesta = client.post('/api/empleados', data=json.dumps(datos), content_type='application/json', headers=headers)
+    return respuesta.get_json()['empleado']['id']
+
+
+@pytest.fixture
+def indice(monkeypatch):
+    indice = IndiceBusqueda(IndicePrefijos, nombre='autocompletado')
+    indice.construir(service.repo.documentos_para_indices())
+    monkeypatch.setattr(service, 'autocompletado', indice)
+    monkeypatch.setattr(service.repo, 'indices_memoria', [indice])
+    return indice
+
+
+class TestAutocompletado:
+
+    def test_prefijo_de_nombre_o_apellido(self, client, indice):
+        """Verifica que el prefijo coincide con "nombre apellido" o "apellido nombre" sin acentos y con respuesta minima"""
+        crear(client, 'Juan', 'Pérez', 'juan@test.com')
+        crear(client, 'Juana', 'Gomez', 'juana@test.com')
+        crear(client, 'Ana', 'Juarez', 'ana@test.com')
+
+        data = client.get('/api/empleados/autocompletar?q=jua').get_json()
+        assert [r['nombre'] for r in data['resultados']] == ['Juan', 'Juana', 'Ana']
+        assert set(data['resultados'][0]) == {'id', 'nombre', 'apellido'}
+        assert 'total' not in data
+
+        data = client.get('/api/empleados/autocompletar?q=juan%20pe').get_json()
+        assert [r['apellido'] for r in data['resultados']] == ['Pérez']
+
+        data = client.get('/api/empleados/autocompletar?q=perez').get_json()
+        assert [r['nombre'] for r in data['resultados']] == ['Juan']
+
+    def test_limite_y_orden_alfabetico(self, client, indice):
+        """Verifica que se devuelven los primeros K en orden alfabetico y sin repetir empleados"""
+        for apellido in ('Diaz', 'Blanco', 'Castro', 'Acosta'):
+            crear(client, 'Luis', apellido, f'{apellido}@test.com')
+
+        data = client.get('/api/empleados/autocompletar?q=luis&limite=3').get_json()
+
+        assert [r['apellido'] for r in data['resultados']] == ['Acosta', 'Blanco', 'Castro']
+
+    def test_las_escrituras_mantienen_el_indice(self, client, indice):
+        """Verifica que altas, cambios de nombre, actualizaciones masivas y bajas se reflejan enseguida"""
+        empleado_id = crear(client, 'Juan', 'Perez', 'juan@test.com')
+        client.put(f'/api/empleados/{empleado_id}', data=json.dumps({'nombre': 'Pablo'}), content_type='application/json')
+
+        assert client.get('/api/empleados/autocompletar?q=juan').get_json()['resultados'] == []
+        assert client.get('/api/empleados/autocompletar?q=pab').get_json()['resultados'][0]['id'] == empleado_id
+
+        client.patch('/api/empleados/bulk', data=json.dumps([{'id': empleado_id, 'cambios': {'apellido': 'Sosa'}}]),
+                     content_type='application/json')
+        assert client.get('/api/empleados/autocompletar?q=pablo%20so').get_json()['resultados'][0]['id'] == empleado_id
+
+        client.delete(f'/api/empleados/{empleado_id}')
+        assert client.get('/api/empleados/autocompletar?q=pab').get_json()['resultados'] == []
+
+    def test_aislado_por_empresa(self, client, indice):
+        """Verifica que el autocompletado solo devuelve empleados de la empresa de la solicitud"""
+        crear(client, 'Juan', 'Perez', 'juan@test.com', empresa='acme')
+        crear(client, 'Juana', 'Perez', 'juana@test.com', empresa='globex')
+
+        data = client.get('/api/empresas/globex/empleados/autocompletar?q=ju').get_json()
+
+        assert [r['nombre'] for r in data['resultados']] == ['Juana']
+
+
+class TestIndicePrefijos:
+
+    def test_fusiona_recientes_y_compacta(self, monkeypatch):
+        """Verifica que las altas recientes se fusionan al arreglo principal y que las bajas se compactan"""
+        monkeypatch.setattr(IndicePrefijos, 'MAX_RECIENTES', 10)
+        indice = IndicePrefijos()
+        ids = [ObjectId() for _ in range(1500)]
+        for numero, object_id in enumerate(ids):
+            indice.agregar(object_id, 'Ana', f'Apellido{numero:04d}')
+        assert indice.metricas()['recientes'] <= 10
+
+        for object_id in ids[:1000]:
+            indice.quitar(object_id)
+
+        assert indice.metricas()['entradas'] < 2 * 1500
+        assert [r['_id'] for r in indice.buscar('ana', limite=2)] == ids[1000:1002]
@@ -0,0 +1,108 @@
+import json
+import pytest
+from bson import ObjectId
+from app.api.employees_routes import service
+from app.repository.indice_busqueda import IndiceBusqueda, IndiceTrigramas, trigramas
+
+
+def crear(client, nombre, apellido, email, empresa=None):
+    headers = {'X-Empresa-Id': empresa} if empresa else {}
+    datos = {'nombre': nombre, 'apellido': apellido, 'email': email, 'salario': 500000}
+    respuesta = client.post('/api/empleados', data=json.dumps(datos), content_type='application/json', headers=headers)
+    return respuesta.get_json()['empleado']['id']
+
+
+@pytest.fixture
+def indice(monkeypatch):
+    # Un indice nuevo por test, construido en el momento sobre la base limpia
+    indice = IndiceBusqueda(IndiceTrigramas)
+    indice.construir(service.repo.documentos_para_indices())
+    monkeypatch.setattr(service, 'busqueda', indice)
+    monkeypatch.setattr(service.repo, 'indices_memoria', [indice])
+    return indice
+
+
+class TestBusqueda:
+
+    def test_tolera_errores_de_tipeo_y_acentos(self, client, indice):
+        """Verifica que "Peres" y "perez" encuentran a "Pérez" y que un apellido distinto no aparece"""
+        crear(client, 'Juan', 'Pérez', 'juan@test.com')
+        crear(client, 'Ana', 'Gomez', 'ana@test.com')
+
+        for consulta in ('Peres', 'perez'):
+            data = client.get(f'/api/empleados/buscar?q={consulta}').get_json()
+            assert [resultado['apellido'] for resultado in data['resultados']] == ['Pérez']
+
+    def test_ordena_por_similitud(self, client, indice):
+        """Verifica que la coincidencia exacta aparece antes que las parciales y que se respeta el limite"""
+        crear(client, 'Martin', 'Martinez', 'm1@test.com')
+        crear(client, 'Martina', 'Lopez', 'm2@test.com')
+        crear(client, 'Marta', 'Ruiz', 'm3@test.com')
+
+        data = client.get('/api/empleados/buscar?q=Martina&limite=2').get_json()
+
+        assert len(data['resultados']) == 2
+        assert data['resultados'][0]['nombre'] == 'Martina'
+        assert data['resultados'][0]['similitud'] == 1.0
+        assert data['resultados'][0]['similitud'] >= data['resultados'][1]['similitud']
+
+    def test_las_escrituras_mantienen_el_indice(self, client, indice):
+        """Verifica que actualizar y eliminar un empleado se reflejan en la busqueda"""
+        empleado_id = crear(client, 'Juan', 'Perez', 'juan@test.com')
+        client.put(f'/api/empleados/{empleado_id}', data=json.dumps({'apellido': 'Fernandez'}), content_type='application/json')
+
+        assert client.get('/api/empleados/buscar?q=Perez').get_json()['resultados'] == []
+        assert client.get('/api/empleados/buscar?q=Fernandes').get_json()['resultados'][0]['id'] == empleado_id
+
+        client.delete(f'/api/empleados/{empleado_id}')
+        assert client.get('/api/empleados/buscar?q=Fernandez').get_json()['resultados'] == []
+
+    def test_aislada_por_empresa(self, client, indice):
+        """Verifica que la busqueda solo devuelve empleados de la empresa de la solicitud"""
+        crear(client, 'Juan', 'Perez', 'juan@test.com', empresa='acme')
+        crear(client, 'Juana', 'Perez', 'juana@test.com', empresa='globex')
+
+        data = client.get('/api/empleados/buscar?q=Perez', headers={'X-Empresa-Id': 'acme'}).get_json()
+
+        assert [resultado['nombre'] for resultado in data['resultados']] == ['Juan']
+
+    def test_consulta_invalida_e_indice_en_construccion(self, client, monkeypatch):
+        """Verifica el 400 para consultas cortas y el 503 con Retry-After mientras el indice se construye"""
+        assert client.get('/api/empleados/buscar?q=a').status_code == 400
+
+        monkeypatch.setattr(service, 'busqueda', IndiceBusqueda(IndiceTrigramas))
+        respuesta = client.get('/api/empleados/buscar?q=Perez')
+
+        assert respuesta.status_code == 503
+        assert respuesta.headers['Retry-After'] == '5'
+
+
+class TestIndiceTrigramas:
+
+    def test_trigramas_con_relleno(self):
+        """Verifica que los trigramas se calculan por palabra, sin acentos ni mayusculas"""
+        assert trigramas('Pé') == trigramas('pe')
+        assert len(trigramas('Perez')) == 6
+
+    def test_compacta_los_borrados(self):
+        """Verifica que las bajas acumuladas se compactan sin perder los documentos vivos"""
+        indice = IndiceTrigramas()
+        ids = [ObjectId() for _ in range(1500)]
+        for numero, object_id in enumerate(ids):
+            indice.agregar(object_id, f'Nombre{numero}', 'Perez', f'e{numero}@test.com')
+        for object_id in ids[:1200]:
+            indice.quitar(object_id)
+
+        metricas = indice.metricas()
+        assert metricas['documentos'] == 300
+        assert metricas['borrados_pendientes'] < 1200
+        assert indice.buscar('Nombre1499', limite=1)[0]['_id'] == ids[1499]
+
+    def test_capacidad_maxima(self):
+        """Verifica que al superar la capacidad el indice queda marcado como desbordado"""
+        indice = IndiceTrigramas(max_documentos=2)
+        for numero in range(3):
+            indice.agregar(ObjectId(), 'Ana', 'Perez', f'e{numero}@test.com')
+
+        assert indice.desbordado
+        assert indice.metricas()['documentos'] == 2
@@ -0,0 +1,109 @@
+import pytest
+from app.common.cache import CacheLRU, AUSENTE
+from app.common.errors import EmpleadoNoEncontrado
+from app.models.employee import Employee
+from app.repository.employees_repository import EmployeesRepository
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self):
+        return self.ahora
+
+
+class TestCacheLRU:
+
+    def test_desaloja_la_entrada_menos_usada(self):
+        """Verifica que al superar la capacidad se desaloja la entrada usada hace mas tiempo"""
+        cache = CacheLRU(capacidad=2)
+        cache.guardar('a', {'n': 1})
+        cache.guardar('b', {'n': 2})
+        cache.obtener('a')
+        cache.guardar('c', {'n': 3})
+
+        assert cache.obtener('b') is None
+        assert cache.obtener('a') == {'n': 1}
+        assert cache.obtener('c') == {'n': 3}
+        assert cache.metricas()['desalojos'] == 1
+
+    def test_entradas_vencen_por_ttl(self):
+        """Verifica que las entradas positivas y negativas expiran segun su propio TTL"""
+        reloj = RelojFalso()
+        cache = CacheLRU(ttl=10, ttl_negativo=2, reloj=reloj)
+        cache.guardar('a', {'n': 1})
+        cache.guardar_ausente('b')
+
+        reloj.ahora = 3
+        assert cache.obtener('a') == {'n': 1}
+        assert cache.obtener('b') is None
+
+        reloj.ahora = 11
+        assert cache.obtener('a') is None
+        assert cache.metricas()['expirados'] == 2
+
+    def test_cache_negativa(self):
+        """Verifica que una clave marcada como inexistente devuelve AUSENTE y cuenta como acierto negativo"""
+        cache = CacheLRU()
+        cache.guardar_ausente('x')
+
+        assert cache.obtener('x') is AUSENTE
+        assert cache.metricas()['aciertos_negativos'] == 1
+
+    def test_no_guarda_lecturas_previas_a_una_invalidacion(self):
+        """Verifica que un valor leido antes de una invalidacion concurrente no se guarda en la cache"""
+        cache = CacheLRU()
+        marca = cache.marca()
+        cache.invalidar('a')
+        cache.guardar('a', {'n': 'viejo'}, marca)
+
+        assert cache.obtener('a') is None
+
+    def test_ratio_aciertos(self):
+        """Verifica que el ratio de aciertos se calcula sobre el total de consultas"""
+        cache = CacheLRU()
+        cache.guardar('a', {'n': 1})
+        cache.obtener('a')
+        cache.obtener('a')
+        cache.obtener('a')
+        cache.obtener('z')
+
+        assert cache.metricas()['ratio_aciertos'] == 0.75
+
+
+@pytest.mark.mongo
+class TestRepositorioConCache:
+
+    def test_lecturas_repetidas_no_consultan_la_base(self, mocker):
+        """Verifica que la segunda lectura del mismo empleado se sirve desde la cache"""
+        repo = EmployeesRepository(cache=CacheLRU())
+        empleado = repo.crear(Employee('Ana', 'Garcia', 'ana@test.com', 400000))
+        find_one = mocker.spy(repo.coleccion, 'find_one')
+
+        repo.obtener_por_id(str(empleado._id))
+        repo.obtener_por_id(str(empleado._id))
+
+        assert find_one.call_count == 1
+
+    def test_actualizar_invalida_la_cache(self):
+        """Verifica que una actualizacion no deja datos viejos en la cache"""
+        repo = EmployeesRepository(cache=CacheLRU())
+        empleado = repo.crear(Employee('Ana', 'Garcia', 'ana@test.com', 400000))
+        empleado_id = str(empleado._id)
+        repo.obtener_por_id(empleado_id)
+
+        repo.actualizar(empleado_id, {'salario': 450000.0})
+
+        assert repo.obtener_por_id(empleado_id).salario == 450000.0
+
+    def test_ids_inexistentes_se_cachean(self, mocker):
+        """Verifica que los IDs inexistentes se cachean para no repetir consultas a la base"""
+        repo = EmployeesRepository(cache=CacheLRU())
+        find_one = mocker.spy(repo.coleccion, 'find_one')
+
+        for _ in range(3):
+            with pytest.raises(EmpleadoNoEncontrado):
+                repo.obtener_por_id('507f1f77bcf86cd799439011')
+
+        assert find_one.call_count == 1
@@ -0,0 +1,148 @@
+import json
+import pytest
+from pymongo.errors import DuplicateKeyError, ServerSelectionTimeoutError
+from app.api.employees_routes import service
+from app.common.circuito import Circuito
+from app.common.errors import ErrorConexion
+from app.db import ColeccionProtegida, circuito, _es_fallo_conexion
+from tests.test_cache import RelojFalso
+
+
+def caida():
+    raise ServerSelectionTimeoutError("No servers available")
+
+
+class ColeccionFalsa:
+    def __init__(self):
+        self.llamadas = []
+
+    def count_documents(self, filtro, **kwargs):
+        self.llamadas.append(('count_documents', kwargs))
+        return 3
+
+    def find(self, *args, **kwargs):
+        self.llamadas.append(('find', kwargs))
+        return iter([{'_id': 1}])
+
+    def find_one(self, *args, **kwargs):
+        self.llamadas.append(('find_one', kwargs))
+        caida()
+
+
+@pytest.fixture
+def reloj():
+    return RelojFalso()
+
+
+@pytest.fixture
+def circuito_falso(reloj):
+    return Circuito('MongoDB', umbral_fallos=3, espera_segundos=10, es_fallo=_es_fallo_conexion, reloj=reloj)
+
+
+class TestCircuito:
+
+    def test_se_abre_tras_fallos_consecutivos(self, circuito_falso):
+        """Verifica que tras el umbral de fallos consecutivos las llamadas se rechazan sin ejecutarse y con Retry-After"""
+        for _ in range(3):
+            with pytest.raises(ErrorConexion):
+                circuito_falso.llamar(caida)
+        llamadas = []
+
+        with pytest.raises(ErrorConexion) as error:
+            circuito_falso.llamar(llamadas.append, 1)
+
+        assert llamadas == []
+        assert error.value.reintentar_en == 10
+        assert circuito_falso.metricas()['estado'] == 'abierto'
+        assert circuito_falso.metricas()['rechazadas'] == 1
+
+    def test_exitos_y_errores_de_datos_reinician_la_cuenta(self, circuito_falso):
+        """Verifica que un exito o un error de datos (la base respondio) reinician los fallos consecutivos"""
+        def duplicado():
+            raise DuplicateKeyError("E11000")
+
+        for _ in range(2):
+            with pytest.raises(ErrorConexion):
+                circuito_falso.llamar(caida)
+        with pytest.raises(DuplicateKeyError):
+            circuito_falso.llamar(duplicado)
+        for _ in range(2):
+            with pytest.raises(ErrorConexion):
+                circuito_falso.llamar(caida)
+
+        assert circuito_falso.metricas()['estado'] == 'cerrado'
+        assert circuito_falso.metricas()['fallos_consecutivos'] == 2
+
+    def test_prueba_cierra_o_reabre(self, circuito_falso, reloj):
+        """Verifica que pasada la espera una sola llamada de prueba cierra el circuito si funciona o lo reabre si falla"""
+        for _ in range(3):
+            with pytest.raises(ErrorConexion):
+                circuito_falso.llamar(caida)
+
+        reloj.ahora = 11
+        with pytest.raises(ErrorConexion):
+            circuito_falso.llamar(caida)
+        assert circuito_falso.metricas()['estado'] == 'abierto'
+        assert circuito_falso.metricas()['aperturas'] == 2
+
+        def prueba():
+            # Mientras la prueba esta en curso el resto de las llamadas se sigue rechazando
+            with pytest.raises(ErrorConexion):
+                circuito_falso.permitir()
+            return 'ok'
+
+        reloj.ahora = 22
+        assert circuito_falso.llamar(prueba) == 'ok'
+        assert circuito_falso.metricas()['estado'] == 'cerrado'
+
+    def test_coleccion_protegida_limita_lecturas(self, circuito_falso):
+        """Verifica que las lecturas llevan maxTimeMS salvo que se pida sin limite y que los fallos pasan por el circuito"""
+        falsa = ColeccionFalsa()
+        coleccion = ColeccionProtegida(falsa, circuito_falso, 500)
+
+        assert coleccion.count_documents({}) == 3
+        assert list(coleccion.find({})) == [{'_id': 1}]
+        list(coleccion.find({}, max_time_ms=None))
+        with pytest.raises(ErrorConexion):
+            coleccion.find_one({})
+
+        assert falsa.llamadas == [
+            ('count_documents', {'maxTimeMS': 500}),
+            ('find', {'max_time_ms': 500}),
+            ('find', {'max_time_ms': None}),
+            ('find_one', {'max_time_ms': 500})
+        ]
+        assert circuito_falso.metricas()['fallos_consecutivos'] == 1
+
+
+@pytest.mark.mongo
+class TestCircuitoEnLaApi:
+
+    @pytest.fixture(autouse=True)
+    def circuito_limpio(self, reloj, monkeypatch):
+        monkeypatch.setattr(circuito, '_reloj', reloj)
+        circuito.reiniciar()
+        yield
+        circuito.reiniciar()
+
+    def test_base_caida_responde_503_sin_esperar(self, client, sample_employee_data, reloj, monkeypatch):
+        """Verifica que con la base caida la API responde 503, deja de consultarla al abrirse el circuito y se recupera"""
+        empleado_id = client.post('/api/empleados', data=json.dumps(sample_employee_data), content_type='application/json').get_json()['empleado']['id']
+        falsa = ColeccionFalsa()
+        real = service.repo.coleccion._coleccion
+        monkeypatch.setattr(service.repo.coleccion, '_coleccion', falsa)
+
+        for _ in range(circuito.umbral_fallos):
+            assert client.get(f'/api/empleados/{empleado_id}').status_code == 503
+        response = client.get(f'/api/empleados/{empleado_id}')
+
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == str(int(circuito.espera_segundos))
+        assert len(falsa.llamadas) == circuito.umbral_fallos
+        assert client.get('/api/metricas').get_json()['circuito_mongo']['estado'] == 'abierto'
+
+        monkeypatch.setattr(service.repo.coleccion, '_coleccion', real)
+        reloj.ahora = circuito.espera_segundos + 1
+
+        assert client.get(f'/api/empleados/{empleado_id}').status_code == 200
+        assert client.get('/api/metricas').get_json()['circuito_mongo']['estado'] == 'cerrado'
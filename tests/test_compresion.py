@@ -0,0 +1,63 @@
+import gzip
+import json
+import pytest
+
+
+def crear_empleados(client, cantidad):
+    for i in range(cantidad):
+        client.post(
+            '/api/empleados',
+            data=json.dumps({'nombre': f'Empleado{i}', 'apellido': 'Test', 'email': f'empleado{i}@test.com', 'salario': 300000 + i}),
+            content_type='application/json'
+        )
+
+
+class TestCompresion:
+
+    def test_listado_se_comprime_con_gzip(self, client):
+        """Verifica que un listado grande se comprime con gzip cuando el cliente lo acepta"""
+        crear_empleados(client, 30)
+
+        response = client.get('/api/empleados?por_pagina=30', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert len(json.loads(gzip.decompress(response.data))['empleados']) == 30
+
+    def test_respuestas_chicas_no_se_comprimen(self, client):
+        """Verifica que las respuestas por debajo del umbral minimo se envian sin comprimir"""
+        response = client.get('/api/empleados', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+        assert json.loads(response.data)['total'] == 0
+
+    def test_sin_accept_encoding_no_se_comprime(self, client):
+        """Verifica que no se comprime si el cliente no envia Accept-Encoding"""
+        crear_empleados(client, 30)
+
+        response = client.get('/api/empleados?por_pagina=30', headers={'Accept-Encoding': 'identity'})
+
+        assert 'Content-Encoding' not in response.headers
+
+    def test_exportacion_en_streaming_comprimida(self, client):
+        """Verifica que la exportacion NDJSON se comprime incrementalmente y se puede descomprimir completa"""
+        crear_empleados(client, 5)
+
+        response = client.get('/api/empleados/exportar', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        lineas = gzip.decompress(response.data).decode('utf-8').splitlines()
+        assert len(lineas) == 5
+        assert json.loads(lineas[0])['apellido'] == 'Test'
+
+    def test_prefiere_brotli_si_esta_disponible(self, client):
+        """Verifica que se negocia brotli cuando el cliente lo acepta y la libreria esta instalada"""
+        brotli = pytest.importorskip('brotli')
+        crear_empleados(client, 30)
+
+        response = client.get('/api/empleados?por_pagina=30', headers={'Accept-Encoding': 'gzip, br'})
+
+        assert response.headers['Content-Encoding'] == 'br'
+        assert len(json.loads(brotli.decompress(response.data))['empleados']) == 30
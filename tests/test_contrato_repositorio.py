@@ -0,0 +1,163 @@
+from datetime import datetime
+import pytest
+from bson import ObjectId
+from app import preparar_colecciones
+from app.common.errors import EmpleadoNoEncontrado, EmailYaExiste
+from app.models.employee import Employee
+from app.models.job import Job
+from app.repository.backends import crear_repositorio_empleados, crear_repositorio_jobs
+
+
+# Mismo conjunto de pruebas para cada backend: cualquier diferencia de comportamiento es un error
+pytestmark = pytest.mark.parametrize('backend', ['mongo', 'memoria'])
+
+EMPLEADOS = [
+    ('Ana', 'Garcia', 'Desarrollador', 500000, datetime(2020, 3, 10)),
+    ('Luis', 'Perez', 'Soporte', 300000, datetime(2021, 7, 1)),
+    ('Marta', 'Garcia', 'Desarrollador', 300000, datetime(2022, 1, 15)),
+    ('Juan', 'Alvarez', 'Gerente', 700000, datetime(2021, 5, 20)),
+    ('Sofia', 'Perez', None, 450000, datetime(2023, 11, 5)),
+]
+
+
+@pytest.fixture
+def repo(backend):
+    if backend == 'mongo':
+        preparar_colecciones()
+    return crear_repositorio_empleados(backend)
+
+
+@pytest.fixture
+def empleados(repo):
+    return [
+        repo.crear(Employee(nombre, apellido, f'{nombre.lower()}@test.com', salario, fecha_ingreso=fecha, puesto=puesto))._id
+        for nombre, apellido, puesto, salario, fecha in EMPLEADOS
+    ]
+
+
+def nombres(empleados):
+    return [empleado.nombre for empleado in empleados]
+
+
+class TestContratoRepositorioEmpleados:
+
+    def test_crear_y_obtener(self, repo, empleados):
+        """Verifica que un empleado creado se lee por ID y que un ID inexistente o invalido no se encuentra"""
+        empleado = repo.obtener_por_id(str(empleados[0]))
+
+        assert (empleado.nombre, empleado.salario, empleado.puesto) == ('Ana', 500000, 'Desarrollador')
+        assert set(repo.obtener_por_ids([empleados[1], ObjectId()])) == {empleados[1]}
+        with pytest.raises(EmpleadoNoEncontrado):
+            repo.obtener_por_id(str(ObjectId()))
+        with pytest.raises(EmpleadoNoEncontrado):
+            repo.obtener_por_id('no-es-un-id')
+
+    def test_email_unico(self, repo, empleados):
+        """Verifica que el email es unico sin distinguir mayusculas al crear y al actualizar"""
+        with pytest.raises(EmailYaExiste):
+            repo.crear(Employee('Otra', 'Ana', 'ANA@test.com', 100000))
+        with pytest.raises(EmailYaExiste):
+            repo.actualizar(str(empleados[1]), {'email': 'ana@test.com'})
+
+        assert repo.actualizar(str(empleados[0]), {'email': 'ana@test.com'}).email == 'ana@test.com'
+        assert set(repo.emails_en_uso(['luis@test.com', 'nadie@test.com'])) == {'luis@test.com'}
+
+    def test_filtros(self, repo, empleados):
+        """Verifica los filtros por texto sin distinguir mayusculas y por rangos de salario y fecha"""
+        assert nombres(repo.obtener_todos({'apellido': {'$regex': 'garcia', '$options': 'i'}})) == ['Ana', 'Marta']
+        assert repo.contar({'salario_centavos': {'$gte': 30000000, '$lte': 45000000}}) == 3
+        assert repo.contar({'fecha_ingreso': {'$gte': datetime(2021, 1, 1), '$lte': datetime(2021, 12, 31)}}) == 2
+        assert repo.contar_listado({'puesto': {'$regex': 'desa', '$options': 'i'}}) == (2, True)
+        assert nombres(repo.iterar_todos({'email': 'juan@test.com'})) == ['Juan']
+
+    def test_paginacion_y_cursor(self, repo, empleados):
+        """Verifica que la paginacion por pagina y por cursor recorren el mismo orden, con el _id como desempate"""
+        orden = ('salario', -1)
+        por_pagina = repo.obtener_todos(pagina=1, por_pagina=2, orden=orden) + repo.obtener_todos(pagina=2, por_pagina=2, orden=orden)
+        primera = repo.obtener_todos(por_pagina=2, orden=orden)
+        segunda = repo.obtener_todos(por_pagina=2, orden=orden, cursor=repo.cursor_siguiente(primera[-1], orden))
+
+        assert nombres(por_pagina) == ['Juan', 'Ana', 'Sofia', 'Marta']
+        assert nombres(primera + segunda) == nombres(por_pagina)
+        assert nombres(repo.obtener_todos(orden=('puesto', 1))) == ['Ana', 'Marta', 'Sofia', 'Juan', 'Luis']
+        assert nombres(repo.obtener_todos(por_pagina=3, cursor=repo.cursor_siguiente(repo.obtener_todos(por_pagina=2)[-1]))) == ['Marta', 'Juan', 'Sofia']
+
+    def test_facetas_y_promedio(self, repo, empleados):
+        """Verifica las facetas por puesto, banda salarial y anio de ingreso y el promedio de salarios"""
+        facetas = repo.obtener_facetas()
+
+        assert facetas['puesto'] == [
+            {'valor': 'Desarrollador', 'cantidad': 2},
+            {'valor': 'Empleado', 'cantidad': 1},
+            {'valor': 'Gerente', 'cantidad': 1},
+            {'valor': 'Soporte', 'cantidad': 1}
+        ]
+        assert facetas['banda_salarial'] == [
+            {'desde': 250000, 'hasta': 500000, 'cantidad': 3},
+            {'desde': 500000, 'hasta': 1000000, 'cantidad': 2}
+        ]
+        assert facetas['anio_ingreso'] == [
+            {'valor': 2020, 'cantidad': 1},
+            {'valor': 2021, 'cantidad': 2},
+            {'valor': 2022, 'cantidad': 1},
+            {'valor': 2023, 'cantidad': 1}
+        ]
+        assert repo.obtener_promedio_salarios_empresa() == 450000.0
+
+    def test_actualizar_registra_historial(self, repo, empleados):
+        """Verifica que los cambios de salario individuales y masivos quedan en el historial"""
+        repo.actualizar(str(empleados[0]), {'salario': 550000})
+        resultados = repo.actualizar_masivo([
+            (empleados[0], {'salario': 600000}),
+            (empleados[1], {'email': 'marta@test.com'}),
+            (ObjectId(), {'salario': 1})
+        ])
+
+        assert [cambio['salario_centavos'] for cambio in repo.historial.obtener_por_empleado(empleados[0])] == [50000000, 55000000, 60000000]
+        assert repo.obtener_por_id(str(empleados[0])).salario == 600000
+        assert isinstance(resultados[empleados[1]], EmailYaExiste)
+        assert sum(isinstance(resultado, EmpleadoNoEncontrado) for resultado in resultados.values()) == 1
+
+    def test_eliminar(self, repo, empleados):
+        """Verifica que un empleado eliminado deja de existir y libera su email"""
+        assert repo.eliminar(str(empleados[0])).nombre == 'Ana'
+
+        with pytest.raises(EmpleadoNoEncontrado):
+            repo.eliminar(str(empleados[0]))
+        assert repo.contar() == 4
+        repo.crear(Employee('Ana', 'Nueva', 'ana@test.com', 100000))
+
+    def test_ajuste_salarial_idempotente(self, repo, empleados):
+        """Verifica que reaplicar un lote del mismo ajuste no suma dos veces el aumento ni duplica el historial"""
+        ajuste_id = ObjectId()
+        total, hasta_id = repo.limites_ajuste_salarial({'apellido': {'$regex': 'garcia', '$options': 'i'}})
+        lotes = list(repo.lotes_ajuste_salarial({'apellido': {'$regex': 'garcia', '$options': 'i'}}, hasta_id, tamano_lote=1))
+        cambios = [(documento, documento['salario_centavos'] + 100) for lote in lotes for documento in lote]
+
+        assert (total, len(lotes)) == (2, 2)
+        assert repo.aplicar_ajuste_salarial(ajuste_id, cambios) == 2
+        assert repo.aplicar_ajuste_salarial(ajuste_id, cambios) == 2
+        assert repo.obtener_por_id(str(empleados[0])).salario == 500001
+        assert len(repo.historial.obtener_por_empleado(empleados[0])) == 2
+        assert list(repo.lotes_ajuste_salarial({}, hasta_id, desde_id=hasta_id)) == []
+
+
+class TestContratoRepositorioJobs:
+
+    def test_ciclo_de_vida(self, backend):
+        """Verifica el progreso, el limite de errores guardados, la cancelacion y la reanudacion de un job"""
+        repo = crear_repositorio_jobs(backend)
+        job = repo.crear(Job('ajuste_salarial', total=10, parametros={'reglas': []}))
+        repo.actualizar(job._id, {'estado': Job.EN_EJECUCION, 'procesados': 4}, errores_nuevos=[{'indice': i} for i in range(5)], max_errores=3)
+
+        assert repo.obtener_por_id(str(job._id)).procesados == 4
+        assert len(repo.obtener_por_id(str(job._id)).errores) == 3
+        assert repo.reanudar(job._id) is None
+        assert repo.solicitar_cancelacion(str(job._id)).cancelacion_solicitada
+        assert repo.cancelacion_solicitada(job._id)
+
+        repo.actualizar(job._id, {'estado': Job.CANCELADO})
+        reanudado = repo.reanudar(job._id)
+
+        assert reanudado.estado == Job.PENDIENTE and not reanudado.cancelacion_solicitada
+        assert repo.reanudar(job._id) is None
@@ -0,0 +1,121 @@
+import json
+import pytest
+from app.config import Config
+from app.db import get_database
+from app.models.employee import Employee
+from app.repository.employees_repository import EmployeesRepository
+from app.common import contexto
+from scripts.migrar_empresas import asignar_empresa, mover_empresa
+
+
+def crear(client, datos, empresa=None):
+    cabeceras = {'X-Empresa-Id': empresa} if empresa else {}
+    return client.post('/api/empleados', data=json.dumps(datos), content_type='application/json', headers=cabeceras)
+
+
+@pytest.fixture
+def coleccion_dedicada(monkeypatch):
+    monkeypatch.setattr(Config, 'EMPRESAS_COLECCION_DEDICADA', {'grande': 'empleados_grande'})
+    coleccion = get_database().empleados_grande
+    coleccion.delete_many({})
+    yield coleccion
+    coleccion.delete_many({})
+
+
+pytestmark = pytest.mark.mongo
+
+
+class TestEmpresas:
+
+    def test_empresas_aisladas_por_cabecera(self, client, sample_employee_data):
+        """Verifica que cada empresa solo ve sus propios empleados, aunque compartan email"""
+        assert crear(client, sample_employee_data, 'acme').status_code == 201
+        assert crear(client, sample_employee_data, 'globex').status_code == 201
+        assert crear(client, sample_employee_data, 'acme').status_code == 409
+
+        acme = client.get('/api/empleados', headers={'X-Empresa-Id': 'acme'}).get_json()
+        sin_empresa = client.get('/api/empleados').get_json()
+
+        assert acme['total'] == 1
+        assert sin_empresa['total'] == 0
+
+    def test_empresa_en_la_ruta(self, client, sample_employee_data):
+        """Verifica que el prefijo /api/empresas/<empresa> acota las operaciones a esa empresa"""
+        respuesta = client.post('/api/empresas/acme/empleados', data=json.dumps(sample_employee_data), content_type='application/json')
+        empleado_id = respuesta.get_json()['empleado']['id']
+
+        assert client.get(f'/api/empresas/acme/empleados/{empleado_id}').status_code == 200
+        assert client.get(f'/api/empresas/globex/empleados/{empleado_id}').status_code == 404
+        assert client.get(f'/api/empleados/{empleado_id}', headers={'X-Empresa-Id': 'acme'}).status_code == 200
+        assert client.delete(f'/api/empresas/globex/empleados/{empleado_id}').status_code == 404
+
+    def test_empresa_invalida(self, client):
+        """Verifica que un identificador de empresa con caracteres no permitidos es rechazado"""
+        respuesta = client.get('/api/empleados', headers={'X-Empresa-Id': 'acme/../otra'})
+
+        assert respuesta.status_code == 400
+
+    def test_moneda_y_estadisticas_por_empresa(self, client, sample_employee_data, monkeypatch):
+        """Verifica que las estadisticas usan la moneda y los datos de cada empresa"""
+        monkeypatch.setattr(Config, 'EMPRESAS_MONEDA', {'globex': 'USD'})
+        crear(client, sample_employee_data, 'acme')
+
+        acme = client.get('/api/empresas/acme/empleados/estadisticas').get_json()
+        globex = client.get('/api/empresas/globex/empleados/estadisticas').get_json()
+
+        assert acme['moneda'] == 'ARS'
+        assert acme['total_empleados'] == 1
+        assert globex['moneda'] == 'USD'
+        assert globex['total_empleados'] == 0
+        assert globex['empresa'] == 'globex'
+
+    def test_empresa_con_coleccion_dedicada(self, client, sample_employee_data, coleccion_dedicada):
+        """Verifica que una empresa configurada con coleccion propia no escribe en la coleccion compartida"""
+        crear(client, sample_employee_data, 'grande')
+
+        respuesta = client.get('/api/empleados', headers={'X-Empresa-Id': 'grande'}).get_json()
+
+        assert respuesta['total'] == 1
+        assert coleccion_dedicada.count_documents({}) == 1
+        assert get_database().empleados.count_documents({}) == 0
+
+    def test_total_estimado_en_coleccion_dedicada(self, client, sample_employee_data, coleccion_dedicada):
+        """Verifica que sin filtros una coleccion dedicada informa un total estimado y con filtros uno exacto"""
+        crear(client, sample_employee_data, 'grande')
+        cabeceras = {'X-Empresa-Id': 'grande'}
+
+        sin_filtros = client.get('/api/empleados', headers=cabeceras).get_json()
+        filtrado = client.get('/api/empleados?puesto=Desarrollador', headers=cabeceras).get_json()
+
+        assert (sin_filtros['total'], sin_filtros['total_exacto']) == (1, False)
+        assert filtrado['total_exacto'] is True
+        assert client.get('/api/empleados').get_json()['total_exacto'] is True
+
+    def test_job_solo_visible_para_su_empresa(self, client, sample_employee_data):
+        """Verifica que un job creado por una empresa no puede consultarse desde otra"""
+        respuesta = client.post('/api/jobs', data=json.dumps({'tipo': 'importacion', 'datos': [sample_employee_data]}),
+                                content_type='application/json', headers={'X-Empresa-Id': 'acme'})
+        job_id = respuesta.get_json()['job_id']
+
+        assert client.get(f'/api/jobs/{job_id}', headers={'X-Empresa-Id': 'globex'}).status_code == 404
+        assert client.get(f'/api/jobs/{job_id}', headers={'X-Empresa-Id': 'acme'}).status_code == 200
+
+
+class TestMigracionEmpresas:
+
+    def test_asignar_y_mover_empresa(self, coleccion_dedicada):
+        """Verifica que la migracion completa la empresa de los datos anteriores y los mueve a su coleccion"""
+        database = get_database()
+        database.empleados.insert_many([
+            Employee(f'Empleado{i}', 'Test', f'empleado{i}@test.com', 300000).to_mongo_dict() for i in range(5)
+        ])
+
+        assert asignar_empresa(database, 'grande') == 5
+        assert mover_empresa(database, 'grande', 'empleados_grande', tamano_lote=2) == 5
+
+        token = contexto.empresa.set('grande')
+        try:
+            assert EmployeesRepository().contar() == 5
+        finally:
+            contexto.empresa.reset(token)
+        assert database.empleados.count_documents({}) == 0
@@ -0,0 +1,64 @@
+import threading
+import pytest
+from app.common.errors import EmailYaExiste
+from app.models.employee import Employee
+from app.repository.employees_repository import EmployeesRepository
+from app.repository.escritor_agrupado import EscritorAgrupado
+from app.db import get_database
+
+
+def crear_concurrentemente(repo, empleados):
+    resultados = [None] * len(empleados)
+    barrera = threading.Barrier(len(empleados))
+
+    def crear(indice, empleado):
+        barrera.wait()
+        try:
+            resultados[indice] = repo.crear(empleado)
+        except EmailYaExiste as e:
+            resultados[indice] = e
+
+    hilos = [threading.Thread(target=crear, args=(i, e)) for i, e in enumerate(empleados)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return resultados
+
+
+pytestmark = pytest.mark.mongo
+
+
+class TestEscritorAgrupado:
+
+    @pytest.fixture
+    def repo(self):
+        escritor = EscritorAgrupado(get_database().empleados, max_espera_ms=50, max_lote=100)
+        return EmployeesRepository(escritor=escritor)
+
+    def test_altas_concurrentes_se_agrupan(self, repo):
+        """Verifica que las altas concurrentes se escriben en menos lotes y que cada una recibe su propio ID"""
+        empleados = [Employee(f'Empleado{i}', 'Test', f'empleado{i}@test.com', 300000) for i in range(20)]
+
+        resultados = crear_concurrentemente(repo, empleados)
+
+        ids = {str(resultado._id) for resultado in resultados}
+        assert len(ids) == 20
+        assert repo.escritor.metricas()['lotes'] < 20
+        assert repo.coleccion.count_documents({}) == 20
+
+    def test_email_duplicado_dentro_del_lote(self, repo):
+        """Verifica que si dos altas del mismo lote comparten email solo una se inserta y la otra recibe su error"""
+        empleados = [Employee(f'Empleado{i}', 'Test', 'repetido@test.com', 300000) for i in range(2)]
+
+        resultados = crear_concurrentemente(repo, empleados)
+
+        assert sum(isinstance(resultado, EmailYaExiste) for resultado in resultados) == 1
+        assert repo.coleccion.count_documents({'email': 'repetido@test.com'}) == 1
+
+    def test_email_existente_en_la_base(self, repo):
+        """Verifica que el alta agrupada respeta los emails ya registrados"""
+        repo.crear(Employee('Ana', 'Garcia', 'ana@test.com', 300000))
+
+        with pytest.raises(EmailYaExiste):
+            repo.crear(Employee('Otra', 'Ana', 'ana@test.com', 300000))
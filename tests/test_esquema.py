@@ -0,0 +1,56 @@
+from datetime import datetime
+import pytest
+from app.db import get_database
+from app.models.employee import Employee, ESQUEMA_VERSION
+from app.repository.employees_repository import EmployeesRepository
+from scripts.migrar_esquema import migrar_esquema
+
+
+pytestmark = pytest.mark.mongo
+
+
+class TestEsquemaAlmacenamiento:
+
+    def test_documento_guarda_centavos_y_fecha_sin_hora(self):
+        """Verifica que el documento guardado tiene el salario en centavos enteros y la fecha sin hora"""
+        empleado = Employee('Ana', 'Garcia', 'ana@test.com', 1234.565, fecha_ingreso=datetime(2024, 3, 5, 17, 45))
+
+        documento = empleado.to_mongo_dict()
+
+        assert documento['esquema'] == ESQUEMA_VERSION
+        assert documento['salario_centavos'] == 123457 and isinstance(documento['salario_centavos'], int)
+        assert 'salario' not in documento
+        assert documento['fecha_ingreso'] == datetime(2024, 3, 5)
+
+    def test_salario_int_y_float_se_guardan_igual(self):
+        """Verifica que el mismo salario enviado como entero o como decimal produce el mismo documento"""
+        entero = Employee('Ana', 'Garcia', 'ana@test.com', 500000).to_mongo_dict()
+        decimal = Employee('Ana', 'Garcia', 'ana@test.com', 500000.0).to_mongo_dict()
+
+        assert entero['salario_centavos'] == decimal['salario_centavos'] == 50000000
+
+    def test_lee_documentos_de_ambas_versiones(self):
+        """Verifica que from_dict lee tanto el esquema actual como los documentos anteriores a la migracion"""
+        actual = Employee.from_dict({'nombre': 'Ana', 'apellido': 'Garcia', 'email': 'a@test.com', 'salario_centavos': 4500050})
+        anterior = Employee.from_dict({'nombre': 'Ana', 'apellido': 'Garcia', 'email': 'a@test.com', 'salario': 45000.5})
+
+        assert actual.salario == anterior.salario == 45000.5
+
+    def test_migracion_de_documentos_existentes(self):
+        """Verifica que la migracion convierte los documentos viejos y respeta los ya actualizados"""
+        coleccion = get_database().empleados
+        coleccion.insert_many([
+            {'empresa_id': 'default', 'nombre': 'Ana', 'apellido': 'Garcia', 'email': 'ana@test.com',
+             'salario': 400000, 'fecha_ingreso': datetime(2020, 1, 2, 10, 30)},
+            {'empresa_id': 'default', 'nombre': 'Luis', 'apellido': 'Perez', 'email': 'luis@test.com',
+             'salario': 100.0, 'salario_centavos': 55000050, 'fecha_ingreso': datetime(2021, 6, 1)}
+        ])
+
+        assert migrar_esquema(coleccion, tamano_lote=1) == 2
+        assert migrar_esquema(coleccion) == 0
+
+        ana = coleccion.find_one({'email': 'ana@test.com'})
+        assert ana['salario_centavos'] == 40000000 and 'salario' not in ana
+        assert ana['fecha_ingreso'] == datetime(2020, 1, 2)
+        assert coleccion.find_one({'email': 'luis@test.com'})['salario_centavos'] == 55000050
+        assert EmployeesRepository().obtener_promedio_salarios_empresa() == 475000.25
@@ -0,0 +1,76 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+from app.db import get_database
+
+
+def crear(client, email, salario):
+    datos = {'nombre': 'Ana', 'apellido': 'Garcia', 'email': email, 'salario': salario}
+    respuesta = client.post('/api/empleados', data=json.dumps(datos), content_type='application/json')
+    return respuesta.get_json()['empleado']['id']
+
+
+def actualizar_salario(client, empleado_id, salario):
+    return client.put(f'/api/empleados/{empleado_id}', data=json.dumps({'salario': salario}), content_type='application/json')
+
+
+class TestHistorialSalarios:
+
+    def test_historial_registra_alta_y_cambios(self, client):
+        """Verifica que el alta y cada cambio de salario quedan en el historial, y que repetir el salario no agrega registros"""
+        empleado_id = crear(client, 'ana@test.com', 400000)
+        actualizar_salario(client, empleado_id, 440000)
+        actualizar_salario(client, empleado_id, 440000)
+        client.put(f'/api/empleados/{empleado_id}', data=json.dumps({'puesto': 'Lider'}), content_type='application/json')
+
+        data = client.get(f'/api/empleados/{empleado_id}/historial-salarios').get_json()
+
+        assert [cambio['salario'] for cambio in data['cambios']] == [400000, 440000]
+        assert data['cambios'][0]['salario_anterior'] is None
+        assert data['cambios'][1]['variacion_porcentual'] == 10.0
+        assert data['salario_actual'] == 440000
+
+    @pytest.mark.mongo
+    def test_un_documento_por_empleado_y_anio(self, client):
+        """Verifica que los cambios del mismo anio se agrupan en un unico documento de historial"""
+        empleado_id = crear(client, 'ana@test.com', 400000)
+        for salario in (410000, 420000, 430000):
+            actualizar_salario(client, empleado_id, salario)
+
+        buckets = list(get_database().historial_salarios.find())
+
+        assert len(buckets) == 1
+        assert buckets[0]['cantidad'] == 4
+        assert buckets[0]['anio'] == datetime.now().year
+
+    def test_salario_a_una_fecha(self, client):
+        """Verifica el salario vigente a una fecha, y que antes del primer registro no hay salario"""
+        empleado_id = crear(client, 'ana@test.com', 400000)
+        actualizar_salario(client, empleado_id, 450000)
+        hoy = datetime.now().strftime('%d/%m/%Y')
+        ayer = (datetime.now() - timedelta(days=1)).strftime('%d/%m/%Y')
+
+        assert client.get(f'/api/empleados/{empleado_id}/historial-salarios?fecha={hoy}').get_json()['salario'] == 450000
+        assert client.get(f'/api/empleados/{empleado_id}/historial-salarios?fecha={ayer}').get_json()['salario'] is None
+        assert client.get(f'/api/empleados/{empleado_id}/historial-salarios?fecha=2024-01-01').status_code == 400
+
+    def test_cambios_de_la_empresa_en_un_rango(self, client):
+        """Verifica el listado de cambios de la empresa en un rango y el filtro de solo aumentos"""
+        primero = crear(client, 'ana@test.com', 400000)
+        segundo = crear(client, 'luis@test.com', 500000)
+        actualizar_salario(client, primero, 480000)
+        client.patch('/api/empleados/bulk', data=json.dumps([{'id': segundo, 'cambios': {'salario': 450000}}]),
+                     content_type='application/json')
+        hoy = datetime.now().strftime('%d/%m/%Y')
+
+        todos = client.get(f'/api/empleados/cambios-salario?desde={hoy}').get_json()
+        aumentos = client.get(f'/api/empleados/cambios-salario?desde={hoy}&solo_aumentos=true').get_json()
+        anteriores = client.get('/api/empleados/cambios-salario?desde=01/01/2000&hasta=31/12/2000').get_json()
+
+        assert todos['total'] == 4
+        assert [(c['empleado_id'], c['salario']) for c in aumentos['cambios']] == [(primero, 480000)]
+        assert anteriores['total'] == 0
+
+    def test_historial_de_empleado_inexistente(self, client):
+        """Verifica que el historial de un empleado inexistente responde 404"""
+        assert client.get('/api/empleados/507f1f77bcf86cd799439011/historial-salarios').status_code == 404
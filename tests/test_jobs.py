@@ -0,0 +1,69 @@
+import json
+import time
+
+
+def esperar_job(client, job_id, timeout=10):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        job = json.loads(client.get(f'/api/jobs/{job_id}').data)
+        if job['estado'] in ('completado', 'fallido', 'cancelado'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"El job {job_id} no finalizo a tiempo")
+
+
+class TestJobs:
+
+    def test_importacion_en_segundo_plano(self, client):
+        """Verifica que un job de importacion devuelve 202 con su ID y termina reportando progreso y errores por item"""
+        empleados = [
+            {'nombre': f'Empleado{i}', 'apellido': 'Test', 'email': f'empleado{i}@test.com', 'salario': 300000 + i}
+            for i in range(5)
+        ]
+        empleados.append({'nombre': '', 'apellido': 'Test', 'email': 'invalido', 'salario': -1})
+
+        response = client.post('/api/jobs', data=json.dumps({'tipo': 'importacion', 'datos': empleados}), content_type='application/json')
+
+        assert response.status_code == 202
+        data = json.loads(response.data)
+        assert response.headers['Location'] == f"/api/jobs/{data['job_id']}"
+
+        job = esperar_job(client, data['job_id'])
+        assert job['estado'] == 'completado'
+        assert job['procesados'] == 6
+        assert job['exitosos'] == 5
+        assert job['con_errores'] == 1
+        assert job['errores'][0]['indice'] == 5
+        assert job['progreso'] == 100.0
+        assert json.loads(client.get('/api/empleados').data)['total'] == 5
+
+    def test_actualizacion_masiva_en_segundo_plano(self, client):
+        """Verifica que un job de actualizacion masiva aplica los cambios sobre los empleados existentes"""
+        response = client.post(
+            '/api/empleados',
+            data=json.dumps({'nombre': 'Ana', 'apellido': 'Garcia', 'email': 'ana@test.com', 'salario': 400000}),
+            content_type='application/json'
+        )
+        empleado_id = json.loads(response.data)['empleado']['id']
+
+        response = client.post(
+            '/api/jobs',
+            data=json.dumps({'tipo': 'actualizacion_masiva', 'datos': [{'id': empleado_id, 'cambios': {'salario': 480000}}]}),
+            content_type='application/json'
+        )
+        job = esperar_job(client, json.loads(response.data)['job_id'])
+
+        assert job['estado'] == 'completado'
+        assert job['exitosos'] == 1
+        assert json.loads(client.get(f'/api/empleados/{empleado_id}').data)['salario'] == 480000
+
+    def test_tipo_de_job_invalido(self, client):
+        """Verifica que se rechaza con 400 un tipo de job desconocido"""
+        response = client.post('/api/jobs', data=json.dumps({'tipo': 'otro', 'datos': [{}]}), content_type='application/json')
+
+        assert response.status_code == 400
+
+    def test_cancelar_job_inexistente(self, client):
+        """Verifica que cancelar o consultar un job inexistente devuelve 404"""
+        assert client.get('/api/jobs/507f1f77bcf86cd799439011').status_code == 404
+        assert client.post('/api/jobs/507f1f77bcf86cd799439011/cancelar').status_code == 404
@@ -0,0 +1,177 @@
+import json
+from datetime import datetime
+import pytest
+from app.db import get_database
+from app.api.employees_routes import service
+from app.repository.employees_repository import CAMPOS_ORDEN, ordenes_indexados, asegurar_indices
+
+
+EMPLEADOS = [
+    ('Ana', 'Garcia', 500000),
+    ('Luis', 'Perez', 300000),
+    ('Marta', 'Garcia', 300000),
+    ('Juan', 'Alvarez', 700000),
+    ('Sofia', 'Perez', 450000),
+]
+
+
+@pytest.fixture
+def empleados(client):
+    ids = []
+    for i, (nombre, apellido, salario) in enumerate(EMPLEADOS):
+        datos = {'nombre': nombre, 'apellido': apellido, 'email': f'empleado{i}@test.com', 'salario': salario}
+        respuesta = client.post('/api/empleados', data=json.dumps(datos), content_type='application/json')
+        ids.append(respuesta.get_json()['empleado']['id'])
+    return ids
+
+
+def listar(client, consulta):
+    respuesta = client.get(f'/api/empleados?{consulta}')
+    assert respuesta.status_code == 200
+    return respuesta.get_json()
+
+
+class TestOrdenamiento:
+
+    def test_todos_los_ordenes_tienen_indice(self):
+        """Verifica que cada campo de orden aceptado tiene declarado su indice compuesto con desempate por _id"""
+        assert sorted(ordenes_indexados()) == sorted(CAMPOS_ORDEN)
+
+    def test_orden_ascendente_desempata_por_id(self, client, empleados):
+        """Verifica el orden ascendente por salario y que los empates se resuelven por _id"""
+        data = listar(client, 'sort=salario')
+
+        assert [e['salario'] for e in data['empleados']] == [300000, 300000, 450000, 500000, 700000]
+        assert [e['id'] for e in data['empleados'][:2]] == sorted(empleados[1:3])
+
+    def test_orden_descendente(self, client, empleados):
+        """Verifica el orden descendente por apellido"""
+        data = listar(client, 'sort=-apellido')
+
+        assert [e['apellido'] for e in data['empleados']] == ['Perez', 'Perez', 'Garcia', 'Garcia', 'Alvarez']
+
+    def test_orden_no_indexado_es_rechazado(self, client, empleados):
+        """Verifica que un orden sin indice declarado responde 400"""
+        respuesta = client.get('/api/empleados?sort=email')
+
+        assert respuesta.status_code == 400
+        assert 'apellido' in respuesta.get_json()['error']
+
+    def test_paginacion_por_cursor(self, client, empleados):
+        """Verifica que recorrer con cursor devuelve cada empleado una vez y en el mismo orden que sin paginar"""
+        completo = [e['id'] for e in listar(client, 'sort=-salario&por_pagina=10')['empleados']]
+
+        recorridos = []
+        consulta = 'sort=-salario&por_pagina=2'
+        while True:
+            data = listar(client, consulta)
+            recorridos.extend(e['id'] for e in data['empleados'])
+            if not data['siguiente_cursor']:
+                break
+            consulta = f"sort=-salario&por_pagina=2&cursor={data['siguiente_cursor']}"
+
+        assert recorridos == completo
+
+    def test_cursor_de_otro_orden_es_rechazado(self, client, empleados):
+        """Verifica que un cursor generado con otro orden o alterado responde 400"""
+        cursor = listar(client, 'sort=salario&por_pagina=2')['siguiente_cursor']
+
+        assert client.get(f'/api/empleados?sort=apellido&cursor={cursor}').status_code == 400
+        assert client.get('/api/empleados?cursor=no-es-un-cursor').status_code == 400
+
+
+class TestFiltrosPorRango:
+
+    def test_filtro_por_rango_de_salario(self, client, empleados):
+        """Verifica que salario_min y salario_max son inclusivos y se combinan con los demas filtros"""
+        data = listar(client, 'salario_min=300000&salario_max=500000&sort=salario')
+        combinado = listar(client, 'salario_min=300000&salario_max=500000&apellido=garcia')
+
+        assert [e['salario'] for e in data['empleados']] == [300000, 300000, 450000, 500000]
+        assert data['total'] == 4
+        assert {e['nombre'] for e in combinado['empleados']} == {'Ana', 'Marta'}
+
+    def test_filtro_por_rango_de_fecha(self, client):
+        """Verifica el filtro por fecha de ingreso en formato dd/mm/yyyy con la fecha hasta inclusive"""
+        for i, fecha in enumerate(('01/01/2020', '15/06/2021', '31/12/2022')):
+            datos = {'nombre': 'Ana', 'apellido': 'Garcia', 'email': f'ana{i}@test.com', 'salario': 400000, 'fecha_ingreso': fecha}
+            client.post('/api/empleados', data=json.dumps(datos), content_type='application/json')
+
+        data = listar(client, 'fecha_desde=01/01/2021&fecha_hasta=31/12/2022&sort=fecha_ingreso')
+
+        assert [e['fecha_ingreso'] for e in data['empleados']] == ['15/06/2021', '31/12/2022']
+
+    def test_rangos_invalidos(self, client):
+        """Verifica que un rango invertido o con valores mal formados responde 400"""
+        assert client.get('/api/empleados?salario_min=500&salario_max=100').status_code == 400
+        assert client.get('/api/empleados?salario_min=abc').status_code == 400
+        assert client.get('/api/empleados?fecha_desde=2021-01-01').status_code == 400
+        assert client.get('/api/empleados/exportar?fecha_desde=31/12/2022&fecha_hasta=01/01/2021').status_code == 400
+
+    @pytest.mark.mongo
+    def test_consultas_usan_indices_compuestos(self, empleados):
+        """Verifica con explain que los filtros por rango usan el indice compuesto del orden sin sort en memoria"""
+        coleccion = get_database().empleados
+        asegurar_indices()
+        consulta = coleccion.find({'empresa_id': 'default', 'salario_centavos': {'$gte': 30000000}})
+        if not hasattr(consulta, 'explain'):
+            pytest.skip("El motor de pruebas no soporta explain")
+
+        for orden, indice in ((('apellido', 1), 'empresa_apellido_id'), (('salario_centavos', -1), 'empresa_salario_centavos_id')):
+            plan = json.dumps(coleccion.find(
+                {'empresa_id': 'default', 'salario_centavos': {'$gte': 30000000}, 'fecha_ingreso': {'$lte': datetime.now()}}
+            ).sort([orden, ('_id', orden[1])]).hint(indice).explain()['queryPlanner']['winningPlan'], default=str)
+
+            assert 'IXSCAN' in plan and indice in plan
+            assert '"SORT"' not in plan
+
+
+class TestFacetas:
+
+    def test_facetas_del_filtro_actual(self, client, empleados):
+        """Verifica los conteos por puesto, banda salarial y anio de ingreso calculados sobre el filtro actual"""
+        data = listar(client, 'facetas=true&por_pagina=2')
+        filtrado = listar(client, 'facetas=true&apellido=perez')
+
+        assert len(data['empleados']) == 2
+        assert data['facetas']['puesto'] == [{'valor': 'Empleado', 'cantidad': 5}]
+        assert data['facetas']['banda_salarial'] == [
+            {'desde': 250000, 'hasta': 500000, 'cantidad': 3},
+            {'desde': 500000, 'hasta': 1000000, 'cantidad': 2}
+        ]
+        assert data['facetas']['anio_ingreso'] == [{'valor': datetime.now().year, 'cantidad': 5}]
+        assert sum(banda['cantidad'] for banda in filtrado['facetas']['banda_salarial']) == 2
+
+    @pytest.mark.mongo
+    def test_facetas_se_cachean_y_se_invalidan_al_escribir(self, client, empleados):
+        """Verifica que las facetas se sirven desde cache y que una escritura de la empresa las recalcula"""
+        cache = service.repo.cache_facetas
+        listar(client, 'facetas=true')
+        aciertos = cache.metricas()['aciertos']
+        listar(client, 'facetas=true')
+
+        assert cache.metricas()['aciertos'] == aciertos + 1
+
+        client.delete(f'/api/empleados/{empleados[0]}')
+        data = listar(client, 'facetas=true')
+
+        assert data['facetas']['puesto'] == [{'valor': 'Empleado', 'cantidad': 4}]
+
+    def test_sin_facetas_por_defecto(self, client, empleados):
+        """Verifica que el listado no calcula facetas si no se piden"""
+        assert 'facetas' not in listar(client, '')
+
+    @pytest.mark.mongo
+    def test_total_se_cachea_y_se_invalida_al_escribir(self, client, empleados):
+        """Verifica que el total del listado se sirve desde cache por filtro y que una escritura lo recalcula"""
+        cache = service.repo.cache_conteos
+        listar(client, 'apellido=Perez')
+        aciertos = cache.metricas()['aciertos']
+        data = listar(client, 'apellido=Perez')
+
+        assert cache.metricas()['aciertos'] == aciertos + 1
+        assert (data['total'], data['total_exacto']) == (2, True)
+
+        client.delete(f'/api/empleados/{empleados[1]}')
+
+        assert listar(client, 'apellido=Perez')['total'] == 1
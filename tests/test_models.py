@@ -177,4 +177,37 @@ class TestEmployeeModel:
             'nombre': 'Nuevo Nombre'
         }
         
-        Employee.validar_campos(data, validacion_completa=False)
\ No newline at end of file
+        Employee.validar_campos(data, validacion_completa=False)    
+    def test_validacion_reporta_todos_los_errores(self):
+        """Verifica que la validacion reporta todos los campos invalidos en un solo error en lugar de cortar en el primero"""
+        data = {
+            'nombre': '',
+            'apellido': 'a' * 51,
+            'email': 'email_invalido',
+            'salario': -10,
+            'fecha_ingreso': '2025-09-15'
+        }
+        
+        with pytest.raises(DatosInvalidos) as exc_info:
+            Employee.validar_campos(data, validacion_completa=True)
+        
+        assert len(exc_info.value.errores) == 5
+    
+    def test_validacion_devuelve_datos_normalizados(self):
+        """Verifica que la validacion devuelve los datos tipados: fecha parseada, salario float y email en minusculas"""
+        data = {
+            'nombre': ' Ana ',
+            'apellido': 'Garcia',
+            'email': 'Ana.Garcia@Test.com',
+            'salario': '400000',
+            'fecha_ingreso': '01/09/2025',
+            'campo_desconocido': 'x'
+        }
+        
+        datos = Employee.validar_campos(data, validacion_completa=True)
+        
+        assert datos['nombre'] == 'Ana'
+        assert datos['email'] == 'ana.garcia@test.com'
+        assert datos['salario'] == 400000.0 and isinstance(datos['salario'], float)
+        assert datos['fecha_ingreso'] == datetime(2025, 9, 1)
+        assert 'campo_desconocido' not in datos
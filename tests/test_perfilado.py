@@ -0,0 +1,89 @@
+import marshal
+import pstats
+import time
+import pytest
+from app.api.employees_routes import service
+
+TOKEN = {'X-Perfil-Token': 'secreto'}
+
+
+@pytest.fixture
+def perfilador(app, monkeypatch):
+    perfilador = app.extensions['perfilado']
+    monkeypatch.setattr(perfilador, 'token', b'secreto')
+    yield perfilador
+    perfilador.muestreador.detener()
+
+
+class TestPerfilPorSolicitud:
+
+    def test_sin_token_configurado_se_ignora(self, client):
+        """Verifica que sin PERFILADO_TOKEN la cabecera X-Perfil no cambia la respuesta"""
+        response = client.get('/api/empleados', headers={'X-Perfil': 'texto', **TOKEN})
+
+        assert response.status_code == 200
+        assert 'empleados' in response.get_json()
+
+    def test_token_invalido_o_formato_desconocido(self, client, perfilador):
+        """Verifica que perfilar exige el token y uno de los formatos soportados"""
+        assert client.get('/api/empleados', headers={'X-Perfil': 'texto'}).status_code == 403
+        assert client.get('/api/empleados', headers={'X-Perfil': 'texto', 'X-Perfil-Token': 'otro'}).status_code == 403
+        assert client.get('/api/empleados?perfil=svg', headers=TOKEN).status_code == 400
+
+    def test_perfil_en_texto(self, client, perfilador):
+        """Verifica que el perfil en texto reemplaza la respuesta e incluye la vista y el estado original"""
+        response = client.get('/api/empleados', headers={'X-Perfil': 'texto', **TOKEN})
+        texto = response.get_data(as_text=True)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        assert response.headers['X-Perfil-Estado'] == '200'
+        assert 'cumulative' in texto and 'listar_empleados' in texto
+        assert perfilador.metricas()['perfiles_por_solicitud'] == 1
+
+    def test_perfil_pstats(self, client, perfilador, tmp_path):
+        """Verifica que el formato pstats se puede abrir con pstats y conserva el estado original en una cabecera"""
+        response = client.get('/api/empleados/507f1f77bcf86cd799439011?perfil=pstats', headers=TOKEN)
+        archivo = tmp_path / 'perfil.pstats'
+        archivo.write_bytes(response.get_data())
+
+        funciones = {funcion for _, _, funcion in pstats.Stats(str(archivo)).stats}
+        assert response.headers['X-Perfil-Estado'] == '404'
+        assert 'obtener_empleado' in funciones
+        assert isinstance(marshal.loads(response.get_data()), dict)
+
+    def test_el_perfil_se_libera_tras_cada_solicitud(self, client, perfilador):
+        """Verifica que una solicitud perfilada no bloquea a la siguiente"""
+        for _ in range(3):
+            assert client.get('/api/empleados', headers={'X-Perfil': 'texto', **TOKEN}).status_code == 200
+
+
+class TestMuestreo:
+
+    def test_endpoints_requieren_token(self, client, perfilador):
+        """Verifica que volcar y activar el muestreo requieren la cabecera de token"""
+        assert client.get('/api/perfil/muestras').status_code == 403
+        assert client.post('/api/perfil/muestreo', json={'activo': True}).status_code == 403
+        assert client.post('/api/perfil/muestreo', json={'activo': 'si'}, headers=TOKEN).status_code == 400
+        assert not perfilador.muestreador.activo
+
+    def test_acumula_pilas_por_endpoint(self, client, perfilador, monkeypatch):
+        """Verifica que el muestreo cuenta las pilas de las solicitudes en curso y que se puede volcar y reiniciar"""
+        original = service.obtener_empleado
+
+        def lento(empleado_id):
+            time.sleep(0.2)
+            return original(empleado_id)
+        monkeypatch.setattr(service, 'obtener_empleado', lento)
+        monkeypatch.setattr(perfilador.muestreador, 'intervalo', 0.005)
+
+        assert client.post('/api/perfil/muestreo', json={'activo': True}, headers=TOKEN).get_json()['activo'] is True
+        client.get('/api/empleados/507f1f77bcf86cd799439011')
+        volcado = client.get('/api/perfil/muestras?reiniciar=true', headers=TOKEN).get_data(as_text=True)
+        detenido = client.post('/api/perfil/muestreo', json={'activo': False}, headers=TOKEN).get_json()
+
+        pilas = [linea.rsplit(' ', 1) for linea in volcado.splitlines()]
+        lentas = [int(cantidad) for pila, cantidad in pilas if pila.startswith('employees.obtener_empleado;') and pila.endswith(':lento')]
+        assert sum(lentas) >= 5
+        assert detenido['activo'] is False
+        assert 'obtener_empleado' not in client.get('/api/perfil/muestras', headers=TOKEN).get_data(as_text=True)
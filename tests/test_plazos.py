@@ -0,0 +1,139 @@
+import json
+import time
+import pytest
+from app.api.employees_routes import service
+from app.common import contexto
+from app.common.errors import ErrorConexion, PlazoAgotado
+from app.config import Config
+from app.db import ColeccionProtegida
+from tests.test_circuito import ColeccionFalsa, circuito_falso, reloj
+
+
+@pytest.fixture
+def con_plazo():
+    def fijar(segundos):
+        return contexto.plazo.set(time.monotonic() + segundos)
+    tokens = []
+    yield lambda segundos: tokens.append(fijar(segundos))
+    for token in reversed(tokens):
+        contexto.plazo.reset(token)
+
+
+class TestPlazoDeSolicitud:
+
+    def test_cabecera_y_valores_por_ruta(self, monkeypatch):
+        """Verifica que la cabecera manda y se acota al maximo, y que sin ella se usa el valor de la ruta o el por defecto"""
+        monkeypatch.setattr(Config, 'PLAZOS_RUTA', {'listar_empleados': 3000, 'exportar_empleados': 0})
+        monkeypatch.setattr(Config, 'PLAZO_POR_DEFECTO_MS', 10000)
+        monkeypatch.setattr(Config, 'PLAZO_MAX_MS', 60000)
+
+        assert contexto.plazo_de_solicitud('employees.listar_empleados', '250') == 250
+        assert contexto.plazo_de_solicitud('employees.listar_empleados', '999999') == 60000
+        assert contexto.plazo_de_solicitud('employees.listar_empleados', None) == 3000
+        assert contexto.plazo_de_solicitud('employees.exportar_empleados', None) == 0
+        assert contexto.plazo_de_solicitud('employees.crear_empleado', None) == 10000
+        for invalida in ('0', '-5', 'rapido'):
+            with pytest.raises(ValueError):
+                contexto.plazo_de_solicitud('employees.listar_empleados', invalida)
+
+    def test_cabecera_invalida_responde_400(self, client):
+        """Verifica que una cabecera X-Plazo-Ms invalida se rechaza antes de llegar a la base"""
+        response = client.get('/api/empleados', headers={'X-Plazo-Ms': 'rapido'})
+
+        assert response.status_code == 400
+        assert 'X-Plazo-Ms' in response.get_json()['error']
+
+    def test_la_solicitud_corre_con_su_plazo(self, client, monkeypatch):
+        """Verifica que el servicio ve el plazo de la cabecera y que al terminar la solicitud deja de haber plazo"""
+        vistos = []
+        original = service.obtener_empleado
+
+        def registrar(*args, **kwargs):
+            vistos.append(contexto.plazo_restante())
+            return original(*args, **kwargs)
+        monkeypatch.setattr(service, 'obtener_empleado', registrar)
+
+        client.get('/api/empleados/507f1f77bcf86cd799439011', headers={'X-Plazo-Ms': '1500'})
+
+        assert len(vistos) == 1 and 0 < vistos[0] <= 1.5
+        assert contexto.plazo_restante() is None
+
+
+class TestPlazoEnLaBase:
+
+    def test_lecturas_limitadas_por_el_plazo(self, circuito_falso, con_plazo):
+        """Verifica que maxTimeMS se reduce a lo que queda del plazo y que sin plazo se mantiene el de la operacion"""
+        falsa = ColeccionFalsa()
+        coleccion = ColeccionProtegida(falsa, circuito_falso, 5000)
+
+        coleccion.count_documents({})
+        con_plazo(0.3)
+        coleccion.count_documents({})
+        list(coleccion.find({}, max_time_ms=None))
+
+        sin_plazo, con_limite, lote = [kwargs for _, kwargs in falsa.llamadas]
+        assert sin_plazo == {'maxTimeMS': 5000}
+        assert 0 < con_limite['maxTimeMS'] <= 300
+        assert 0 < lote['max_time_ms'] <= 300
+
+    def test_plazo_agotado_no_consulta_ni_abre_el_circuito(self, circuito_falso, con_plazo):
+        """Verifica que con el plazo vencido no se consulta la base y que el corte no cuenta como fallo del circuito"""
+        falsa = ColeccionFalsa()
+        coleccion = ColeccionProtegida(falsa, circuito_falso, 5000)
+        con_plazo(-1)
+
+        for _ in range(circuito_falso.umbral_fallos + 1):
+            with pytest.raises(PlazoAgotado):
+                coleccion.count_documents({})
+
+        assert falsa.llamadas == []
+        assert circuito_falso.metricas()['estado'] == 'cerrado'
+
+    def test_fallo_de_conexion_con_plazo_sigue_siendo_503(self, circuito_falso, con_plazo):
+        """Verifica que un fallo de la base con plazo de sobra sigue contando para el circuito"""
+        coleccion = ColeccionProtegida(ColeccionFalsa(), circuito_falso, 5000)
+        con_plazo(5)
+
+        with pytest.raises(ErrorConexion):
+            coleccion.find_one({})
+        assert circuito_falso.metricas()['fallos_consecutivos'] == 1
+
+
+class TestPlazoEnLaApi:
+
+    def test_listado_parcial_sin_total(self, client, sample_employee_data, monkeypatch):
+        """Verifica que si el plazo se agota tras leer la pagina el listado responde igual, sin total ni facetas"""
+        client.post('/api/empleados', data=json.dumps(sample_employee_data), content_type='application/json')
+
+        def sin_tiempo(*args, **kwargs):
+            raise PlazoAgotado()
+        monkeypatch.setattr(service.repo, 'contar_listado', sin_tiempo)
+        monkeypatch.setattr(service.repo, 'obtener_facetas', sin_tiempo)
+
+        response = client.get('/api/empleados?facetas=true')
+        datos = response.get_json()
+
+        assert response.status_code == 200
+        assert len(datos['empleados']) == 1
+        assert datos['total'] is None and datos['total_paginas'] is None and datos['facetas'] is None
+        assert datos['omitidos_por_plazo'] == ['total', 'facetas']
+
+    def test_listado_completo_no_marca_omitidos(self, client, sample_employee_data):
+        """Verifica que con tiempo suficiente el listado no incluye omitidos_por_plazo"""
+        client.post('/api/empleados', data=json.dumps(sample_employee_data), content_type='application/json')
+
+        datos = client.get('/api/empleados', headers={'X-Plazo-Ms': '5000'}).get_json()
+
+        assert datos['total'] == 1
+        assert 'omitidos_por_plazo' not in datos
+
+    def test_plazo_agotado_responde_504(self, client, monkeypatch):
+        """Verifica que una operacion que no termina dentro del plazo responde 504"""
+        def sin_tiempo(*args, **kwargs):
+            raise PlazoAgotado()
+        monkeypatch.setattr(service.repo, 'obtener_por_id', sin_tiempo)
+
+        response = client.get('/api/empleados/507f1f77bcf86cd799439011')
+
+        assert response.status_code == 504
+        assert response.get_json()['error'] == str(PlazoAgotado())
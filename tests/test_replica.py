@@ -0,0 +1,42 @@
+import os
+import pytest
+from app.config import Config
+from app.common import contexto
+from app.models.employee import Employee
+from app.repository.employees_repository import EmployeesRepository
+
+
+REPLICA_URI = os.environ.get('MONGODB_REPLICA_URI')
+
+pytestmark = [
+    pytest.mark.mongo,
+    pytest.mark.skipif(not REPLICA_URI, reason="MONGODB_REPLICA_URI no definida (ver docker-compose.replica.yml)")
+]
+
+
+class TestLecturasEnSecundarios:
+
+    @pytest.fixture
+    def repo(self, monkeypatch):
+        monkeypatch.setenv('MONGODB_URI', REPLICA_URI)
+        monkeypatch.setattr(Config, 'LECTURAS_EN_SECUNDARIOS', True)
+        monkeypatch.setattr(Config, 'PREFERENCIA_LECTURA_SECUNDARIA', 'secondary')
+        contexto.tiempo_operacion.set(None)
+        repo = EmployeesRepository()
+        repo.coleccion.delete_many({})
+        yield repo
+        repo.coleccion.delete_many({})
+
+    def test_lecturas_analiticas_van_a_secundarios(self, repo):
+        """Verifica que el listado y los conteos usan una preferencia de lectura de secundarios con staleness acotada"""
+        preferencia = repo.coleccion_lecturas.read_preference
+
+        assert preferencia.mongos_mode == 'secondary'
+        assert preferencia.max_staleness == Config.MAX_STALENESS_SEGUNDOS
+
+    def test_lectura_posterior_a_escritura_ve_la_escritura(self, repo):
+        """Verifica que una lectura en un secundario despues de una escritura del mismo cliente la observa"""
+        for i in range(20):
+            repo.crear(Employee(f'Empleado{i}', 'Test', f'empleado{i}@test.com', 300000))
+            assert contexto.tiempo_operacion.get() is not None
+            assert repo.contar({'email': f'empleado{i}@test.com'}) == 1
@@ -44,6 +44,7 @@ class TestEmployeeRoutes:
         data = json.loads(response.data)
         assert 'error' in data
         assert 'invalidos' in data['error']
+        assert len(data['errores']) == 3
     
     def test_crear_empleado_email_duplicado(self, client, sample_employee_data):
         """Verifica que se devuelve error 409 cuando se intenta crear un empleado con un email que ya existe en la base de datos"""
@@ -306,4 +307,82 @@ class TestEmployeeRoutes:
         assert data['total_empleados'] == 3
         assert data['promedio_salarios'] == 500000.0
         assert data['moneda'] == 'ARS'
-        assert 'fecha_reporte' in data
\ No newline at end of file
+        assert 'fecha_reporte' in data    
+    def test_obtener_metricas(self, client):
+        """Verifica que el endpoint de metricas responde con un objeto JSON"""
+        response = client.get('/api/metricas')
+        
+        assert response.status_code == 200
+        assert isinstance(json.loads(response.data), dict)
+    
+    def test_obtener_empleados_lote(self, client):
+        """Verifica que el lote devuelve los empleados en el orden pedido e informa IDs inexistentes o invalidos"""
+        ids = []
+        for nombre in ('Ana', 'Carlos'):
+            response = client.post(
+                '/api/empleados',
+                data=json.dumps({'nombre': nombre, 'apellido': 'Test', 'email': f'{nombre.lower()}@test.com', 'salario': 400000}),
+                content_type='application/json'
+            )
+            ids.append(json.loads(response.data)['empleado']['id'])
+        
+        pedidos = [ids[1], '507f1f77bcf86cd799439011', 'no-es-un-id', ids[0]]
+        response = client.get(f'/api/empleados/lote?ids={",".join(pedidos)}')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [r['id'] for r in data['empleados']] == pedidos
+        assert [r['estado'] for r in data['empleados']] == ['encontrado', 'no_encontrado', 'id_invalido', 'encontrado']
+        assert data['empleados'][0]['empleado']['nombre'] == 'Carlos'
+        assert data['encontrados'] == 2
+    
+    def test_obtener_empleados_lote_sin_ids(self, client):
+        """Verifica que se devuelve error 400 cuando no se indican IDs en el lote"""
+        response = client.get('/api/empleados/lote')
+        
+        assert response.status_code == 400
+    
+    def test_actualizacion_masiva(self, client):
+        """Verifica que la actualizacion masiva aplica los cambios validos y devuelve un resultado por item"""
+        ids = []
+        for nombre in ('Ana', 'Carlos', 'Maria'):
+            response = client.post(
+                '/api/empleados',
+                data=json.dumps({'nombre': nombre, 'apellido': 'Test', 'email': f'{nombre.lower()}@test.com', 'salario': 400000}),
+                content_type='application/json'
+            )
+            ids.append(json.loads(response.data)['empleado']['id'])
+        
+        cambios = [
+            {'id': ids[0], 'cambios': {'salario': 450000}},
+            {'id': ids[1], 'cambios': {'salario': -1}},
+            {'id': ids[2], 'cambios': {'email': 'ana@test.com'}},
+            {'id': '507f1f77bcf86cd799439011', 'cambios': {'salario': 1000}}
+        ]
+        response = client.patch('/api/empleados/bulk', data=json.dumps(cambios), content_type='application/json')
+        
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [r['estado'] for r in data['resultados']] == ['actualizado', 'error', 'error', 'error']
+        assert 'registrado' in data['resultados'][2]['errores'][0]
+        assert data['actualizados'] == 1
+        
+        empleado = json.loads(client.get(f'/api/empleados/{ids[0]}').data)
+        assert empleado['salario'] == 450000
+    
+    def test_actualizacion_masiva_emails_repetidos_en_la_solicitud(self, client):
+        """Verifica que si dos items piden el mismo email solo el primero lo obtiene"""
+        ids = []
+        for nombre in ('Ana', 'Carlos'):
+            response = client.post(
+                '/api/empleados',
+                data=json.dumps({'nombre': nombre, 'apellido': 'Test', 'email': f'{nombre.lower()}@test.com', 'salario': 400000}),
+                content_type='application/json'
+            )
+            ids.append(json.loads(response.data)['empleado']['id'])
+        
+        cambios = [{'id': empleado_id, 'changes': {'email': 'nuevo@test.com'}} for empleado_id in ids]
+        response = client.patch('/api/empleados/bulk', data=json.dumps(cambios), content_type='application/json')
+        
+        data = json.loads(response.data)
+        assert [r['estado'] for r in data['resultados']] == ['actualizado', 'error']
@@ -0,0 +1,76 @@
+import json
+import threading
+import pytest
+from app.api.employees_routes import service
+from app.common.calentamiento import Calentamiento
+from app.config import Config
+from app.repository.employees_repository import INDICES
+
+
+@pytest.fixture
+def indices_listos(app):
+    for indice in (service.busqueda, service.autocompletado, service.analitica):
+        if indice:
+            assert indice.listo.wait(5)
+
+
+class TestSalud:
+
+    def test_vivo_no_depende_del_calentamiento(self, app, client):
+        """Verifica que /health/live responde 200 aunque el calentamiento no haya terminado"""
+        app.extensions['calentamiento'] = Calentamiento(app)
+
+        response = client.get('/health/live')
+
+        assert response.status_code == 200
+        assert response.get_json() == {'estado': 'vivo'}
+
+    def test_listo_espera_al_calentamiento(self, app, client, indices_listos):
+        """Verifica que /health/ready responde 503 mientras el calentamiento esta en curso y 200 al terminar"""
+        liberar = threading.Event()
+        calentamiento = Calentamiento(app)
+        calentamiento.habilitado = True
+        calentamiento.agregar('lento', lambda: liberar.wait(5))
+        app.extensions['calentamiento'] = calentamiento
+        hilo = calentamiento.iniciar()
+
+        pendiente = client.get('/health/ready')
+        liberar.set()
+        hilo.join(5)
+        listo = client.get('/health/ready')
+
+        assert pendiente.status_code == 503
+        assert pendiente.get_json()['calentamiento']['estado'] == Calentamiento.EN_CURSO
+        assert listo.status_code == 200
+        assert listo.get_json()['listo'] is True
+        assert listo.get_json()['calentamiento']['pasos']['lento']['resultado'] is True
+
+    def test_paso_fallido_no_detiene_el_calentamiento(self, app):
+        """Verifica que un paso que falla queda registrado y los siguientes se ejecutan igual"""
+        calentamiento = Calentamiento(app)
+        calentamiento.agregar('roto', lambda: 1 / 0)
+        calentamiento.agregar('sano', lambda: 'ok')
+
+        calentamiento.ejecutar()
+        pasos = calentamiento.metricas()['pasos']
+
+        assert calentamiento.terminado.is_set()
+        assert 'division by zero' in pasos['roto']['error']
+        assert pasos['sano']['resultado'] == 'ok'
+
+    @pytest.mark.mongo
+    def test_calentamiento_completo(self, app, client, sample_employee_data):
+        """Verifica que el calentamiento abre conexiones, recorre los indices, arma la especificacion y llena las caches"""
+        app.config['MONGO_MIN_POOL_SIZE'] = 3
+        client.post('/api/empleados', data=json.dumps(sample_employee_data), content_type='application/json')
+        calentamiento = app.extensions['calentamiento']
+
+        calentamiento.ejecutar()
+        pasos = calentamiento.metricas()['pasos']
+
+        assert all('error' not in paso for paso in pasos.values())
+        assert pasos['conexiones']['resultado'] == 3
+        assert pasos['indices']['resultado'] == len(INDICES) * (1 + len(set(Config.EMPRESAS_COLECCION_DEDICADA.values())))
+        assert pasos['especificacion']['resultado'] > 0
+        assert service.repo.cache_conteos.metricas()['tamano'] >= 1
+        assert service.repo.cache_facetas.metricas()['tamano'] >= 1